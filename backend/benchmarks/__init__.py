@@ -0,0 +1,4 @@
+"""
+Benchmark scripts, run from the repository root with
+python -m backend.benchmarks.<name>
+"""
@@ -0,0 +1,152 @@
+"""
+Dashboard /api/price throughput with a slow exchange: the Flask app on a
+fixed pool of WSGI threads, on one thread per in-flight request (as the
+threaded development server runs it), and the ASGI serving mode on one
+event loop. Requests are driven in process, so the numbers measure the
+serving model rather than socket overhead; the response cache is disabled
+so every request waits on the exchange.
+"""
+
+import argparse
+import asyncio
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from backend.src import dashboard, dashboard_asgi
+from backend.src.modules.asgi import wsgi_environ
+
+SCOPE = {
+    "type": "http",
+    "method": "GET",
+    "path": "/api/price",
+    "query_string": b"",
+    "headers": [],
+}
+
+
+def ticker() -> dict:
+    return {
+        "last": 100.0,
+        "bid": 99.5,
+        "ask": 100.5,
+        "baseVolume": 3.0,
+        "timestamp": int(time.time() * 1000),
+    }
+
+
+class SlowExchange:
+    def __init__(self, latency: float):
+        self.latency = latency
+
+    def fetch_ticker(self, symbol):
+        time.sleep(self.latency)
+        return ticker()
+
+
+class SlowAsyncExchange(SlowExchange):
+    async def fetch_ticker(self, symbol):
+        await asyncio.sleep(self.latency)
+        return ticker()
+
+    async def close(self):
+        pass
+
+
+class PeakThreads:
+    """Samples the thread count until stopped"""
+
+    def __init__(self):
+        self.peak = threading.active_count()
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._sample, daemon=True)
+
+    def _sample(self):
+        while not self._stopped.wait(0.005):
+            self.peak = max(self.peak, threading.active_count())
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stopped.set()
+        self._thread.join()
+
+
+def wsgi_request(_=None) -> int:
+    status = []
+    body = dashboard.app.wsgi_app(
+        wsgi_environ(SCOPE, b""), lambda s, h, e=None: status.append(s)
+    )
+    b"".join(body)
+    return int(status[0].split()[0])
+
+
+def run_wsgi(count: int, threads: int) -> tuple[float, int]:
+    with PeakThreads() as peak, ThreadPoolExecutor(threads) as pool:
+        started = time.perf_counter()
+        statuses = list(pool.map(wsgi_request, range(count)))
+        elapsed = time.perf_counter() - started
+    assert set(statuses) == {200}, statuses
+    return count / elapsed, peak.peak
+
+
+async def asgi_request(app) -> int:
+    sent = []
+
+    async def receive():
+        return {"type": "http.request", "body": b""}
+
+    async def send(message):
+        sent.append(message)
+
+    await app(dict(SCOPE), receive, send)
+    return sent[0]["status"]
+
+
+async def run_asgi(count: int, concurrency: int) -> tuple[float, int]:
+    app = dashboard_asgi.create_app(dashboard)
+    slots = asyncio.Semaphore(concurrency)
+
+    async def limited():
+        async with slots:
+            return await asgi_request(app)
+
+    with PeakThreads() as peak:
+        started = time.perf_counter()
+        statuses = await asyncio.gather(*(limited() for _ in range(count)))
+        elapsed = time.perf_counter() - started
+    assert set(statuses) == {200}, statuses
+    return count / elapsed, peak.peak
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Dashboard serving throughput")
+    parser.add_argument("-n", "--count", type=int, default=2000)
+    parser.add_argument("-c", "--concurrency", type=int, default=500)
+    parser.add_argument("--workers", type=int, default=16, help="WSGI pool size")
+    parser.add_argument("--latency", type=float, default=0.1, help="seconds")
+    args = parser.parse_args()
+
+    logging.disable(logging.CRITICAL)
+    dashboard.RESPONSE_CACHE_TTLS["/api/price"] = 0
+    dashboard.streamed_ticker = lambda: None
+    dashboard.init_exchange = lambda *a: SlowExchange(args.latency)
+    dashboard_asgi.create_async_exchange = lambda *a: SlowAsyncExchange(args.latency)
+
+    rows = [
+        (f"WSGI, {args.workers} threads", run_wsgi(args.count, args.workers)),
+        (
+            f"WSGI, {args.concurrency} threads",
+            run_wsgi(args.count, args.concurrency),
+        ),
+        (
+            f"ASGI, {args.concurrency} in flight",
+            asyncio.run(run_asgi(args.count, args.concurrency)),
+        ),
+    ]
+    print(f"{args.count} requests, {args.latency * 1000:.0f} ms exchange latency")
+    for name, (rate, threads) in rows:
+        print(f"{name:<24} {rate:>10,.0f} req/s  {threads:>5} threads")
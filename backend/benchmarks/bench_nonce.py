@@ -0,0 +1,70 @@
+"""
+Nonce allocations per second: the former read-and-rewrite of the nonce
+file on every call against the block-reserving NonceAllocator, single
+threaded and with several threads sharing one allocator.
+"""
+
+import argparse
+import os
+import tempfile
+import threading
+import time
+
+from backend.src.modules.utils import NonceAllocator
+
+
+def file_per_call_nonce(path: str) -> int:
+    """
+    The previous get_next_nonce: one read and one rewrite per nonce.
+    """
+    last_nonce = 0
+    if os.path.exists(path):
+        with open(path, "r", encoding="utf-8") as f:
+            try:
+                last_nonce = int(f.read().strip())
+            except Exception:
+                last_nonce = 0
+    next_nonce = last_nonce + 1
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(str(next_nonce))
+    return next_nonce
+
+
+def run_file_per_call(count: int, path: str) -> float:
+    started = time.perf_counter()
+    for _ in range(count):
+        file_per_call_nonce(path)
+    return count / (time.perf_counter() - started)
+
+
+def run_allocator(count: int, path: str, threads: int = 1) -> float:
+    allocator = NonceAllocator(path)
+    per_thread = count // threads
+
+    def take():
+        for _ in range(per_thread):
+            allocator.next()
+
+    workers = [threading.Thread(target=take) for _ in range(threads)]
+    started = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    return per_thread * threads / (time.perf_counter() - started)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Nonce allocation throughput")
+    parser.add_argument("-n", "--count", type=int, default=1_000_000)
+    parser.add_argument("--threads", type=int, default=4)
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "nonce.txt")
+        # The file round trip is slow, so it gets a smaller sample
+        before = run_file_per_call(max(args.count // 100, 1), path)
+        after = run_allocator(args.count, path)
+        threaded = run_allocator(args.count, path, args.threads)
+    print(f"file per call:          {before:>14,.0f} nonces/s")
+    print(f"NonceAllocator:         {after:>14,.0f} nonces/s ({after / before:,.0f}x)")
+    print(f"NonceAllocator {args.threads} thr.: {threaded:>14,.0f} nonces/s")
@@ -0,0 +1,51 @@
+"""
+Order throughput of the in-process PaperExchange.
+Submits a mix of resting, crossing and market orders and cancels, then
+reports orders per second.
+"""
+
+import argparse
+import random
+import time
+
+from backend.src.modules.paper_exchange import PaperExchange
+
+HOUR_MS = 3600 * 1000
+
+
+def run(orders: int, seed: int = 0) -> float:
+    """
+    :return: Orders (including cancels) processed per second
+    """
+    rng = random.Random(seed)
+    exchange = PaperExchange(balances={"USD": 1e12, "BTC": 1e9})
+    candles = [[i * HOUR_MS, 100.0, 101.0, 99.0, 100.0, 1.0] for i in range(1000)]
+    exchange.load_candles("BTC/USD", "1h", candles, position=1)
+    resting = []
+    started = time.perf_counter()
+    for i in range(orders):
+        action = rng.random()
+        if action < 0.1 and resting:
+            order_id = resting.pop(rng.randrange(len(resting)))
+            if exchange.fetch_order(order_id)["status"] == "open":
+                exchange.cancel_order(order_id)
+        elif action < 0.2:
+            exchange.create_market_order("BTC/USD", rng.choice(("buy", "sell")), 0.1)
+        else:
+            side = rng.choice(("buy", "sell"))
+            offset = rng.uniform(0.1, 2.0) * (-1 if side == "buy" else 1)
+            order = exchange.create_limit_order(
+                "BTC/USD", side, rng.uniform(0.1, 1.0), round(100.0 + offset, 1)
+            )
+            if order["status"] == "open":
+                resting.append(order["id"])
+        if i % 1000 == 999:
+            exchange.advance()
+    return orders / (time.perf_counter() - started)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="PaperExchange order throughput")
+    parser.add_argument("-n", "--orders", type=int, default=100_000)
+    args = parser.parse_args()
+    print(f"{run(args.orders):,.0f} orders/s")
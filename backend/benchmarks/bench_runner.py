@@ -0,0 +1,90 @@
+"""
+Cost of each extra symbol in the multi-symbol runner.
+Runs BotRunner against an in-process exchange on a virtual clock and reports
+the memory held and the CPU time spent per symbol.
+"""
+
+import argparse
+import asyncio
+import time
+import tracemalloc
+
+from backend.src.config_loader import load_config
+from backend.src.runner import BotRunner
+from backend.src.tradingbot import Clock
+
+STEP = 60.0
+
+
+class VirtualClock(Clock):
+    def __init__(self, now: float):
+        self.now = now
+
+    def time(self) -> float:
+        return self.now
+
+    async def sleep(self, seconds: float):
+        self.now += max(seconds, 0.001)
+        await asyncio.sleep(0)
+
+
+class SyntheticExchange:
+    """Minute candles for any symbol, published as soon as they close"""
+
+    def __init__(self, clock: VirtualClock):
+        self.clock = clock
+
+    async def fetch_ohlcv(self, symbol, timeframe="1m", since=None, limit=None):
+        await asyncio.sleep(0)
+        forming = int(self.clock.time() // STEP)
+        first = forming - (limit or 100) if since is None else since // 60000
+        return [
+            [int(i * STEP * 1000), 100.0, 101.0, 99.0, 100.0 + i % 7, 100.0]
+            for i in range(int(first), forming + 1)
+        ]
+
+    async def fetch_balance(self):
+        return {"free": {"USD": 10000.0}}
+
+    async def create_order(self, symbol, type, side, amount, price=None):
+        return {"id": "1", "average": None}
+
+
+def measure(symbols: int, candles: int) -> tuple[float, float, int]:
+    """
+    :return: Memory held after the run in KiB, CPU seconds used and
+        candles processed over all symbols
+    """
+    cfg = load_config().model_copy(
+        update={"TIMEFRAME": "1m", "TRADING_START_HOUR": 0, "TRADING_END_HOUR": 24}
+    )
+    clock = VirtualClock(1_700_000_000.0)
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    started = time.process_time()
+    runner = BotRunner(
+        cfg,
+        {f"S{i}/USD": {} for i in range(symbols)},
+        exchange=SyntheticExchange(clock),
+        clock=clock,
+    )
+    asyncio.run(runner.run(max_candles=candles))
+    cpu = time.process_time() - started
+    held = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    processed = sum(stats["candles"] for stats in runner.stats().values())
+    return held / 1024, cpu, processed
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Per-symbol cost of BotRunner")
+    parser.add_argument("-s", "--symbols", type=int, nargs="+", default=[1, 10, 50])
+    parser.add_argument("-c", "--candles", type=int, default=100)
+    args = parser.parse_args()
+
+    for count in args.symbols:
+        memory_kib, cpu, processed = measure(count, args.candles)
+        print(
+            f"{count:4d} symbols: {memory_kib / count:8.1f} KiB/symbol, "
+            f"{cpu * 1000 / processed:6.3f} ms CPU/candle"
+        )
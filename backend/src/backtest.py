@@ -1,8 +1,18 @@
 import argparse
+from typing import Iterable, Optional
 
+import numpy as np
 import pandas as pd
 from config_loader import load_config
-from modules.indicators import calculate_indicators, detect_fvg
+from modules.incremental import IncrementalIndicators
+from modules.indicator_cache import IndicatorCache, cached_calculate_indicators
+from modules.indicators import (
+    add_fvg_columns,
+    calculate_indicators,
+    detect_fvg,
+    fvg_entry_signals,
+)
+from modules.ohlcv_store import OHLCV_COLUMNS, OHLCVStore
 from modules.orders import calculate_position_size
 
 
@@ -22,36 +32,48 @@ def calculate_take_profit_price(
     return entry_price * (1 + take_profit_percent / 100)
 
 
-def run_backtest(
-    data_file: str,
-    config_file: str,
-    initial_equity: float = 10000.0,
-    hold_bars: int = 1,
-):
+def _validate_risk_parameters(cfg) -> None:
     """
-    Backtest with position sizing, stop-loss and take-profit based on risk parameters.
-
-    :param data_file: CSV file with OHLCV data
-    :param config_file: Path to config.json for strategy parameters
-    :param initial_equity: Starting account equity
-    :param hold_bars: Number of candles to hold a position if TP/SL not hit
+    Ensure STOP_LOSS_PERCENT and TAKE_PROFIT_PERCENT are positive.
     """
-    df = pd.read_csv(data_file, parse_dates=["timestamp"])
-    cfg = load_config(config_file)
-
-    df = calculate_indicators(
-        df,
-        ema_length=cfg.EMA_LENGTH,
-        volume_multiplier=cfg.VOLUME_MULTIPLIER,
-        trading_start_hour=cfg.TRADING_START_HOUR,
-        trading_end_hour=cfg.TRADING_END_HOUR,
-    )
-    # Validate STOP_LOSS_PERCENT and TAKE_PROFIT_PERCENT are positive
     if cfg.STOP_LOSS_PERCENT is None or cfg.STOP_LOSS_PERCENT <= 0:
         raise ValueError("STOP_LOSS_PERCENT must be positive")
     if cfg.TAKE_PROFIT_PERCENT is None or cfg.TAKE_PROFIT_PERCENT <= 0:
         raise ValueError("TAKE_PROFIT_PERCENT must be positive")
 
+
+def _trade_record(
+    entry_idx: int,
+    exit_idx: int,
+    entry_price: float,
+    exit_price: float,
+    size: float,
+    pnl: float,
+    equity: float,
+    reason: str,
+) -> dict:
+    return {
+        "entry_idx": entry_idx,
+        "exit_idx": exit_idx,
+        "entry_price": entry_price,
+        "exit_price": exit_price,
+        "size": size,
+        "pnl": pnl,
+        "equity": equity,
+        "reason": reason,
+    }
+
+
+def simulate_trades_loop(
+    df: pd.DataFrame, cfg, initial_equity: float = 10000.0, hold_bars: int = 1
+) -> list[dict]:
+    """
+    Reference per-bar simulation of the FVG breakout strategy.
+
+    Kept for parity testing of simulate_trades; it is O(n^2) because
+    detect_fvg is evaluated on a fresh slice for every bar.
+    """
+    _validate_risk_parameters(cfg)
     positions = []
     open_pos = None
     equity = initial_equity
@@ -59,19 +81,22 @@ def run_backtest(
     for i in range(cfg.LOOKBACK, len(df) - 1):
         price = df.at[i, "close"]
 
-        # Entry on bullish FVG breakout
+        # Entry on a breakout above the FVG of the bars before this one,
+        # confirmed by trend, volume and trading hours
         if open_pos is None:
-            low, high = detect_fvg(df.iloc[: i + 1], cfg.LOOKBACK, bullish=True)
-            if high and price > high:
+            low, high = detect_fvg(df.iloc[:i], cfg.LOOKBACK, bullish=True)
+            if (
+                high
+                and price > high
+                and price > df.at[i, "ema"]
+                and df.at[i, "high_volume"]
+                and df.at[i, "within_trading_hours"]
+            ):
                 entry_price = df.at[i + 1, "open"]
-                if cfg.STOP_LOSS_PERCENT is None or cfg.STOP_LOSS_PERCENT <= 0:
-                    raise ValueError("STOP_LOSS_PERCENT must be a positive value.")
                 sl_price = calculate_stop_loss_price(entry_price, cfg.STOP_LOSS_PERCENT)
                 tp_price = calculate_take_profit_price(
                     entry_price, cfg.TAKE_PROFIT_PERCENT
                 )
-                sl_price = entry_price * (1 - cfg.STOP_LOSS_PERCENT / 100)
-                tp_price = entry_price * (1 + cfg.TAKE_PROFIT_PERCENT / 100)
                 size = calculate_position_size(
                     equity, cfg.RISK_PER_TRADE, entry_price, sl_price
                 )
@@ -105,19 +130,341 @@ def run_backtest(
             pnl = open_pos["size"] * (exit_price - open_pos["entry_price"])
             equity += pnl
             positions.append(
-                {
-                    "entry_idx": open_pos["entry_idx"],
-                    "exit_idx": i,
-                    "entry_price": open_pos["entry_price"],
-                    "exit_price": exit_price,
-                    "size": open_pos["size"],
-                    "pnl": pnl,
-                    "equity": equity,
-                    "reason": reason,
-                }
+                _trade_record(
+                    open_pos["entry_idx"],
+                    i,
+                    open_pos["entry_price"],
+                    exit_price,
+                    open_pos["size"],
+                    pnl,
+                    equity,
+                    reason,
+                )
             )
             open_pos = None
 
+    return positions
+
+
+def entry_signals(df: pd.DataFrame, lookback: int) -> np.ndarray:
+    """
+    Boolean array marking the bars the live bot would enter on, see
+    indicators.fvg_entry_signals.
+
+    Bars before the first full FVG window, and the last bar (which has no
+    next open to enter on), are never signals.
+    """
+    signals = fvg_entry_signals(df, lookback)
+    signals[max(len(df) - 1, 0) :] = False
+    return signals
+
+
+def resolve_exits(
+    df: pd.DataFrame,
+    signal_idx: np.ndarray,
+    stop_loss_percent: float,
+    take_profit_percent: float,
+    hold_bars: int,
+) -> dict:
+    """
+    Resolve the exit of a hypothetical position for every entry signal at once.
+
+    Each signal enters at the next bar's open. SL has priority over TP, and a
+    position still open ``hold_bars`` bars after entry leaves at the following
+    open. Returns arrays keyed by entry_idx, entry_price, sl_price, tp_price,
+    exit_idx (-1 when the data ends first), exit_price and reason.
+    """
+    open_ = df["open"].to_numpy(dtype=float)
+    high = df["high"].to_numpy(dtype=float)
+    low = df["low"].to_numpy(dtype=float)
+    last_bar = len(df) - 2
+
+    entry_idx = signal_idx + 1
+    entry_price = open_[entry_idx]
+    sl_price = calculate_stop_loss_price(entry_price, stop_loss_percent)
+    tp_price = calculate_take_profit_price(entry_price, take_profit_percent)
+    exit_idx = np.full(len(signal_idx), -1, dtype=np.int64)
+    exit_price = np.full(len(signal_idx), np.nan)
+    reason = np.full(len(signal_idx), "", dtype=object)
+
+    pending = np.arange(len(signal_idx))
+    max_offset = max(hold_bars, 0)
+    for offset in range(max_offset + 1):
+        bars = entry_idx[pending] + offset
+        in_range = bars <= last_bar
+        pending, bars = pending[in_range], bars[in_range]
+        if not len(pending):
+            break
+
+        hit_sl = low[bars] <= sl_price[pending]
+        hit_tp = ~hit_sl & (high[bars] >= tp_price[pending])
+        hit_time = ~(hit_sl | hit_tp) & (offset >= hold_bars)
+        for hit, label in ((hit_sl, "SL"), (hit_tp, "TP"), (hit_time, "TIME")):
+            exit_idx[pending[hit]] = bars[hit]
+            reason[pending[hit]] = label
+        exit_price[pending[hit_sl]] = sl_price[pending[hit_sl]]
+        exit_price[pending[hit_tp]] = tp_price[pending[hit_tp]]
+        exit_price[pending[hit_time]] = open_[bars[hit_time] + 1]
+        pending = pending[~(hit_sl | hit_tp | hit_time)]
+
+    return {
+        "entry_idx": entry_idx,
+        "entry_price": entry_price,
+        "sl_price": sl_price,
+        "tp_price": tp_price,
+        "exit_idx": exit_idx,
+        "exit_price": exit_price,
+        "reason": reason,
+    }
+
+
+def simulate_trades(
+    df: pd.DataFrame, cfg, initial_equity: float = 10000.0, hold_bars: int = 1
+) -> list[dict]:
+    """
+    Vectorized simulation of the FVG breakout strategy.
+
+    Entry signals and SL/TP/time exits are computed as whole arrays; only the
+    selection of non-overlapping positions and equity-based sizing loop over
+    trades. Produces the same trade list as simulate_trades_loop.
+    """
+    _validate_risk_parameters(cfg)
+    signal_idx = np.flatnonzero(entry_signals(df, cfg.LOOKBACK))
+    exits = resolve_exits(
+        df, signal_idx, cfg.STOP_LOSS_PERCENT, cfg.TAKE_PROFIT_PERCENT, hold_bars
+    )
+
+    positions = []
+    equity = initial_equity
+    next_bar = cfg.LOOKBACK
+    while True:
+        k = np.searchsorted(signal_idx, next_bar)
+        if k >= len(signal_idx) or exits["exit_idx"][k] < 0:
+            break
+        entry_price = exits["entry_price"][k]
+        exit_price = exits["exit_price"][k]
+        size = calculate_position_size(
+            equity, cfg.RISK_PER_TRADE, entry_price, exits["sl_price"][k]
+        )
+        pnl = size * (exit_price - entry_price)
+        equity += pnl
+        positions.append(
+            _trade_record(
+                int(exits["entry_idx"][k]),
+                int(exits["exit_idx"][k]),
+                entry_price,
+                exit_price,
+                size,
+                pnl,
+                equity,
+                exits["reason"][k],
+            )
+        )
+        next_bar = exits["exit_idx"][k] + 1
+
+    return positions
+
+
+class StreamingBacktest:
+    """
+    simulate_trades over OHLCV data that arrives in chunks.
+
+    Between chunks only the rows later bars still depend on are kept: the
+    FVG window before the next bar that may enter, and the bars of a
+    position that is still open at the chunk boundary. Equity and indicator
+    state (IncrementalIndicators) carry over, so feeding every chunk of a
+    frame produces the same trade list as backtest_dataframe on the whole
+    frame while memory stays bounded by the chunk size.
+    """
+
+    def __init__(self, cfg, initial_equity: float = 10000.0, hold_bars: int = 1):
+        _validate_risk_parameters(cfg)
+        self.cfg = cfg
+        self.hold_bars = hold_bars
+        self.equity = initial_equity
+        self.indicators = IncrementalIndicators.from_config(cfg)
+        self.positions: list[dict] = []
+        self.rows = 0
+        self._tail: Optional[pd.DataFrame] = None
+        self._base = 0  # Global index of the first tail row
+        self._next_bar = cfg.LOOKBACK  # Global index of the next possible signal
+
+    def feed(self, chunk: pd.DataFrame) -> list[dict]:
+        """
+        Process the next chunk of candles and return the trades it closed.
+        """
+        chunk = chunk[list(OHLCV_COLUMNS)].reset_index(drop=True)
+        chunk = self.indicators.update_frame(chunk)
+        self.rows += len(chunk)
+        if self._tail is not None:
+            chunk = pd.concat([self._tail, chunk], ignore_index=True)
+        window = add_fvg_columns(chunk, self.cfg.LOOKBACK)
+
+        signal_idx = np.flatnonzero(entry_signals(window, self.cfg.LOOKBACK))
+        exits = resolve_exits(
+            window,
+            signal_idx,
+            self.cfg.STOP_LOSS_PERCENT,
+            self.cfg.TAKE_PROFIT_PERCENT,
+            self.hold_bars,
+        )
+        closed = []
+        next_bar = self._next_bar - self._base
+        while True:
+            k = np.searchsorted(signal_idx, next_bar)
+            if k >= len(signal_idx):
+                # The last bar has no next open yet and is checked again
+                next_bar = max(next_bar, len(window) - 1)
+                break
+            if exits["exit_idx"][k] < 0:
+                # Exit lies beyond this chunk; replay the entry with more data
+                next_bar = int(signal_idx[k])
+                break
+            entry_price = exits["entry_price"][k]
+            exit_price = exits["exit_price"][k]
+            size = calculate_position_size(
+                self.equity, self.cfg.RISK_PER_TRADE, entry_price, exits["sl_price"][k]
+            )
+            pnl = size * (exit_price - entry_price)
+            self.equity += pnl
+            closed.append(
+                _trade_record(
+                    int(exits["entry_idx"][k]) + self._base,
+                    int(exits["exit_idx"][k]) + self._base,
+                    entry_price,
+                    exit_price,
+                    size,
+                    pnl,
+                    self.equity,
+                    exits["reason"][k],
+                )
+            )
+            next_bar = int(exits["exit_idx"][k]) + 1
+
+        keep_from = max(next_bar - self.cfg.LOOKBACK - 2, 0)
+        self._tail = chunk.iloc[keep_from:].reset_index(drop=True)
+        self._base += keep_from
+        self._next_bar = self._base + next_bar - keep_from
+        self.positions.extend(closed)
+        return closed
+
+
+def backtest_stream(
+    chunks: Iterable[pd.DataFrame],
+    cfg,
+    initial_equity: float = 10000.0,
+    hold_bars: int = 1,
+) -> list[dict]:
+    """
+    Run StreamingBacktest over an iterable of consecutive OHLCV chunks.
+    """
+    backtest = StreamingBacktest(cfg, initial_equity, hold_bars)
+    for chunk in chunks:
+        backtest.feed(chunk)
+    return backtest.positions
+
+
+def load_ohlcv(data_file: str) -> pd.DataFrame:
+    """
+    Load OHLCV candles from a CSV file with a timestamp column.
+    """
+    return pd.read_csv(data_file, parse_dates=["timestamp"])
+
+
+def backtest_dataframe(
+    df: pd.DataFrame,
+    cfg,
+    initial_equity: float = 10000.0,
+    hold_bars: int = 1,
+    cache: Optional[IndicatorCache] = None,
+    fingerprint: Optional[str] = None,
+) -> list[dict]:
+    """
+    Calculate indicators for raw OHLCV data and simulate the strategy on it.
+
+    :param cache: Reuse indicator columns across calls through this cache
+    :param fingerprint: Precomputed data fingerprint of df for the cache
+    """
+    indicator_args = {
+        "ema_length": cfg.EMA_LENGTH,
+        "volume_multiplier": cfg.VOLUME_MULTIPLIER,
+        "trading_start_hour": cfg.TRADING_START_HOUR,
+        "trading_end_hour": cfg.TRADING_END_HOUR,
+        "backend": cfg.INDICATOR_BACKEND,
+    }
+    if cache is None:
+        df = calculate_indicators(df, **indicator_args)
+    else:
+        df = cached_calculate_indicators(
+            df, **indicator_args, cache=cache, fingerprint=fingerprint
+        )
+    df = add_fvg_columns(df, cfg.LOOKBACK)
+    return simulate_trades(df, cfg, initial_equity, hold_bars)
+
+
+def trade_statistics(positions: list[dict], initial_equity: float) -> dict:
+    """
+    Summarize a trade list: total PnL, final equity, maximum drawdown as a
+    fraction of the equity peak, and the per-trade Sharpe ratio of returns.
+    """
+    pnl = np.array([p["pnl"] for p in positions], dtype=float)
+    equity = initial_equity + np.concatenate(([0.0], np.cumsum(pnl)))
+    peaks = np.maximum.accumulate(equity)
+    drawdown = float(np.max((peaks - equity) / peaks))
+    returns = pnl / equity[:-1]
+    std = returns.std(ddof=1) if len(returns) > 1 else 0.0
+    sharpe = float(returns.mean() / std) if std > 0 else 0.0
+    return {
+        "trades": len(positions),
+        "total_pnl": float(pnl.sum()),
+        "final_equity": float(equity[-1]),
+        "max_drawdown": drawdown,
+        "sharpe": sharpe,
+    }
+
+
+def run_backtest(
+    data_file: Optional[str],
+    config_file: str,
+    initial_equity: float = 10000.0,
+    hold_bars: int = 1,
+    store_dir: Optional[str] = None,
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+    chunksize: Optional[int] = None,
+):
+    """
+    Backtest with position sizing, stop-loss and take-profit based on risk parameters.
+
+    :param data_file: CSV file with OHLCV data, ignored when store_dir is set
+    :param config_file: Path to config.json for strategy parameters
+    :param initial_equity: Starting account equity
+    :param hold_bars: Number of candles to hold a position if TP/SL not hit
+    :param store_dir: OHLCVStore directory to read cfg.SYMBOL/cfg.TIMEFRAME from
+    :param start: Inclusive start of the store date range
+    :param end: Exclusive end of the store date range
+    :param chunksize: Stream the data in chunks of this many CSV rows (one
+        month per chunk for a store) instead of loading it at once
+    """
+    cfg = load_config(config_file)
+    if chunksize:
+        if store_dir:
+            chunks = OHLCVStore(store_dir).iter_months(
+                cfg.SYMBOL, cfg.TIMEFRAME, start, end
+            )
+        else:
+            chunks = pd.read_csv(
+                data_file, parse_dates=["timestamp"], chunksize=chunksize
+            )
+        positions = backtest_stream(chunks, cfg, initial_equity, hold_bars)
+    else:
+        if store_dir:
+            df = OHLCVStore(store_dir).read(cfg.SYMBOL, cfg.TIMEFRAME, start, end)
+        else:
+            df = load_ohlcv(data_file)
+        positions = backtest_dataframe(df, cfg, initial_equity, hold_bars)
+    equity = positions[-1]["equity"] if positions else initial_equity
+
     results = pd.DataFrame(positions)
     results["cumulative_pnl"] = results["pnl"].cumsum()
 
@@ -136,10 +483,14 @@ if __name__ == "__main__":
     parser = argparse.ArgumentParser(
         description="Backtest strategy with SL/TP and risk sizing"
     )
-    parser.add_argument("-d", "--data-file", required=True, help="CSV with OHLCV data")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("-d", "--data-file", help="CSV with OHLCV data")
+    source.add_argument("--store", help="OHLCVStore directory with the config symbol")
     parser.add_argument(
         "-c", "--config", default="config.json", help="Path to config.json"
     )
+    parser.add_argument("--start", default=None, help="Store range start, inclusive")
+    parser.add_argument("--end", default=None, help="Store range end, exclusive")
     parser.add_argument(
         "-ie",
         "--initial-equity",
@@ -154,6 +505,21 @@ if __name__ == "__main__":
         default=1,
         help="Candles to hold position if no SL/TP",
     )
+    parser.add_argument(
+        "--chunksize",
+        type=int,
+        default=None,
+        help="Stream the data in chunks of this many rows",
+    )
     args = parser.parse_args()
 
-    run_backtest(args.data_file, args.config, args.initial_equity, args.hold_bars)
+    run_backtest(
+        args.data_file,
+        args.config,
+        args.initial_equity,
+        args.hold_bars,
+        store_dir=args.store,
+        start=args.start,
+        end=args.end,
+        chunksize=args.chunksize,
+    )
@@ -46,6 +46,33 @@ class BotConfig(BaseModel):
     TAKE_PROFIT_PERCENT: Optional[float] = None
     RISK_PER_TRADE: Optional[float] = None
 
+    # Indicator implementation: "ta" (default) or "numpy"
+    INDICATOR_BACKEND: Optional[str] = None
+
+    # Optional exchange markets cache for fast startup
+    MARKETS_CACHE_FILE: Optional[str] = None
+    MARKETS_CACHE_TTL: Optional[float] = None
+
+    # Candles replayed by the "paper" exchange: a CSV file or an OHLCVStore
+    # directory; the first LIMIT candles are closed when a run starts
+    PAPER_CANDLES: Optional[str] = None
+
+    # Optional per-symbol overrides for the multi-symbol runner,
+    # e.g. {"ETH/USD": {"LOOKBACK": 3}}
+    SYMBOLS: Optional[dict[str, dict]] = None
+
+    # Optional WebSocket market data; protocol "json" (default) or "bitfinex"
+    MARKET_STREAM_URL: Optional[str] = None
+    MARKET_STREAM_PROTOCOL: Optional[str] = None
+
+    # Optional shared exchange rate limit, defaults to ccxt's rateLimit;
+    # weights map ccxt API paths to their cost, a state file shares the
+    # budget with other processes
+    RATE_LIMIT_PER_SECOND: Optional[float] = None
+    RATE_LIMIT_BURST: Optional[float] = None
+    RATE_LIMIT_WEIGHTS: Optional[dict[str, float]] = None
+    RATE_LIMIT_STATE_FILE: Optional[str] = None
+
     # Optional test flags
     TEST_BUY_ORDER: Optional[bool] = None
     TEST_SELL_ORDER: Optional[bool] = None
@@ -59,6 +86,19 @@ class BotConfig(BaseModel):
     EMAIL_RECEIVER: Optional[str] = None
     EMAIL_PASSWORD: Optional[str] = None
 
+    # Seconds between dashboard balance refreshes while nothing trades
+    METRICS_BALANCE_TTL: Optional[float] = None
+
+    # Optional dashboard response cache TTLs in seconds by route path,
+    # e.g. {"/api/price": 2}; 0 disables caching for a route
+    RESPONSE_CACHE_TTLS: Optional[dict[str, float]] = None
+
+    # Price ticks kept for /api/price/history, default 1,000,000
+    PRICE_HISTORY_CAPACITY: Optional[int] = None
+
+    # Dashboard server: "flask" (default) or "asgi" (needs uvicorn)
+    DASHBOARD_SERVER: Optional[str] = None
+
     # Optional monitoring ports
     METRICS_PORT: Optional[int] = None
     HEALTH_PORT: Optional[int] = None
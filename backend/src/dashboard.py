@@ -4,23 +4,48 @@ import sys
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
 import atexit
+import functools
 import json
 import logging
 import signal
 import socket
-import threading
 import time
 from datetime import datetime
 from logging.handlers import RotatingFileHandler
 
 import pandas as pd
 from colorama import Back, Fore, Style, init
-from flask import Flask, jsonify, render_template, request
+from flask import (
+    Flask,
+    Response,
+    jsonify,
+    render_template,
+    request,
+    stream_with_context,
+)
 from flask_cors import CORS
 
 from .config_loader import load_config
 from .modules.indicators import calculate_indicators
-from .modules.orders import fetch_balance, init_exchange, place_order
+from .modules.event_stream import EventHub
+from .modules.market_stream import (
+    MarketDataStream,
+    PubSub,
+    candle_topic,
+    ticker_topic,
+)
+from .modules.metrics import MetricsAggregator
+from .modules.orders import (
+    client_registry,
+    fetch_balance,
+    init_exchange,
+    place_order,
+    rate_limit_lane,
+    rate_limiter_stats,
+    submit_order,
+)
+from .modules.price_history import DOWNSAMPLING_METHODS, RingBuffer
+from .modules.response_cache import ResponseCache
 from .tradingbot import TradingBot
 
 # Initialize colorama for Windows
@@ -142,8 +167,148 @@ logger.debug("Loading configuration...")
 cfg = load_config()
 logger.debug("Configuration loaded: %s", cfg)
 
+
+def fetch_account_balance() -> dict:
+    """Balance for the metrics aggregator; probes the client on failure"""
+    exchange = init_exchange(cfg.API_KEY, cfg.API_SECRET, cfg.EXCHANGE)
+    try:
+        # Polling queues behind orders on the shared rate limit
+        with rate_limit_lane("background"):
+            return fetch_balance(exchange)
+    except Exception:
+        # A failed probe reconnects the shared client's session
+        client_registry.check_health(cfg.API_KEY, cfg.API_SECRET, cfg.EXCHANGE)
+        raise
+
+
+# Trade totals pushed by the bot; the balance is refreshed after changes
+metrics = MetricsAggregator(
+    fetch_account_balance, balance_ttl=cfg.METRICS_BALANCE_TTL or 300.0
+)
+
 # Initialize trading bot
-bot = TradingBot(cfg)
+bot = TradingBot(cfg, metrics=metrics)
+
+# Candle window shared by /api/ohlcv and the bot
+candle_cache = bot.candles
+
+# Streamed tickers and candles, when MARKET_STREAM_URL is configured
+market_data = PubSub()
+market_stream = None
+if cfg.MARKET_STREAM_URL:
+    market_stream = MarketDataStream(
+        cfg.MARKET_STREAM_URL,
+        [cfg.SYMBOL],
+        cfg.TIMEFRAME,
+        protocol=cfg.MARKET_STREAM_PROTOCOL,
+        pubsub=market_data,
+        candle_cache=candle_cache,
+    )
+
+# Streamed tickers older than this fall back to REST
+STREAM_TICKER_MAX_AGE_MS = 5000
+
+# Ticks behind /api/price/history, fed by /api/price and the market stream
+price_history = RingBuffer(cfg.PRICE_HISTORY_CAPACITY or 1_000_000)
+
+# Points returned by /api/price/history by default and at most
+PRICE_HISTORY_POINTS = 1000
+PRICE_HISTORY_MAX_POINTS = 10_000
+
+# Pushes prices, candles, metrics and trades to /api/stream clients
+events = EventHub()
+
+
+def price_payload(ticker: dict) -> dict:
+    return {
+        "price": ticker["last"],
+        "bid": ticker["bid"],
+        "ask": ticker["ask"],
+        "volume": ticker["baseVolume"],
+        "timestamp": ticker["timestamp"],
+    }
+
+
+def record_ticker(ticker: dict):
+    """Add a ticker to the price history"""
+    price_history.append(
+        ticker["timestamp"] or int(time.time() * 1000), float(ticker["last"])
+    )
+
+
+def publish_metrics_event(event: str, data):
+    """Forward a MetricsAggregator change to stream clients"""
+    if event == "trade":
+        events.publish("trade", data)
+    elif event == "metrics":
+        events.publish("metrics", data, key="metrics", merge=True)
+    elif event == "position":
+        events.publish("position", {"position": data}, key="position")
+    else:
+        events.publish(event, data, key=event)
+
+
+metrics.add_listener(publish_metrics_event)
+market_data.add_callback(
+    ticker_topic(cfg.SYMBOL),
+    lambda ticker: events.publish("price", price_payload(ticker), key="price"),
+)
+market_data.add_callback(ticker_topic(cfg.SYMBOL), record_ticker)
+market_data.add_callback(
+    candle_topic(cfg.SYMBOL, cfg.TIMEFRAME),
+    lambda candle: events.publish(
+        "candle",
+        {"symbol": cfg.SYMBOL, "timeframe": cfg.TIMEFRAME, "candle": candle},
+    ),
+)
+
+# Rendered read responses, shared by concurrent requests and revalidated
+# with ETags, so polling browsers don't drive exchange calls or file reads
+response_cache = ResponseCache()
+
+# Seconds a rendered response is reused by route; writes invalidate sooner
+RESPONSE_CACHE_TTLS = {
+    "/api/price": 1.0,
+    "/api/ohlcv": 5.0,
+    "/api/metrics": 2.0,
+    "/api/trades": 5.0,
+    "/api/settings": 60.0,
+    "/api/price/history": 1.0,
+    **(cfg.RESPONSE_CACHE_TTLS or {}),
+}
+
+
+def cached_response(view):
+    """Serve a GET view from response_cache, with 304s for If-None-Match"""
+
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        ttl = RESPONSE_CACHE_TTLS.get(request.path)
+        if not ttl:
+            return view(*args, **kwargs)
+
+        def render():
+            response = app.make_response(view(*args, **kwargs))
+            return response.get_data(), response.status_code, response.content_type
+
+        entry = response_cache.get(request.full_path, ttl, render)
+        if entry.status != 200:
+            return Response(entry.body, entry.status, content_type=entry.content_type)
+        if entry.not_modified(request.headers.get("If-None-Match")):
+            return Response(status=304, headers=entry.headers())
+        return Response(
+            entry.body, content_type=entry.content_type, headers=entry.headers()
+        )
+
+    return wrapper
+
+
+def invalidate_cached_metrics(event: str, data):
+    """Drop cached metrics and trades once the aggregator changes"""
+    response_cache.invalidate("/api/metrics", "/api/trades")
+
+
+metrics.add_listener(invalidate_cached_metrics)
 
 
 def print_banner():
@@ -201,6 +366,9 @@ def cleanup():
         # Stop the bot if it's running
         if bot.is_running:
             bot.stop()
+        if market_stream is not None:
+            market_stream.stop()
+        events.close()
         # Kill any process using our port
         if os.name == "nt":  # Windows
             os.system(
@@ -262,59 +430,17 @@ trading_state = {
     "trade_history": [],
     "pnl_history": [],
     "price_alerts": [],
-    "price_history": [],
 }
 
 
-def update_metrics():
-    """Background thread to update metrics"""
-    logger.info("=== Starting Metrics Update Thread ===")
-    while True:
-        try:
-            logger.info("--- Metrics Update Cycle Start ---")
-            # Update balance
-            logger.info("Initializing exchange for balance update...")
-            exchange = init_exchange(cfg.API_KEY, cfg.API_SECRET, cfg.EXCHANGE)
-            logger.info(f"Exchange initialized: {cfg.EXCHANGE}")
-
-            logger.info("Fetching current balance...")
-            balance = fetch_balance(exchange)
-            logger.info(f"Balance fetched: {json.dumps(balance, indent=2)}")
-
-            # Update trading state
-            logger.info("Updating trading state...")
-            trading_state["is_running"] = bot.is_running
-            trading_state["current_position"] = bot.current_position
-            trading_state["balance"] = balance
-            trading_state["last_update"] = bot.last_update
-
-            # Calculate metrics
-            logger.info("Calculating trading metrics...")
-            total_trades = len(bot.trade_history)
-            winning_trades = len([t for t in bot.trade_history if t["pnl"] > 0])
-            losing_trades = len([t for t in bot.trade_history if t["pnl"] <= 0])
-            total_pnl = sum(t["pnl"] for t in bot.trade_history)
-            win_rate = winning_trades / total_trades if total_trades > 0 else 0
-
-            trading_state["metrics"] = {
-                "total_trades": total_trades,
-                "winning_trades": winning_trades,
-                "losing_trades": losing_trades,
-                "total_pnl": total_pnl,
-                "win_rate": win_rate,
-            }
-
-            logger.info(
-                f"Metrics updated: {json.dumps(trading_state['metrics'], indent=2)}"
-            )
-            logger.info("--- Metrics Update Cycle Complete ---")
-
-        except Exception as e:
-            logger.error(f"Error in update_metrics: {e}", exc_info=True)
-            time.sleep(5)  # Wait before retrying
-            continue
-
-        time.sleep(5)  # Update every 5 seconds
+def update_trading_state():
+    """Copy the aggregated metrics into trading_state"""
+    snapshot = metrics.snapshot()
+    trading_state["is_running"] = bot.is_running
+    trading_state["current_position"] = snapshot["current_position"]
+    trading_state["balance"] = snapshot["balance"]
+    trading_state["last_update"] = bot.last_update
+    trading_state["metrics"] = snapshot["metrics"]
 
 
 @app.route("/")
@@ -331,12 +457,13 @@ def index():
 
 
 @app.route("/api/metrics", methods=["GET"])
+@cached_response
 def get_metrics():
     """Get current metrics"""
     logger.info("=== Metrics Request ===")
     try:
         log_request_info()
-        logger.info(f"Current trading state: {json.dumps(trading_state, indent=2)}")
+        update_trading_state()
         return jsonify(trading_state)
     except Exception as e:
         logger.error(f"Error fetching metrics: {e}", exc_info=True)
@@ -349,12 +476,18 @@ def health_check():
     logger.info("=== Health Check Request ===")
     try:
         log_request_info()
+        update_trading_state()
         health_status = {
             "status": "healthy",
             "last_update": trading_state["last_update"],
             "bot_running": bot.is_running,
             "exchange_connected": bool(trading_state["balance"]),
             "current_position": bool(trading_state["current_position"]),
+            "exchange_clients": client_registry.health(),
+            "rate_limits": rate_limiter_stats(),
+            "event_stream": events.stats(),
+            "response_cache": response_cache.stats(),
+            "price_history": price_history.stats(),
         }
         logger.info(f"Health status: {json.dumps(health_status, indent=2)}")
         return jsonify(health_status)
@@ -363,71 +496,82 @@ def health_check():
         return jsonify({"error": str(e)}), 500
 
 
+def validate_trade(data: dict):
+    """Error message for an invalid /api/trade request, None if valid"""
+    trade_type = data.get("type")
+    amount = data.get("amount")
+
+    if not trade_type or not amount:
+        return "Missing trade type or amount"
+
+    if trade_type not in ["buy", "sell"]:
+        return "Invalid trade type"
+
+    if amount <= 0:
+        return "Amount must be greater than 0"
+    return None
+
+
+def trade_order_args(data: dict) -> tuple:
+    """submit_order arguments after the exchange for a valid trade request"""
+    return (
+        cfg.SYMBOL,
+        data["type"],
+        data["amount"],
+        data.get("order_type", "market"),
+        data.get("price"),
+        data.get("stop_price"),
+    )
+
+
+def record_manual_trade(data: dict, order: dict) -> dict:
+    """Record a placed /api/trade order, returns the response payload"""
+    trade_type = data["type"]
+    amount = data["amount"]
+
+    # Create trade record
+    trade = {
+        "timestamp": datetime.now().isoformat(),
+        "type": trade_type,
+        "entry_price": order.get("price", 0),
+        "size": amount,
+        "pnl": 0,  # Will be calculated when position is closed
+    }
+
+    # Update trading state; the bot's trade totals and position are left
+    # alone, the fill only changes the balance
+    trading_state["is_running"] = True
+    trading_state["last_update"] = datetime.now().isoformat()
+    metrics.mark_balance_stale()
+
+    # Add to trade history
+    trading_state["trade_history"].append(trade)
+
+    return {
+        "message": f"Successfully executed {trade_type} order for {amount} BTC",
+        "order": order,
+        "trade": trade,
+    }
+
+
 @app.route("/api/trade", methods=["POST"])
 def execute_trade():
     try:
         data = request.get_json()
-        trade_type = data.get("type")
-        amount = data.get("amount")
-
-        if not trade_type or not amount:
-            return jsonify({"error": "Missing trade type or amount"}), 400
-
-        if trade_type not in ["buy", "sell"]:
-            return jsonify({"error": "Invalid trade type"}), 400
-
-        if amount <= 0:
-            return jsonify({"error": "Amount must be greater than 0"}), 400
+        error = validate_trade(data)
+        if error:
+            return jsonify({"error": error}), 400
 
         # Get the exchange instance
         exchange = init_exchange(cfg.API_KEY, cfg.API_SECRET, cfg.EXCHANGE)
 
         # Execute the trade
-        if trade_type == "buy":
-            order = exchange.create_market_buy_order(cfg.SYMBOL, amount)
-        else:
-            order = exchange.create_market_sell_order(cfg.SYMBOL, amount)
-
-        # Create trade record
-        trade = {
-            "timestamp": datetime.now().isoformat(),
-            "type": trade_type,
-            "entry_price": order.get("price", 0),
-            "size": amount,
-            "pnl": 0,  # Will be calculated when position is closed
-        }
-
-        # Update trading state
-        trading_state["is_running"] = True
-        trading_state["current_position"] = order
-        trading_state["balance"] = fetch_balance(exchange)
-        trading_state["last_update"] = datetime.now().isoformat()
-
-        # Add to trade history
-        trading_state["trade_history"].append(trade)
-
-        # Update metrics
-        trading_state["metrics"]["total_trades"] += 1
-        if trade.get("pnl", 0) > 0:
-            trading_state["metrics"]["winning_trades"] += 1
-        else:
-            trading_state["metrics"]["losing_trades"] += 1
-        trading_state["metrics"]["total_pnl"] += trade.get("pnl", 0)
-        trading_state["metrics"]["win_rate"] = (
-            trading_state["metrics"]["winning_trades"]
-            / trading_state["metrics"]["total_trades"]
-            * 100
-            if trading_state["metrics"]["total_trades"] > 0
-            else 0
-        )
+        try:
+            order = submit_order(exchange, *trade_order_args(data))
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
 
-        return jsonify(
-            {
-                "message": f"Successfully executed {trade_type} order for {amount} BTC",
-                "order": order,
-                "trade": trade,
-            }
-        )
+        return jsonify(record_manual_trade(data, order))
 
     except Exception as e:
         logger.error(f"Error executing trade: {str(e)}")
@@ -460,6 +604,7 @@ def control_bot():
             logger.info(f"Bot stop {'successful' if success else 'failed'}")
 
         logger.info(f"Bot running status: {bot.is_running}")
+        response_cache.invalidate("/api/metrics")
         return jsonify({"success": success, "is_running": bot.is_running})
     except Exception as e:
         error_msg = f"Error controlling bot: {str(e)}"
@@ -468,23 +613,18 @@ def control_bot():
 
 
 @app.route("/api/ohlcv")
+@cached_response
 def get_ohlcv():
     """Get OHLCV data for charts"""
     logger.info("=== OHLCV Data Request ===")
     try:
         log_request_info()
-        logger.info("Initializing exchange for OHLCV data...")
-        exchange = init_exchange(cfg.API_KEY, cfg.API_SECRET, cfg.EXCHANGE)
-
         logger.info(
             f"Fetching OHLCV data for {cfg.SYMBOL} on {cfg.TIMEFRAME} timeframe..."
         )
-        ohlcv = exchange.fetch_ohlcv(cfg.SYMBOL, cfg.TIMEFRAME, limit=cfg.LIMIT)
-        logger.info(f"Fetched {len(ohlcv)} candles")
+        df = candle_cache.get(cfg.SYMBOL, cfg.TIMEFRAME, cfg.LIMIT)
+        logger.info(f"Fetched {len(df)} candles")
 
-        df = pd.DataFrame(
-            ohlcv, columns=["timestamp", "open", "high", "low", "close", "volume"]
-        )
         df["datetime"] = pd.to_datetime(df["timestamp"], unit="ms", utc=True)
 
         logger.info(f"OHLCV data processed. First candle: {df.iloc[0].to_dict()}")
@@ -497,7 +637,20 @@ def get_ohlcv():
         return jsonify([])
 
 
+@app.route("/api/stream")
+def stream_events():
+    """Server-Sent Events: price, candle, metrics, position, balance, trade"""
+    wanted = request.args.get("events")
+    client = events.connect(wanted.split(",") if wanted else None)
+    return Response(
+        stream_with_context(events.stream(client)),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @app.route("/api/trades")
+@cached_response
 def get_trades():
     """Get trade history"""
     logger.info("=== Trade History Request ===")
@@ -525,6 +678,7 @@ def save_config(config_dict):
 
 
 @app.route("/api/settings", methods=["GET"])
+@cached_response
 def get_settings():
     # Ladda endast från filen för att skicka till frontend
     try:
@@ -575,6 +729,7 @@ def update_settings():
 
         # Spara det uppdaterade dictionaryt till filen
         if save_config(config_dict):
+            response_cache.invalidate("/api/settings")
             return jsonify({"status": "success", "message": "Settings updated"})
         else:
             return (
@@ -611,37 +766,38 @@ def toggle_bot():
         return jsonify({"status": "error", "message": str(e)}), 500
 
 
+def streamed_ticker():
+    """The streamed ticker, None if there is none or it is too old"""
+    ticker = market_data.latest(ticker_topic(cfg.SYMBOL))
+    if (
+        ticker is None
+        or time.time() * 1000 - ticker["timestamp"] > STREAM_TICKER_MAX_AGE_MS
+    ):
+        return None
+    return ticker
+
+
+def record_price(ticker: dict) -> dict:
+    """Add a fetched ticker to the price history, returns the payload"""
+    record_ticker(ticker)
+    logger.info(f"Current price: {ticker['last']}")
+    payload = price_payload(ticker)
+    events.publish("price", payload, key="price")
+    return payload
+
+
 @app.route("/api/price", methods=["GET"])
+@cached_response
 def get_current_price():
     """Get current price"""
     logger.info("=== Price Request ===")
     try:
         log_request_info()
-        exchange = init_exchange(cfg.API_KEY, cfg.API_SECRET, cfg.EXCHANGE)
-        ticker = exchange.fetch_ticker(cfg.SYMBOL)
-
-        current_price = ticker["last"]
-        timestamp = ticker["timestamp"]
-
-        # Add to price history
-        trading_state["price_history"].append(
-            {"price": current_price, "timestamp": timestamp}
-        )
-
-        # Keep only last 1000 price points
-        if len(trading_state["price_history"]) > 1000:
-            trading_state["price_history"] = trading_state["price_history"][-1000:]
-
-        logger.info(f"Current price: {current_price}")
-        return jsonify(
-            {
-                "price": current_price,
-                "bid": ticker["bid"],
-                "ask": ticker["ask"],
-                "volume": ticker["baseVolume"],
-                "timestamp": timestamp,
-            }
-        )
+        ticker = streamed_ticker()
+        if ticker is None:
+            exchange = init_exchange(cfg.API_KEY, cfg.API_SECRET, cfg.EXCHANGE)
+            ticker = exchange.fetch_ticker(cfg.SYMBOL)
+        return jsonify(record_price(ticker))
     except Exception as e:
         logger.error(f"Error fetching price: {str(e)}")
         return jsonify({"error": str(e)}), 500
@@ -672,12 +828,40 @@ def add_price_alert():
 
 
 @app.route("/api/price/history", methods=["GET"])
+@cached_response
 def get_price_history():
-    """Get price history"""
+    """Get price history between start and end (ms), downsampled to max_points"""
     logger.info("=== Price History Request ===")
     try:
         log_request_info()
-        return jsonify(trading_state["price_history"])
+        args = request.args
+        try:
+            start = int(args["start"]) if "start" in args else None
+            end = int(args["end"]) if "end" in args else None
+            max_points = int(args.get("max_points", PRICE_HISTORY_POINTS))
+        except ValueError:
+            return jsonify({"error": "start, end and max_points must be integers"}), 400
+        if not 2 <= max_points <= PRICE_HISTORY_MAX_POINTS:
+            return (
+                jsonify(
+                    {"error": f"max_points must be 2 to {PRICE_HISTORY_MAX_POINTS}"}
+                ),
+                400,
+            )
+        method = args.get("method", "lttb")
+        if method not in DOWNSAMPLING_METHODS:
+            return (
+                jsonify({"error": f"method must be one of {DOWNSAMPLING_METHODS}"}),
+                400,
+            )
+
+        timestamps, prices = price_history.query(start, end, max_points, method)
+        return jsonify(
+            [
+                {"price": price, "timestamp": timestamp}
+                for timestamp, price in zip(timestamps.tolist(), prices.tolist())
+            ]
+        )
     except Exception as e:
         logger.error(f"Error fetching price history: {str(e)}")
         return jsonify({"error": str(e)}), 500
@@ -703,14 +887,24 @@ def start_dashboard():
         # Print startup banner
         print_banner()
 
-        # Start metrics update thread
-        metrics_thread = threading.Thread(target=update_metrics, daemon=True)
-        metrics_thread.start()
-        logger.info("Metrics update thread started")
+        if market_stream is not None:
+            market_stream.start_in_thread()
+            logger.info(f"Market stream started: {cfg.MARKET_STREAM_URL}")
+
+        # Keep the balance fresh after trades, or on a slow TTL
+        metrics.start_balance_refresher()
+        logger.info("Balance refresher started")
 
         # Register cleanup function to run on exit
         atexit.register(cleanup)
 
+        if cfg.DASHBOARD_SERVER == "asgi":
+            from .dashboard_asgi import serve
+
+            logger.info(f"Starting ASGI server on port {cfg.METRICS_PORT}")
+            serve(sys.modules[__name__], "127.0.0.1", cfg.METRICS_PORT)
+            return True
+
         # Start Flask server
         logger.info(f"Starting Flask server on port {cfg.METRICS_PORT}")
         app.run(host="127.0.0.1", port=cfg.METRICS_PORT, debug=True, use_reloader=False)
@@ -0,0 +1,119 @@
+"""
+ASGI serving mode for the dashboard API.
+The routes that wait on the exchange (/api/price, /api/trade) and the
+/api/stream event feed run as coroutines on one event loop, with an asyncio
+ccxt client, so slow upstream calls don't each hold a thread. All other
+routes are the Flask views of dashboard.py, served on a bounded thread pool.
+Enable with "DASHBOARD_SERVER": "asgi" in config.json; needs uvicorn.
+"""
+
+import logging
+from types import ModuleType
+from typing import Optional
+
+from .modules.asgi import ASGIApp, Request, Response, StreamingResponse
+from .modules.orders import create_async_exchange, rate_limit_lane, submit_order_async
+
+logger = logging.getLogger(__name__)
+
+
+def create_app(dashboard: ModuleType, max_workers: int = 16) -> ASGIApp:
+    """
+    The ASGI app of a loaded dashboard module.
+
+    :param max_workers: Threads serving the Flask routes
+    """
+    cfg = dashboard.cfg
+    clients: dict[str, object] = {}
+
+    def exchange():
+        # One asyncio client for the life of the event loop
+        if "exchange" not in clients:
+            clients["exchange"] = create_async_exchange(
+                cfg.API_KEY, cfg.API_SECRET, cfg.EXCHANGE
+            )
+        return clients["exchange"]
+
+    async def close_exchange():
+        client = clients.pop("exchange", None)
+        if client is not None:
+            await client.close()
+
+    app = ASGIApp(dashboard.app.wsgi_app, max_workers, on_shutdown=[close_exchange])
+
+    def json_body(data) -> bytes:
+        # Same encoding as Flask's jsonify
+        return (dashboard.app.json.dumps(data) + "\n").encode()
+
+    async def cached(request: Request, render) -> Response:
+        ttl = dashboard.RESPONSE_CACHE_TTLS.get(request.path)
+        if not ttl:
+            body, status, content_type = await render()
+            return Response(body, status, content_type)
+        entry = await dashboard.response_cache.get_async(request.full_path, ttl, render)
+        if entry.status != 200:
+            return Response(entry.body, entry.status, entry.content_type)
+        if entry.not_modified(request.headers.get("if-none-match")):
+            return Response(status=304, content_type=None, headers=entry.headers())
+        return Response(entry.body, 200, entry.content_type, entry.headers())
+
+    @app.route("/api/price")
+    async def get_current_price(request: Request) -> Response:
+        async def render():
+            try:
+                ticker = dashboard.streamed_ticker()
+                if ticker is None:
+                    with rate_limit_lane("market_data"):
+                        ticker = await exchange().fetch_ticker(cfg.SYMBOL)
+                return (
+                    json_body(dashboard.record_price(ticker)),
+                    200,
+                    "application/json",
+                )
+            except Exception as e:
+                logger.error(f"Error fetching price: {str(e)}")
+                return json_body({"error": str(e)}), 500, "application/json"
+
+        return await cached(request, render)
+
+    @app.route("/api/trade", methods=["POST"])
+    async def execute_trade(request: Request) -> Response:
+        try:
+            data = request.json()
+            error = dashboard.validate_trade(data)
+            if error:
+                return Response(json_body({"error": error}), 400)
+            try:
+                order = await submit_order_async(
+                    exchange(), *dashboard.trade_order_args(data)
+                )
+            except ValueError as e:
+                return Response(json_body({"error": str(e)}), 400)
+            return Response(json_body(dashboard.record_manual_trade(data, order)))
+        except Exception as e:
+            logger.error(f"Error executing trade: {str(e)}")
+            return Response(json_body({"error": str(e)}), 500)
+
+    @app.route("/api/stream")
+    async def stream_events(request: Request) -> Response:
+        wanted: Optional[str] = request.args.get("events")
+        client = dashboard.events.connect(wanted.split(",") if wanted else None)
+        return StreamingResponse(
+            dashboard.events.stream_async(client),
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        )
+
+    return app
+
+
+def serve(dashboard: ModuleType, host: str, port: int):
+    """
+    Runs the dashboard's ASGI app with uvicorn until interrupted.
+    """
+    try:
+        import uvicorn
+    except ImportError as e:
+        raise RuntimeError(
+            "DASHBOARD_SERVER 'asgi' requires uvicorn: pip install uvicorn"
+        ) from e
+    uvicorn.run(create_app(dashboard), host=host, port=port, lifespan="on")
@@ -2,6 +2,40 @@
 Trading Bot Modules Package
 """
 
-from . import indicators, orders, utils
+from . import (
+    asgi,
+    candle_cache,
+    downloader,
+    event_stream,
+    incremental,
+    indicator_cache,
+    indicators,
+    kernels,
+    market_stream,
+    metrics,
+    ohlcv_store,
+    orders,
+    paper_exchange,
+    price_history,
+    response_cache,
+    utils,
+)
 
-__all__ = ["orders", "utils", "indicators"]
+__all__ = [
+    "orders",
+    "utils",
+    "indicators",
+    "indicator_cache",
+    "incremental",
+    "kernels",
+    "ohlcv_store",
+    "downloader",
+    "candle_cache",
+    "market_stream",
+    "paper_exchange",
+    "metrics",
+    "event_stream",
+    "response_cache",
+    "asgi",
+    "price_history",
+]
@@ -0,0 +1,290 @@
+"""
+Minimal ASGI application for serving the dashboard without blocking on I/O.
+Routes with a native async handler run on the event loop, so a slow
+exchange call only parks a coroutine. Every other request is passed to the
+Flask WSGI app on a bounded thread pool, so the thread count stays fixed
+however many requests are in flight.
+"""
+
+import asyncio
+import io
+import json
+import logging
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from typing import AsyncIterator, Awaitable, Callable, Iterable, Optional
+from urllib.parse import parse_qsl
+
+logger = logging.getLogger(__name__)
+
+
+class Request:
+    """
+    An HTTP request with its body read.
+    """
+
+    def __init__(self, scope: dict, body: bytes = b""):
+        self.scope = scope
+        self.method: str = scope["method"]
+        self.path: str = scope["path"]
+        self.query_string: str = scope.get("query_string", b"").decode("latin-1")
+        self.headers: dict[str, str] = {}
+        for name, value in scope.get("headers", []):
+            name = name.decode("latin-1").lower()
+            value = value.decode("latin-1")
+            if name in self.headers:
+                value = f"{self.headers[name]},{value}"
+            self.headers[name] = value
+        self.body = body
+
+    @property
+    def full_path(self) -> str:
+        """
+        Path and query as Flask's request.full_path, e.g. "/api/price?".
+        """
+        return f"{self.path}?{self.query_string}"
+
+    @property
+    def args(self) -> dict[str, str]:
+        return dict(parse_qsl(self.query_string))
+
+    def json(self):
+        return json.loads(self.body) if self.body else None
+
+
+class Response:
+    """
+    A complete response; body is bytes.
+    """
+
+    def __init__(
+        self,
+        body: bytes = b"",
+        status: int = 200,
+        content_type: Optional[str] = "application/json",
+        headers: Optional[dict[str, str]] = None,
+    ):
+        self.body = body
+        self.status = status
+        self.headers = dict(headers or {})
+        if content_type is not None:
+            self.headers.setdefault("Content-Type", content_type)
+
+    def raw_headers(self) -> list[tuple[bytes, bytes]]:
+        return [
+            (name.lower().encode("latin-1"), str(value).encode("latin-1"))
+            for name, value in self.headers.items()
+        ]
+
+
+class StreamingResponse(Response):
+    """
+    A response sent chunk by chunk until chunks ends or the client leaves.
+    """
+
+    def __init__(
+        self,
+        chunks: AsyncIterator[bytes],
+        status: int = 200,
+        content_type: str = "text/event-stream",
+        headers: Optional[dict[str, str]] = None,
+    ):
+        super().__init__(b"", status, content_type, headers)
+        self.chunks = chunks
+
+
+Handler = Callable[[Request], Awaitable[Response]]
+
+
+class ASGIApp:
+    """
+    Routes requests by method and path to async handlers, falling back to a
+    WSGI app run on at most max_workers threads.
+    """
+
+    def __init__(
+        self,
+        wsgi_app: Callable,
+        max_workers: int = 16,
+        on_startup: Iterable[Callable[[], Awaitable[None]]] = (),
+        on_shutdown: Iterable[Callable[[], Awaitable[None]]] = (),
+    ):
+        self.wsgi_app = wsgi_app
+        self.executor = ThreadPoolExecutor(max_workers, thread_name_prefix="wsgi")
+        self.on_startup = list(on_startup)
+        self.on_shutdown = list(on_shutdown)
+        self._routes: dict[tuple[str, str], Handler] = {}
+
+    def route(self, path: str, methods: Iterable[str] = ("GET",)):
+        """
+        Decorator registering an async handler(request) -> Response.
+        """
+
+        def register(handler: Handler) -> Handler:
+            for method in methods:
+                self._routes[(method, path)] = handler
+            return handler
+
+        return register
+
+    async def __call__(self, scope: dict, receive: Callable, send: Callable):
+        if scope["type"] == "lifespan":
+            await self._lifespan(receive, send)
+            return
+        if scope["type"] != "http":
+            raise RuntimeError(f"Unsupported ASGI scope type: {scope['type']}")
+        body = await self._read_body(receive)
+        handler = self._routes.get((scope["method"], scope["path"]))
+        if handler is None:
+            await self._call_wsgi(scope, body, send)
+            return
+        try:
+            response = await handler(Request(scope, body))
+        except Exception as e:
+            logger.error(f"Error in {scope['path']}: {e}", exc_info=True)
+            response = Response(json.dumps({"error": str(e)}).encode(), 500)
+        if isinstance(response, StreamingResponse):
+            await self._stream(response, receive, send)
+        else:
+            await send_response(response, send)
+
+    async def _lifespan(self, receive: Callable, send: Callable):
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                for hook in self.on_startup:
+                    await hook()
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                for hook in self.on_shutdown:
+                    await hook()
+                self.executor.shutdown(wait=False)
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    @staticmethod
+    async def _read_body(receive: Callable) -> bytes:
+        chunks = []
+        while True:
+            message = await receive()
+            if message["type"] == "http.disconnect":
+                break
+            chunks.append(message.get("body", b""))
+            if not message.get("more_body"):
+                break
+        return b"".join(chunks)
+
+    async def _stream(self, response: StreamingResponse, receive, send):
+        async def pump():
+            await send(
+                {
+                    "type": "http.response.start",
+                    "status": response.status,
+                    "headers": response.raw_headers(),
+                }
+            )
+            async for chunk in response.chunks:
+                await send(
+                    {"type": "http.response.body", "body": chunk, "more_body": True}
+                )
+            await send({"type": "http.response.body", "body": b""})
+
+        async def disconnected():
+            while (await receive())["type"] != "http.disconnect":
+                pass
+
+        # Whichever ends first, the stream or the client, stops the other
+        tasks = [asyncio.ensure_future(pump()), asyncio.ensure_future(disconnected())]
+        try:
+            await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            aclose = getattr(response.chunks, "aclose", None)
+            if aclose is not None:
+                await aclose()
+
+    async def _call_wsgi(self, scope: dict, body: bytes, send: Callable):
+        loop = asyncio.get_running_loop()
+        started = {}
+
+        def start_response(status, headers, exc_info=None):
+            started["status"] = int(status.split(" ", 1)[0])
+            started["headers"] = [
+                (name.lower().encode("latin-1"), value.encode("latin-1"))
+                for name, value in headers
+            ]
+            return lambda data: None
+
+        def first_chunk():
+            result = self.wsgi_app(wsgi_environ(scope, body), start_response)
+            chunks = iter(result)
+            # start_response may be deferred to the first chunk
+            return result, chunks, next(chunks, None)
+
+        result, chunks, chunk = await loop.run_in_executor(self.executor, first_chunk)
+        try:
+            await send(
+                {
+                    "type": "http.response.start",
+                    "status": started["status"],
+                    "headers": started["headers"],
+                }
+            )
+            while chunk is not None:
+                await send(
+                    {"type": "http.response.body", "body": chunk, "more_body": True}
+                )
+                chunk = await loop.run_in_executor(self.executor, next, chunks, None)
+            await send({"type": "http.response.body", "body": b""})
+        finally:
+            close = getattr(result, "close", None)
+            if close is not None:
+                await loop.run_in_executor(self.executor, close)
+
+
+async def send_response(response: Response, send: Callable):
+    await send(
+        {
+            "type": "http.response.start",
+            "status": response.status,
+            "headers": response.raw_headers(),
+        }
+    )
+    await send({"type": "http.response.body", "body": response.body})
+
+
+def wsgi_environ(scope: dict, body: bytes) -> dict:
+    """
+    The WSGI environ of an ASGI HTTP request (PEP 3333).
+    """
+    server = scope.get("server") or ("localhost", 80)
+    client = scope.get("client") or ("", 0)
+    environ = {
+        "REQUEST_METHOD": scope["method"],
+        "SCRIPT_NAME": scope.get("root_path", ""),
+        "PATH_INFO": scope["path"],
+        "QUERY_STRING": scope.get("query_string", b"").decode("latin-1"),
+        "SERVER_NAME": server[0],
+        "SERVER_PORT": str(server[1]),
+        "SERVER_PROTOCOL": f"HTTP/{scope.get('http_version', '1.1')}",
+        "REMOTE_ADDR": client[0],
+        "CONTENT_LENGTH": str(len(body)),
+        "wsgi.version": (1, 0),
+        "wsgi.url_scheme": scope.get("scheme", "http"),
+        "wsgi.input": io.BytesIO(body),
+        "wsgi.errors": sys.stderr,
+        "wsgi.multithread": True,
+        "wsgi.multiprocess": False,
+        "wsgi.run_once": False,
+    }
+    for name, value in scope.get("headers", []):
+        name = name.decode("latin-1").upper().replace("-", "_")
+        value = value.decode("latin-1")
+        if name not in ("CONTENT_TYPE", "CONTENT_LENGTH"):
+            name = f"HTTP_{name}"
+        if name in environ and name != "CONTENT_LENGTH":
+            value = f"{environ[name]},{value}"
+        environ[name] = value
+    return environ
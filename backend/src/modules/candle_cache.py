@@ -0,0 +1,161 @@
+"""
+Shared cache of recent candles per symbol and timeframe.
+After the first load only candles from the last cached timestamp onwards
+are requested, and the still-forming last bar is replaced in place.
+"""
+
+import threading
+import time
+from typing import Callable, Optional
+
+import numpy as np
+import pandas as pd
+
+CANDLE_COLUMNS = ["timestamp", "open", "high", "low", "close", "volume"]
+
+
+class _Series:
+    """
+    Cached window of one symbol/timeframe, guarded by its own lock so
+    concurrent readers wait for a single in-flight refresh.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.candles = np.empty((0, len(CANDLE_COLUMNS)))
+        self.limit = 0
+        self.fetched_at: Optional[float] = None
+
+
+class CandleCache:
+    """
+    Thread-safe candle window shared by the dashboard and the trading bot.
+
+    A get() within refresh_interval seconds of the last refresh is served
+    from memory; otherwise the exchange is asked for candles since the last
+    cached timestamp only. Exchange traffic is therefore bounded by the
+    refresh interval rather than the request rate.
+    """
+
+    def __init__(
+        self,
+        exchange,
+        max_candles: int = 1000,
+        refresh_interval: float = 1.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        :param exchange: ccxt exchange, or any object with fetch_ohlcv
+        :param max_candles: Upper bound of candles kept per series
+        :param refresh_interval: Seconds a refreshed series is served as is
+        :param clock: Monotonic time source, replaceable in tests
+        """
+        self.exchange = exchange
+        self.max_candles = max_candles
+        self.refresh_interval = refresh_interval
+        self.clock = clock
+        self._series: dict[tuple[str, str], _Series] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.full_fetches = 0
+        self.incremental_fetches = 0
+
+    def _get_series(self, symbol: str, timeframe: str) -> _Series:
+        with self._lock:
+            series = self._series.get((symbol, timeframe))
+            if series is None:
+                series = self._series[(symbol, timeframe)] = _Series()
+            return series
+
+    def candles(self, symbol: str, timeframe: str, limit: int = 100) -> np.ndarray:
+        """
+        Last limit candles as a read-only (n, 6) array in CANDLE_COLUMNS order.
+        """
+        limit = min(limit, self.max_candles)
+        series = self._get_series(symbol, timeframe)
+        with series.lock:
+            now = self.clock()
+            if limit > series.limit:
+                self._load(series, symbol, timeframe, limit)
+                series.fetched_at = now
+            elif (
+                series.fetched_at is None
+                or now - series.fetched_at >= self.refresh_interval
+            ):
+                self._update(series, symbol, timeframe)
+                series.fetched_at = now
+            else:
+                # Hits must not move the refresh clock, or polling faster
+                # than refresh_interval would never refresh
+                self.hits += 1
+            candles = series.candles[-limit:]
+        candles.flags.writeable = False
+        return candles
+
+    def get(self, symbol: str, timeframe: str, limit: int = 100) -> pd.DataFrame:
+        """
+        Last limit candles as a DataFrame with a millisecond timestamp column,
+        the layout of exchange.fetch_ohlcv rows.
+        """
+        df = pd.DataFrame(
+            self.candles(symbol, timeframe, limit), columns=CANDLE_COLUMNS
+        )
+        df["timestamp"] = df["timestamp"].astype("int64")
+        return df
+
+    def _load(self, series: _Series, symbol: str, timeframe: str, limit: int):
+        rows = self.exchange.fetch_ohlcv(symbol, timeframe, limit=limit)
+        self.full_fetches += 1
+        series.candles = self._as_array(rows)
+        series.limit = limit
+
+    def _update(self, series: _Series, symbol: str, timeframe: str):
+        if not len(series.candles):
+            self._load(series, symbol, timeframe, series.limit)
+            return
+        since = int(series.candles[-1, 0])
+        rows = self.exchange.fetch_ohlcv(
+            symbol, timeframe, since=since, limit=series.limit
+        )
+        self.incremental_fetches += 1
+        fresh = self._as_array(rows)
+        if not len(fresh):
+            return
+        if len(fresh) >= series.limit and fresh[-1, 0] > since:
+            # The gap filled a whole page; newer candles may be missing
+            self._load(series, symbol, timeframe, series.limit)
+            return
+        self._merge(series, fresh)
+
+    @staticmethod
+    def _merge(series: _Series, fresh: np.ndarray):
+        # Sort by timestamp; fresh rows replace cached rows with the same one,
+        # which updates the still-forming bar in place
+        combined = np.concatenate((series.candles, fresh))[::-1]
+        _, first = np.unique(combined[:, 0], return_index=True)
+        series.candles = combined[first][-series.limit :]
+
+    def update(self, symbol: str, timeframe: str, rows):
+        """
+        Merge candles fetched elsewhere, e.g. by a trading loop or a stream,
+        so that readers are served without another exchange request.
+        """
+        fresh = self._as_array(rows)
+        if not len(fresh):
+            return
+        series = self._get_series(symbol, timeframe)
+        with series.lock:
+            limit, series.limit = series.limit, self.max_candles
+            self._merge(series, fresh)
+            series.limit = max(limit, len(series.candles))
+            series.fetched_at = self.clock()
+
+    @staticmethod
+    def _as_array(rows) -> np.ndarray:
+        if not rows:
+            return np.empty((0, len(CANDLE_COLUMNS)))
+        return np.asarray(rows, dtype=np.float64)[:, : len(CANDLE_COLUMNS)]
+
+    def clear(self):
+        with self._lock:
+            self._series.clear()
@@ -0,0 +1,281 @@
+"""
+Historical OHLCV downloader.
+Pages through exchange history with fetch_ohlcv(since=...), runs several
+symbol/timeframe ranges concurrently under a shared request rate, and writes
+the candles into an OHLCVStore with a resumable checkpoint file.
+"""
+
+import argparse
+import json
+import logging
+import numbers
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+import ccxt
+import pandas as pd
+
+from .ohlcv_store import OHLCVStore
+from .orders import RateLimiter, init_exchange, rate_limit_lane
+from .utils import CircuitBreaker, retry
+
+logger = logging.getLogger(__name__)
+
+
+def timeframe_ms(timeframe: str) -> int:
+    return int(ccxt.Exchange.parse_timeframe(timeframe) * 1000)
+
+
+def to_ms(value) -> int:
+    """
+    Milliseconds since the epoch for an integer (already ms, including
+    NumPy integers) or a date string.
+    """
+    if isinstance(value, numbers.Integral):
+        # pd.Timestamp would read an np.int64 as nanoseconds
+        return int(value)
+    timestamp = pd.Timestamp(value)
+    if timestamp.tzinfo is None:
+        timestamp = timestamp.tz_localize("UTC")
+    return int(timestamp.timestamp() * 1000)
+
+
+class OHLCVDownloader:
+    """
+    Downloads [since, until) candle ranges into an OHLCVStore.
+
+    Each range is fetched page by page, and every page is written to the
+    store before the checkpoint records it. An interrupted download resumes
+    after its last stored candle. Long ranges are split into segments so
+    even a single symbol is fetched in parallel.
+    """
+
+    def __init__(
+        self,
+        exchange: ccxt.Exchange,
+        store: OHLCVStore,
+        checkpoint_file: Optional[str] = None,
+        page_limit: int = 1000,
+        max_workers: int = 4,
+        requests_per_second: Optional[float] = None,
+        max_attempts: int = 3,
+        retry_delay: float = 1.0,
+    ):
+        """
+        :param exchange: Exchange from orders.init_exchange, or any object
+            with fetch_ohlcv(symbol, timeframe, since, limit)
+        :param checkpoint_file: JSON file for resume state, none if omitted
+        :param requests_per_second: Request budget of this downloader,
+            defaults to the exchange's shared rate limiter
+        :param max_attempts: Attempts per page request before giving up
+        :param retry_delay: Initial delay between attempts, doubled each time
+            with full jitter
+        """
+        self.exchange = exchange
+        self.store = store
+        self.checkpoint_file = checkpoint_file
+        self.page_limit = page_limit
+        self.max_workers = max_workers
+        self._limiter: Optional[RateLimiter] = None
+        if requests_per_second is not None:
+            self._limiter = RateLimiter(requests_per_second)
+        elif not hasattr(exchange, "rate_limiter"):
+            # Clients from init_exchange throttle themselves
+            rate_limit_ms = getattr(exchange, "rateLimit", 0) or 0
+            self._limiter = RateLimiter(1000 / rate_limit_ms if rate_limit_ms else 0)
+        self._lock = threading.Lock()
+        self._checkpoint = self._load_checkpoint()
+        # Stops all segments hammering an exchange that keeps failing
+        self.breaker = CircuitBreaker()
+        self._fetch = retry(max_attempts, retry_delay, breaker=self.breaker)(
+            self._fetch_page
+        )
+        self.requests = 0
+
+    def _load_checkpoint(self) -> dict:
+        if not self.checkpoint_file or not os.path.exists(self.checkpoint_file):
+            return {}
+        try:
+            with open(self.checkpoint_file, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save_checkpoint(self, key: str, value):
+        with self._lock:
+            self._checkpoint[key] = value
+            if not self.checkpoint_file:
+                return
+            tmp_path = f"{self.checkpoint_file}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self._checkpoint, f, indent=2, sort_keys=True)
+            os.replace(tmp_path, self.checkpoint_file)
+
+    @staticmethod
+    def range_key(symbol: str, timeframe: str, since: int) -> str:
+        return f"{symbol}|{timeframe}|{since}"
+
+    @staticmethod
+    def plan_key(symbol: str, timeframe: str, since: int) -> str:
+        return f"plan|{symbol}|{timeframe}|{since}"
+
+    def _fetch_page(self, symbol: str, timeframe: str, since: int) -> list:
+        # Bulk history yields to orders and live market data
+        with rate_limit_lane("background"):
+            if self._limiter is not None:
+                self._limiter.acquire()
+            with self._lock:
+                self.requests += 1
+            return self.exchange.fetch_ohlcv(
+                symbol, timeframe, since=since, limit=self.page_limit
+            )
+
+    def download_range(self, symbol: str, timeframe: str, since, until) -> int:
+        """
+        Fetch candles with since <= timestamp < until, resuming from the
+        checkpoint of an earlier range with the same start.
+
+        :return: Number of candles written by this call
+        """
+        since, until = to_ms(since), to_ms(until)
+        step = timeframe_ms(timeframe)
+        key = self.range_key(symbol, timeframe, since)
+        cursor = self._checkpoint.get(key, since)
+        written = 0
+        while cursor < until:
+            page = self._fetch(symbol, timeframe, cursor)
+            if not page:
+                # Only an empty page means there is nothing from the cursor on
+                cursor = until
+            else:
+                candles = [c for c in page if cursor <= c[0] < until]
+                if candles:
+                    frame = pd.DataFrame(
+                        candles,
+                        columns=["timestamp", "open", "high", "low", "close", "volume"],
+                    )
+                    frame["timestamp"] = pd.to_datetime(frame["timestamp"], unit="ms")
+                    written += self.store.write(symbol, timeframe, frame)
+                newest = max(int(c[0]) for c in page)
+                if newest >= cursor:
+                    cursor = min(newest + step, until)
+                else:
+                    # Only rows from before the cursor, e.g. a hole in the
+                    # exchange's history: jump a page over it instead of
+                    # giving up
+                    skipped_to = min(cursor + self.page_limit * step, until)
+                    logger.warning(
+                        "%s %s: no candles from %s, skipping to %s",
+                        symbol,
+                        timeframe,
+                        pd.Timestamp(cursor, unit="ms"),
+                        pd.Timestamp(skipped_to, unit="ms"),
+                    )
+                    cursor = skipped_to
+            self._save_checkpoint(key, cursor)
+        return written
+
+    def split(self, since, until, timeframe: str, segments: int) -> list[tuple]:
+        """
+        Cut [since, until) into up to segments candle-aligned sub-ranges of at
+        least one page each.
+        """
+        since, until = to_ms(since), to_ms(until)
+        step = timeframe_ms(timeframe)
+        candles = max(-(-(until - since) // step), 1)
+        segments = max(1, min(segments, -(-candles // self.page_limit)))
+        size = -(-candles // segments) * step
+        return [
+            (start, min(start + size, until)) for start in range(since, until, size)
+        ]
+
+    def plan(
+        self, symbol: str, timeframe: str, since, until, segments: int
+    ) -> list[tuple]:
+        """
+        Segments of [since, until) for a pair. The first split from a start
+        is stored in the checkpoint and reused afterwards, so every segment
+        resumes under its own key even when until is "now" and has moved:
+        a later until only stretches the last segment, an earlier one cuts
+        the plan short.
+        """
+        since, until = to_ms(since), to_ms(until)
+        key = self.plan_key(symbol, timeframe, since)
+        with self._lock:
+            planned = self._checkpoint.get(key)
+        if not planned:
+            planned = self.split(since, until, timeframe, segments)
+            self._save_checkpoint(key, [list(segment) for segment in planned])
+        planned = [(start, end) for start, end in planned if start < until]
+        if planned:
+            planned[-1] = (planned[-1][0], until)
+        return planned
+
+    def download(
+        self,
+        symbols: list[str],
+        timeframes: list[str],
+        since,
+        until=None,
+        segments: int = 1,
+    ) -> dict[tuple[str, str], int]:
+        """
+        Download every symbol/timeframe pair concurrently.
+
+        :param until: Exclusive end, defaults to now
+        :param segments: Sub-ranges per pair, fetched in parallel; ignored
+            for a pair whose split is already in the checkpoint, see plan()
+        :return: Candles written per (symbol, timeframe)
+        """
+        until = to_ms(until) if until is not None else int(time.time() * 1000)
+        jobs = [
+            (symbol, timeframe, start, end)
+            for symbol in symbols
+            for timeframe in timeframes
+            for start, end in self.plan(symbol, timeframe, since, until, segments)
+        ]
+        totals = {
+            (symbol, timeframe): 0 for symbol in symbols for timeframe in timeframes
+        }
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = {
+                executor.submit(self.download_range, *job): job[:2] for job in jobs
+            }
+            for future, pair in futures.items():
+                totals[pair] += future.result()
+        return totals
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Download OHLCV history")
+    parser.add_argument("-e", "--exchange", required=True, help="ccxt exchange id")
+    parser.add_argument("-s", "--symbols", nargs="+", required=True, help="Symbols")
+    parser.add_argument(
+        "-t", "--timeframes", nargs="+", default=["1h"], help="Timeframes"
+    )
+    parser.add_argument("--since", required=True, help="Start date, e.g. 2024-01-01")
+    parser.add_argument("--until", default=None, help="End date, defaults to now")
+    parser.add_argument("-r", "--root", required=True, help="OHLCVStore directory")
+    parser.add_argument(
+        "--checkpoint", default=None, help="Checkpoint file, default <root>/.download"
+    )
+    parser.add_argument("-w", "--workers", type=int, default=4, help="Worker threads")
+    parser.add_argument(
+        "--segments", type=int, default=1, help="Parallel sub-ranges per pair"
+    )
+    args = parser.parse_args()
+
+    downloader = OHLCVDownloader(
+        init_exchange("", "", args.exchange),
+        OHLCVStore(args.root),
+        checkpoint_file=args.checkpoint or os.path.join(args.root, ".download"),
+        max_workers=args.workers,
+    )
+    totals = downloader.download(
+        args.symbols, args.timeframes, args.since, args.until, args.segments
+    )
+    for (symbol, timeframe), rows in totals.items():
+        print(f"{symbol} {timeframe}: {rows} candles")
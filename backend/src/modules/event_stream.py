@@ -0,0 +1,229 @@
+"""
+Server-Sent Events fan-out for the dashboard.
+An EventHub serializes each update once and hands the encoded bytes to
+every connected client. Slow clients get fast-changing values coalesced to
+the latest one, and a bounded backlog for discrete events, so a stalled
+browser never holds up the publisher or grows without bound.
+"""
+
+import asyncio
+import json
+import threading
+from collections import OrderedDict, deque
+from typing import AsyncIterator, Callable, Iterable, Iterator, Optional
+
+KEEP_ALIVE = b": keep-alive\n\n"
+
+
+def encode_event(event: str, data) -> bytes:
+    """
+    One SSE message; data is sent as compact JSON.
+    """
+    payload = json.dumps(data, separators=(",", ":"), default=str)
+    return f"event: {event}\ndata: {payload}\n\n".encode()
+
+
+class _Pending:
+    __slots__ = ("event", "data", "payload")
+
+    def __init__(self, event: str, data, payload: Optional[bytes]):
+        self.event = event
+        self.data = data
+        self.payload = payload
+
+    def encoded(self) -> bytes:
+        if self.payload is None:
+            self.payload = encode_event(self.event, self.data)
+        return self.payload
+
+
+class EventClient:
+    """
+    Delivery state of one connected client.
+
+    Keyed updates replace an undelivered update with the same key (dict
+    deltas are merged into it), so the client only ever sees the newest
+    value. Unkeyed events queue up to max_backlog, dropping the oldest.
+    """
+
+    def __init__(self, events: Optional[set] = None, max_backlog: int = 100):
+        self.events = events
+        self._keyed: OrderedDict = OrderedDict()
+        self._backlog: deque = deque()
+        self.max_backlog = max_backlog
+        self._ready = threading.Condition()
+        # Called after every push and on close, e.g. to wake an event loop
+        self.on_push: Optional[Callable[[], None]] = None
+        self.closed = False
+        self.delivered = 0
+        self.coalesced = 0
+        self.dropped = 0
+
+    def wants(self, event: str) -> bool:
+        return self.events is None or event in self.events
+
+    def push(self, pending: _Pending, key: Optional[str], merge: bool):
+        with self._ready:
+            if key is None:
+                if len(self._backlog) >= self.max_backlog:
+                    self._backlog.popleft()
+                    self.dropped += 1
+                self._backlog.append(pending)
+            else:
+                previous = self._keyed.pop(key, None)
+                if previous is not None:
+                    self.coalesced += 1
+                    if merge:
+                        pending = _Pending(
+                            pending.event, {**previous.data, **pending.data}, None
+                        )
+                self._keyed[key] = pending
+            self._ready.notify()
+        self._wake()
+
+    def _wake(self):
+        if self.on_push is not None:
+            self.on_push()
+
+    def take(self, timeout: Optional[float] = None) -> list[bytes]:
+        """
+        Everything pending, waiting up to timeout for the first message.
+        Empty on timeout or once closed.
+        """
+        with self._ready:
+            if not self._keyed and not self._backlog and not self.closed:
+                self._ready.wait(timeout)
+            pending = list(self._backlog) + list(self._keyed.values())
+            self._backlog.clear()
+            self._keyed.clear()
+        self.delivered += len(pending)
+        return [item.encoded() for item in pending]
+
+    def close(self):
+        with self._ready:
+            self.closed = True
+            self._ready.notify()
+        self._wake()
+
+
+class EventHub:
+    """
+    Publishes events to any number of EventClients.
+
+    Keyed events also update the hub's current state, which a new client
+    receives on connect, so nobody has to poll for the initial values.
+    With merge=True a dict update is a delta: only fields that changed are
+    sent, and nothing is sent if none did.
+    """
+
+    def __init__(self, max_backlog: int = 100, keep_alive: float = 15.0):
+        """
+        :param max_backlog: Unkeyed events kept per slow client
+        :param keep_alive: Seconds between comments on an idle stream, which
+            also detect disconnected clients
+        """
+        self.max_backlog = max_backlog
+        self.keep_alive = keep_alive
+        self._lock = threading.Lock()
+        self._clients: list[EventClient] = []
+        self._state: OrderedDict = OrderedDict()
+        self.published = 0
+
+    def publish(self, event: str, data, key: Optional[str] = None, merge=False):
+        """
+        :param key: Coalescing key; slow clients only get the latest data
+            per key. Unkeyed events are delivered one by one.
+        :param merge: data is a dict of changed fields for key
+        """
+        with self._lock:
+            if key is not None:
+                previous = self._state.get(key)
+                if merge and previous is not None:
+                    data = {k: v for k, v in data.items() if previous.data.get(k) != v}
+                    if not data:
+                        return
+                    self._state[key] = _Pending(event, {**previous.data, **data}, None)
+                else:
+                    self._state[key] = _Pending(event, data, None)
+            self.published += 1
+            # Encoded once, shared by every client
+            pending = _Pending(event, data, encode_event(event, data))
+            for client in self._clients:
+                if client.wants(event):
+                    client.push(pending, key, merge)
+
+    def connect(self, events: Optional[Iterable[str]] = None) -> EventClient:
+        """
+        Registers a client for events (all if None), primed with the
+        current state.
+        """
+        client = EventClient(set(events) if events else None, self.max_backlog)
+        with self._lock:
+            for key, state in self._state.items():
+                if client.wants(state.event):
+                    client.push(state, key, False)
+            self._clients.append(client)
+        return client
+
+    def disconnect(self, client: EventClient):
+        client.close()
+        with self._lock:
+            if client in self._clients:
+                self._clients.remove(client)
+
+    def stream(self, client: EventClient) -> Iterator[bytes]:
+        """
+        SSE response body for client; disconnects it when closed.
+        """
+        try:
+            while not client.closed:
+                messages = client.take(self.keep_alive)
+                yield b"".join(messages) if messages else KEEP_ALIVE
+        finally:
+            self.disconnect(client)
+
+    async def stream_async(self, client: EventClient) -> AsyncIterator[bytes]:
+        """
+        stream() for asyncio servers; waiting for events holds no thread.
+        """
+        loop = asyncio.get_running_loop()
+        ready = asyncio.Event()
+
+        def wake():
+            try:
+                loop.call_soon_threadsafe(ready.set)
+            except RuntimeError:
+                pass  # Loop already closed
+
+        client.on_push = wake
+        try:
+            while not client.closed:
+                ready.clear()
+                messages = client.take(0)
+                if messages:
+                    yield b"".join(messages)
+                    continue
+                try:
+                    await asyncio.wait_for(ready.wait(), self.keep_alive)
+                except asyncio.TimeoutError:
+                    yield KEEP_ALIVE
+        finally:
+            client.on_push = None
+            self.disconnect(client)
+
+    def stats(self) -> dict:
+        with self._lock:
+            clients = list(self._clients)
+        return {
+            "clients": len(clients),
+            "published": self.published,
+            "delivered": sum(client.delivered for client in clients),
+            "coalesced": sum(client.coalesced for client in clients),
+            "dropped": sum(client.dropped for client in clients),
+        }
+
+    def close(self):
+        with self._lock:
+            clients, self._clients = self._clients, []
+        for client in clients:
+            client.close()
@@ -0,0 +1,304 @@
+"""
+Streaming indicator engine for live candles.
+Updates EMA, ATR, avg_volume, RSI, ADX and the boolean filter columns in
+O(1) per appended candle, reproducing calculate_indicators bit for bit.
+"""
+
+import math
+from collections import deque
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+INDICATOR_COLUMNS = (
+    "ema",
+    "atr",
+    "avg_volume",
+    "high_volume",
+    "rsi",
+    "adx",
+    "within_trading_hours",
+)
+
+
+class _EWMean:
+    """
+    pandas ewm(com=..., adjust=False).mean() one value at a time.
+    """
+
+    def __init__(self, com: float, min_periods: int):
+        alpha = 1.0 / (1.0 + com)
+        self._new_wt = alpha
+        self._old_wt = 1.0 - alpha
+        self._min_periods = max(min_periods, 1)
+        self._weighted = math.nan
+        self._nobs = 0
+
+    def update(self, value: float) -> float:
+        is_observation = value == value
+        self._nobs += is_observation
+        if self._weighted == self._weighted:
+            if is_observation and self._weighted != value:
+                self._weighted = (
+                    self._old_wt * self._weighted + self._new_wt * value
+                ) / (self._old_wt + self._new_wt)
+        elif is_observation:
+            self._weighted = value
+        return self._weighted if self._nobs >= self._min_periods else math.nan
+
+
+class _RollingMean:
+    """
+    pandas rolling(window, min_periods=1).mean() one value at a time,
+    including its compensated summation.
+    """
+
+    def __init__(self, window: int):
+        self._window = window
+        self._values: deque = deque()
+        self._reset()
+
+    def _reset(self):
+        self._sum = 0.0
+        self._comp_add = 0.0
+        self._comp_remove = 0.0
+        self._nobs = 0
+        self._neg_ct = 0
+        self._same = 0
+        self._prev = math.nan
+
+    def _add(self, value: float):
+        if value != value:
+            return
+        self._nobs += 1
+        y = value - self._comp_add
+        t = self._sum + y
+        self._comp_add = t - self._sum - y
+        self._sum = t
+        if math.copysign(1.0, value) < 0:
+            self._neg_ct += 1
+        self._same = self._same + 1 if value == self._prev else 1
+        self._prev = value
+
+    def _remove(self, value: float):
+        if value != value:
+            return
+        self._nobs -= 1
+        y = -value - self._comp_remove
+        t = self._sum + y
+        self._comp_remove = t - self._sum - y
+        self._sum = t
+        if math.copysign(1.0, value) < 0:
+            self._neg_ct -= 1
+
+    def update(self, value: float) -> float:
+        self._values.append(value)
+        if len(self._values) == 1 or self._window == 1:
+            self._values = deque([value])
+            self._reset()
+            self._prev = value
+        elif len(self._values) > self._window:
+            self._remove(self._values.popleft())
+        self._add(value)
+        if self._nobs == 0:
+            return math.nan
+        result = self._sum / self._nobs
+        if self._same >= self._nobs:
+            return self._prev
+        if self._neg_ct == 0 and result < 0:
+            return 0.0
+        if self._neg_ct == self._nobs and result > 0:
+            return 0.0
+        return result
+
+
+class _WilderSum:
+    """
+    Sum of the first window values, then x[i] = x[i-1] - x[i-1]/window + v,
+    as used by ta's ADX for TR, +DM and -DM.
+    """
+
+    def __init__(self, window: int):
+        self._window = window
+        self._seed: list[float] = []
+        self.value = math.nan
+
+    def update(self, value: float) -> float:
+        if self.value != self.value:
+            self._seed.append(value)
+            if len(self._seed) == self._window:
+                self.value = pd.Series(self._seed).sum()
+                self._seed = []
+        else:
+            self.value = self.value - (self.value / float(self._window)) + value
+        return self.value
+
+
+class _WilderMean:
+    """
+    Mean of the first window values, then x[i] = (x[i-1]*(window-1) + v)/window,
+    as used by ta's ATR and ADX smoothing. Zero until seeded, like ta.
+    """
+
+    def __init__(self, window: int):
+        self._window = window
+        self._seed: list[float] = []
+        self.value = 0.0
+        self._ready = False
+
+    def update(self, value: float) -> float:
+        if not self._ready:
+            self._seed.append(value)
+            if len(self._seed) == self._window:
+                self.value = float(np.mean(self._seed))
+                self._seed = []
+                self._ready = True
+        else:
+            self.value = (self.value * (self._window - 1) + value) / float(self._window)
+        return self.value
+
+
+class IncrementalIndicators:
+    """
+    Stateful equivalent of calculate_indicators for candles arriving one at
+    a time. Seed it with history via seed() or update_frame(), then call
+    update() for every new closed candle.
+
+    Warm-up matches ta: ATR and ADX are 0 until enough bars have been seen,
+    EMA and RSI are NaN. After warm-up every value equals the batch result.
+    """
+
+    def __init__(
+        self,
+        ema_length: int,
+        volume_multiplier: float,
+        trading_start_hour: int,
+        trading_end_hour: int,
+        window: int = 14,
+    ):
+        self.ema_length = ema_length
+        self.volume_multiplier = volume_multiplier
+        self.trading_start_hour = trading_start_hour
+        self.trading_end_hour = trading_end_hour
+        self.window = window
+
+        self._ema = _EWMean(com=(ema_length - 1) / 2, min_periods=ema_length)
+        self._avg_volume = _RollingMean(ema_length)
+        rsi_com = (1 - 1 / window) / (1 / window)
+        self._rsi_up = _EWMean(com=rsi_com, min_periods=window)
+        self._rsi_down = _EWMean(com=rsi_com, min_periods=window)
+        self._atr = _WilderMean(window)
+        self._trs = _WilderSum(window)
+        self._dip = _WilderSum(window)
+        self._din = _WilderSum(window)
+        self._adx = _WilderMean(window)
+
+        self._prev: Optional[tuple[float, float, float]] = None
+        self.bars = 0
+        self.latest: dict = {}
+
+    @classmethod
+    def from_config(cls, cfg) -> "IncrementalIndicators":
+        return cls(
+            ema_length=cfg.EMA_LENGTH,
+            volume_multiplier=cfg.VOLUME_MULTIPLIER,
+            trading_start_hour=cfg.TRADING_START_HOUR,
+            trading_end_hour=cfg.TRADING_END_HOUR,
+        )
+
+    def update(
+        self,
+        timestamp,
+        high: float,
+        low: float,
+        close: float,
+        volume: float,
+    ) -> dict:
+        """
+        Append one closed candle and return its indicator values.
+        """
+        high, low, close, volume = float(high), float(low), float(close), float(volume)
+
+        if self._prev is None:
+            true_range = high - low
+            up, down = 0.0, -0.0
+            adx = 0.0
+        else:
+            prev_high, prev_low, prev_close = self._prev
+            true_range = max(high - low, abs(high - prev_close), abs(low - prev_close))
+            diff = close - prev_close
+            up = diff if diff > 0 else 0.0
+            down = -diff if diff < 0 else -0.0
+            adx = self._update_adx(high, low, prev_high, prev_low, prev_close)
+
+        avg_volume = self._avg_volume.update(volume)
+        emaup = self._rsi_up.update(up)
+        emadn = self._rsi_down.update(down)
+        if emadn == 0:
+            rsi = 100.0
+        else:
+            rsi = 100 - (100 / (1 + emaup / emadn))
+
+        self.latest = {
+            "ema": self._ema.update(close),
+            "atr": self._atr.update(true_range),
+            "avg_volume": avg_volume,
+            "high_volume": volume > (avg_volume * self.volume_multiplier),
+            "rsi": rsi,
+            "adx": adx,
+            "within_trading_hours": self.trading_start_hour
+            <= pd.Timestamp(timestamp).hour
+            <= self.trading_end_hour,
+        }
+        self._prev = (high, low, close)
+        self.bars += 1
+        return self.latest
+
+    def _update_adx(self, high, low, prev_high, prev_low, prev_close) -> float:
+        movement = max(high, prev_close) - min(low, prev_close)
+        diff_up = high - prev_high
+        diff_down = prev_low - low
+        pos = diff_up if diff_up > diff_down and diff_up > 0 else 0.0
+        neg = diff_down if diff_down > diff_up and diff_down > 0 else 0.0
+
+        trs = self._trs.update(movement)
+        dip = self._dip.update(pos)
+        din = self._din.update(neg)
+        if trs != trs:
+            return 0.0
+
+        dip = 100 * (dip / trs) if trs != 0 else 0
+        din = 100 * (din / trs) if trs != 0 else 0
+        if dip + din != 0:
+            directional_index = 100 * abs((dip - din) / (dip + din))
+        else:
+            directional_index = 0.0
+        return self._adx.update(directional_index)
+
+    def update_frame(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Feed every row of an OHLCV frame and return it with indicator columns,
+        continuing from the current state.
+        """
+        rows = [
+            self.update(*candle)
+            for candle in zip(
+                df["timestamp"],
+                df["high"].to_numpy(dtype=float),
+                df["low"].to_numpy(dtype=float),
+                df["close"].to_numpy(dtype=float),
+                df["volume"].to_numpy(dtype=float),
+            )
+        ]
+        result = df.copy()
+        for column in INDICATOR_COLUMNS:
+            result[column] = [row[column] for row in rows]
+        return result
+
+    def seed(self, df: pd.DataFrame) -> "IncrementalIndicators":
+        """
+        Warm the state up from a historical OHLCV frame.
+        """
+        self.update_frame(df)
+        return self
@@ -0,0 +1,198 @@
+"""
+Memoization layer for indicator columns.
+Keys columns by an OHLCV data fingerprint plus the indicator's own
+parameters, with a size-bounded in-memory LRU tier and an optional on-disk tier.
+"""
+
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from .indicators import DEFAULT_BACKEND, indicator_plan
+
+FINGERPRINT_COLUMNS = ("timestamp", "open", "high", "low", "close", "volume")
+
+
+def data_fingerprint(df: pd.DataFrame) -> str:
+    """
+    Hash of the OHLCV columns of df, independent of any indicator columns.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(str(len(df)).encode())
+    for column in FINGERPRINT_COLUMNS:
+        if column not in df.columns:
+            continue
+        values = df[column]
+        if isinstance(values.dtype, pd.DatetimeTZDtype):
+            values = values.dt.tz_convert("UTC").dt.tz_localize(None)
+        array = np.ascontiguousarray(values.to_numpy())
+        digest.update(column.encode())
+        digest.update(str(array.dtype).encode())
+        digest.update(array.view(np.uint8))
+    return digest.hexdigest()
+
+
+class IndicatorCache:
+    """
+    Thread-safe cache of indicator arrays.
+
+    The memory tier evicts least recently used entries once max_bytes is
+    exceeded. When cache_dir is set, entries are also written there as .npy
+    files, which several processes can share; the directory is trimmed to
+    max_disk_bytes by oldest access time.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int = 256 * 1024 * 1024,
+        cache_dir: Optional[str] = None,
+        max_disk_bytes: int = 2 * 1024 * 1024 * 1024,
+    ):
+        self.max_bytes = max_bytes
+        self.cache_dir = cache_dir
+        self.max_disk_bytes = max_disk_bytes
+        self._entries: OrderedDict[str, np.ndarray] = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+
+    @staticmethod
+    def key(fingerprint: str, column: str, params: dict) -> str:
+        payload = json.dumps([fingerprint, column, params], sort_keys=True)
+        return hashlib.blake2b(payload.encode(), digest_size=16).hexdigest()
+
+    def get(self, key: str) -> Optional[np.ndarray]:
+        with self._lock:
+            values = self._entries.get(key)
+            if values is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return values
+        values = self._load(key)
+        with self._lock:
+            if values is None:
+                self.misses += 1
+                return None
+            self.disk_hits += 1
+            self._store(key, values)
+        return values
+
+    def put(self, key: str, values: np.ndarray):
+        values = np.array(values)
+        values.flags.writeable = False
+        with self._lock:
+            self._store(key, values)
+        if self.cache_dir and values.dtype != object:
+            self._save(key, values)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def nbytes(self) -> int:
+        return self._bytes
+
+    def _store(self, key: str, values: np.ndarray):
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self._bytes -= old.nbytes
+        if values.nbytes > self.max_bytes:
+            return
+        self._entries[key] = values
+        self._bytes += values.nbytes
+        while self._bytes > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self._bytes -= evicted.nbytes
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.npy")
+
+    def _load(self, key: str) -> Optional[np.ndarray]:
+        if not self.cache_dir:
+            return None
+        path = self._path(key)
+        try:
+            values = np.load(path, allow_pickle=False)
+            os.utime(path)
+        except (OSError, ValueError):
+            return None
+        values.flags.writeable = False
+        return values
+
+    def _save(self, key: str, values: np.ndarray):
+        path = self._path(key)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_path, "wb") as f:
+                np.save(f, values, allow_pickle=False)
+            os.replace(tmp_path, path)
+        except OSError:
+            return
+        self._trim_disk()
+
+    def _trim_disk(self):
+        files = []
+        for entry in os.scandir(self.cache_dir):
+            if entry.name.endswith(".npy"):
+                stat = entry.stat()
+                files.append((stat.st_mtime, stat.st_size, entry.path))
+        total = sum(size for _, size, _ in files)
+        for _, size, path in sorted(files):
+            if total <= self.max_disk_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+
+
+default_cache = IndicatorCache()
+
+
+def cached_calculate_indicators(
+    df: pd.DataFrame,
+    ema_length: int,
+    volume_multiplier: float,
+    trading_start_hour: int,
+    trading_end_hour: int,
+    cache: Optional[IndicatorCache] = None,
+    fingerprint: Optional[str] = None,
+    backend: Optional[str] = None,
+) -> pd.DataFrame:
+    """
+    Same output as calculate_indicators, reusing columns whose data and
+    parameters were computed before.
+
+    :param cache: Cache to use, defaults to the module-level default_cache
+    :param fingerprint: Precomputed data_fingerprint(df), to skip rehashing
+    """
+    cache = cache if cache is not None else default_cache
+    fingerprint = fingerprint or data_fingerprint(df)
+    backend = backend or DEFAULT_BACKEND
+    df = df.copy()
+    for column, func, params in indicator_plan(
+        ema_length, volume_multiplier, trading_start_hour, trading_end_hour, backend
+    ):
+        key = cache.key(fingerprint, column, {**params, "backend": backend})
+        values = cache.get(key)
+        if values is None:
+            values = func(df, **params).to_numpy()
+            cache.put(key, values)
+        df[column] = values.copy()
+    return df
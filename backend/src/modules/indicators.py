@@ -3,6 +3,8 @@ Indicator calculation functions for trading bot.
 Adds EMA, ATR, volume, RSI, ADX, and trading hours columns.
 """
 
+from typing import Callable, Optional
+
 import numpy as np
 import pandas as pd
 import ta
@@ -10,6 +12,111 @@ from ta.momentum import RSIIndicator
 from ta.trend import ADXIndicator, EMAIndicator
 from ta.volatility import AverageTrueRange
 
+from . import kernels
+
+# Backends accepted by calculate_indicators; "numpy" uses modules.kernels
+INDICATOR_BACKENDS = ("ta", "numpy")
+DEFAULT_BACKEND = "ta"
+
+
+def _ema(df: pd.DataFrame, window: int) -> pd.Series:
+    return EMAIndicator(df["close"], window=window).ema_indicator()
+
+
+def _atr(df: pd.DataFrame, window: int) -> pd.Series:
+    return AverageTrueRange(
+        df["high"], df["low"], df["close"], window=window
+    ).average_true_range()
+
+
+def _avg_volume(df: pd.DataFrame, window: int) -> pd.Series:
+    return df["volume"].rolling(window=window, min_periods=1).mean()
+
+
+def _high_volume(df: pd.DataFrame, window: int, volume_multiplier: float) -> pd.Series:
+    # window identifies the avg_volume column this flag is derived from
+    return df["volume"] > (df["avg_volume"] * volume_multiplier)
+
+
+def _rsi(df: pd.DataFrame, window: int) -> pd.Series:
+    return RSIIndicator(df["close"], window=window).rsi()
+
+
+def _adx(df: pd.DataFrame, window: int) -> pd.Series:
+    return ADXIndicator(df["high"], df["low"], df["close"], window=window).adx()
+
+
+def _ema_numpy(df: pd.DataFrame, window: int) -> pd.Series:
+    return pd.Series(kernels.ema(df["close"].to_numpy(), window), index=df.index)
+
+
+def _atr_numpy(df: pd.DataFrame, window: int) -> pd.Series:
+    values = kernels.atr(
+        df["high"].to_numpy(), df["low"].to_numpy(), df["close"].to_numpy(), window
+    )
+    return pd.Series(values, index=df.index)
+
+
+def _avg_volume_numpy(df: pd.DataFrame, window: int) -> pd.Series:
+    values = kernels.rolling_mean(df["volume"].to_numpy(), window)
+    return pd.Series(values, index=df.index)
+
+
+def _rsi_numpy(df: pd.DataFrame, window: int) -> pd.Series:
+    return pd.Series(kernels.rsi(df["close"].to_numpy(), window), index=df.index)
+
+
+def _adx_numpy(df: pd.DataFrame, window: int) -> pd.Series:
+    values = kernels.adx(
+        df["high"].to_numpy(), df["low"].to_numpy(), df["close"].to_numpy(), window
+    )
+    return pd.Series(values, index=df.index)
+
+
+def _within_trading_hours(
+    df: pd.DataFrame, start_hour: int, end_hour: int
+) -> pd.Series:
+    return df["timestamp"].dt.hour.between(start_hour, end_hour)
+
+
+def indicator_plan(
+    ema_length: int,
+    volume_multiplier: float,
+    trading_start_hour: int,
+    trading_end_hour: int,
+    backend: str = DEFAULT_BACKEND,
+) -> list[tuple[str, Callable, dict]]:
+    """
+    Ordered (column, function, params) steps that calculate_indicators runs.
+    Each function takes the frame built so far plus its params.
+    """
+    if backend == "ta":
+        ema, atr, avg_volume, rsi, adx = _ema, _atr, _avg_volume, _rsi, _adx
+    elif backend == "numpy":
+        ema, atr, avg_volume = _ema_numpy, _atr_numpy, _avg_volume_numpy
+        rsi, adx = _rsi_numpy, _adx_numpy
+    else:
+        raise ValueError(
+            f"Unknown indicator backend '{backend}', expected one of {INDICATOR_BACKENDS}"
+        )
+    return [
+        ("ema", ema, {"window": ema_length}),
+        ("atr", atr, {"window": 14}),
+        ("avg_volume", avg_volume, {"window": ema_length}),
+        (
+            "high_volume",
+            _high_volume,
+            {"window": ema_length, "volume_multiplier": volume_multiplier},
+        ),
+        ("rsi", rsi, {"window": 14}),
+        ("adx", adx, {"window": 14}),
+        (
+            "within_trading_hours",
+            _within_trading_hours,
+            {"start_hour": trading_start_hour, "end_hour": trading_end_hour},
+        ),
+    ]
+
 
 def calculate_indicators(
     df: pd.DataFrame,
@@ -17,42 +124,101 @@ def calculate_indicators(
     volume_multiplier: float,
     trading_start_hour: int,
     trading_end_hour: int,
+    backend: Optional[str] = None,
 ) -> pd.DataFrame:
     """
     Adds EMA, ATR, avg_volume, high_volume, RSI, ADX, and within_trading_hours.
+    backend selects "ta" (default) or the "numpy" kernels.
     """
     df = df.copy()
-    df["ema"] = EMAIndicator(df["close"], window=ema_length).ema_indicator()
-    df["atr"] = AverageTrueRange(
-        df["high"], df["low"], df["close"]
-    ).average_true_range()
-    df["avg_volume"] = df["volume"].rolling(window=ema_length, min_periods=1).mean()
-    df["high_volume"] = df["volume"] > (df["avg_volume"] * volume_multiplier)
-    df["rsi"] = RSIIndicator(df["close"], window=14).rsi()
-    df["adx"] = ADXIndicator(df["high"], df["low"], df["close"], window=14).adx()
-    df["within_trading_hours"] = df["timestamp"].dt.hour.between(
-        trading_start_hour, trading_end_hour
-    )
+    for column, func, params in indicator_plan(
+        ema_length,
+        volume_multiplier,
+        trading_start_hour,
+        trading_end_hour,
+        backend or DEFAULT_BACKEND,
+    ):
+        df[column] = func(df, **params)
+    return df
+
+
+def add_fvg_columns(df: pd.DataFrame, lookback: int) -> pd.DataFrame:
+    """
+    Adds rolling fair value gap bounds for every bar in one pass.
+
+    fvg_low/fvg_high hold the min low and max high of the last lookback + 2
+    bars, the window detect_fvg uses for both bullish and bearish gaps.
+    Rows without a full window are NaN.
+    """
+    df = df.copy()
+    window = lookback + 2
+    df["fvg_low"] = df["low"].rolling(window=window, min_periods=1).min()
+    df["fvg_high"] = df["high"].rolling(window=window, min_periods=1).max()
+    df.iloc[: window - 1, df.columns.get_indexer(["fvg_low", "fvg_high"])] = np.nan
+    df.attrs["fvg_lookback"] = lookback
     return df
 
 
+def fvg_breakout(close, fvg_high, ema, high_volume, within_trading_hours):
+    """
+    The bullish FVG breakout entry rule, element-wise on scalars or arrays:
+    close above the FVG high and the EMA, on high volume within trading
+    hours. A NaN FVG high or EMA never signals.
+
+    fvg_high must come from the bars before the candle being judged: a
+    valid candle never closes above its own high.
+    """
+    fvg_high = np.asarray(fvg_high, dtype=float)
+    return (
+        (close > fvg_high)
+        & (fvg_high != 0)
+        & (close > np.asarray(ema, dtype=float))
+        & np.asarray(high_volume, dtype=bool)
+        & np.asarray(within_trading_hours, dtype=bool)
+    )
+
+
+def fvg_entry_signals(df: pd.DataFrame, lookback: int) -> np.ndarray:
+    """
+    fvg_breakout for every bar of a frame with calculate_indicators columns,
+    the single definition of the entry signal for the backtests and the
+    live bot.
+
+    A bar's FVG high is the fvg_high of the bar before it, i.e. the max high
+    of the lookback + 2 bars preceding it; bars without that many are False.
+    """
+    if df.attrs.get("fvg_lookback") != lookback or "fvg_high" not in df.columns:
+        df = add_fvg_columns(df, lookback)
+    return fvg_breakout(
+        df["close"].to_numpy(dtype=float),
+        df["fvg_high"].shift(1).to_numpy(dtype=float),
+        df["ema"].to_numpy(dtype=float),
+        df["high_volume"].to_numpy(dtype=bool),
+        df["within_trading_hours"].to_numpy(dtype=bool),
+    )
+
+
 def detect_fvg(
     df: pd.DataFrame, lookback: int, bullish: bool = True
 ) -> tuple[float, float]:
     """
     Detects fair value gap (FVG) in the last lookback bars.
     Returns (low, high) for bullish, (high, low) for bearish.
+    Uses the last row of add_fvg_columns output when present for lookback.
     """
     if len(df) < lookback + 2:
         return (np.nan, np.nan)
-    window = df.iloc[-(lookback + 2) :]
-    if bullish:
+    low = high = np.nan
+    if df.attrs.get("fvg_lookback") == lookback and "fvg_high" in df.columns:
+        low = df["fvg_low"].iat[-1]
+        high = df["fvg_high"].iat[-1]
+    if np.isnan(low) or np.isnan(high):
+        window = df.iloc[-(lookback + 2) :]
         low = window["low"].min()
         high = window["high"].max()
+    if bullish:
         return (low, high)
     else:
-        high = window["high"].max()
-        low = window["low"].min()
         return (high, low)
 
 
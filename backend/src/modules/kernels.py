@@ -0,0 +1,187 @@
+"""
+NumPy indicator kernels operating on raw float arrays.
+Alternative backend to the ta library for EMA, ATR, RSI, ADX and rolling
+volume; results match ta within floating point tolerance.
+"""
+
+import numpy as np
+
+# Block length of the blocked linear recurrence solver
+_BLOCK = 64
+
+
+def linear_recurrence(inputs: np.ndarray, decay: float, initial: float) -> np.ndarray:
+    """
+    Solves y[t] = decay * y[t-1] + inputs[t] with y[-1] = initial.
+
+    Every EMA and Wilder smoothing is this recurrence. It is evaluated in
+    blocks: a matrix product gives each block's local response and only the
+    carry between blocks is propagated sequentially.
+    """
+    inputs = np.asarray(inputs, dtype=np.float64)
+    n = len(inputs)
+    if n == 0:
+        return np.empty(0)
+    blocks = -(-n // _BLOCK)
+    padded = np.zeros(blocks * _BLOCK)
+    padded[:n] = inputs
+    padded = padded.reshape(blocks, _BLOCK)
+
+    lags = np.arange(_BLOCK)[:, None] - np.arange(_BLOCK)[None, :]
+    transfer = np.where(lags >= 0, decay ** np.maximum(lags, 0), 0.0)
+    local = padded @ transfer.T
+
+    block_decay = decay**_BLOCK
+    carries = np.empty(blocks)
+    carry = initial
+    for block, end in enumerate(local[:, -1]):
+        carries[block] = carry
+        carry = block_decay * carry + end
+    growth = decay ** np.arange(1, _BLOCK + 1)
+    return (local + carries[:, None] * growth[None, :]).ravel()[:n]
+
+
+def ema(close: np.ndarray, window: int) -> np.ndarray:
+    """
+    EMA with span=window, adjust=False and NaN until window values have been
+    seen, as ta. NaNs are skipped like pandas does: the previous EMA is
+    carried over them, and the first value after a gap of k NaNs is weighted
+    against it as if it had decayed for k + 1 bars.
+    """
+    close = np.asarray(close, dtype=np.float64)
+    alpha = 2.0 / (window + 1)
+    decay = 1 - alpha
+    valid = ~np.isnan(close)
+    result = np.full(len(close), np.nan)
+    edges = np.diff(np.concatenate(([False], valid, [False])).astype(np.int8))
+    starts = np.flatnonzero(edges == 1)
+    ends = np.flatnonzero(edges == -1)
+    previous = None
+    for start, end in zip(starts, ends):
+        # One linear recurrence per run of values between NaNs
+        if previous is None:
+            first = close[start]
+        else:
+            old = decay ** (start - previous)
+            first = (old * result[previous] + alpha * close[start]) / (old + alpha)
+            result[previous + 1 : start] = result[previous]
+        result[start] = first
+        result[start + 1 : end] = linear_recurrence(
+            alpha * close[start + 1 : end], decay, first
+        )
+        previous = end - 1
+    if previous is not None:
+        result[previous + 1 :] = result[previous]
+    result[np.cumsum(valid) < window] = np.nan
+    return result
+
+
+def true_range(high: np.ndarray, low: np.ndarray, close: np.ndarray) -> np.ndarray:
+    high = np.asarray(high, dtype=np.float64)
+    low = np.asarray(low, dtype=np.float64)
+    prev_close = np.concatenate(([np.nan], np.asarray(close, dtype=np.float64)[:-1]))
+    ranges = np.vstack(
+        [high - low, np.abs(high - prev_close), np.abs(low - prev_close)]
+    )
+    return np.nanmax(ranges, axis=0)
+
+
+def atr(
+    high: np.ndarray, low: np.ndarray, close: np.ndarray, window: int = 14
+) -> np.ndarray:
+    """
+    Wilder ATR seeded with the mean of the first window true ranges; zero
+    before that, as ta.
+    """
+    ranges = true_range(high, low, close)
+    result = np.zeros(len(ranges))
+    if len(ranges) >= window:
+        seed = ranges[:window].mean()
+        result[window - 1] = seed
+        result[window:] = linear_recurrence(
+            ranges[window:] / window, (window - 1) / window, seed
+        )
+    return result
+
+
+def rsi(close: np.ndarray, window: int = 14) -> np.ndarray:
+    """
+    RSI with Wilder (alpha=1/window) smoothing and window-1 leading NaNs, as ta.
+    """
+    close = np.asarray(close, dtype=np.float64)
+    diff = np.diff(close, prepend=np.nan)
+    up = np.where(diff > 0, diff, 0.0)
+    down = np.where(diff < 0, -diff, 0.0)
+    alpha = 1.0 / window
+    ema_up = np.empty(len(close))
+    ema_down = np.empty(len(close))
+    if len(close):
+        ema_up[0] = ema_down[0] = 0.0
+        ema_up[1:] = linear_recurrence(alpha * up[1:], 1 - alpha, 0.0)
+        ema_down[1:] = linear_recurrence(alpha * down[1:], 1 - alpha, 0.0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        result = np.where(ema_down == 0, 100.0, 100 - 100 / (1 + ema_up / ema_down))
+    result[: window - 1] = np.nan
+    return result
+
+
+def _wilder_sum(values: np.ndarray, window: int) -> np.ndarray:
+    # Sum of values[1..window], then x = x - x/window + v, from bar window on
+    seed = values[1 : window + 1].sum()
+    smoothed = linear_recurrence(values[window + 1 :], 1 - 1 / window, seed)
+    return np.concatenate(([seed], smoothed))
+
+
+def adx(
+    high: np.ndarray, low: np.ndarray, close: np.ndarray, window: int = 14
+) -> np.ndarray:
+    """
+    ADX as computed by ta: Wilder sums of TR and directional movement from
+    bar window, DX smoothed from bar 2*window-1, zero before that.
+    """
+    high = np.asarray(high, dtype=np.float64)
+    low = np.asarray(low, dtype=np.float64)
+    close = np.asarray(close, dtype=np.float64)
+    n = len(close)
+    result = np.zeros(n)
+    if n < 2 * window:
+        return result
+
+    prev_close = np.concatenate(([np.nan], close[:-1]))
+    movement = np.maximum(high, prev_close) - np.minimum(low, prev_close)
+    diff_up = np.diff(high, prepend=np.nan)
+    diff_down = -np.diff(low, prepend=np.nan)
+    pos = np.where((diff_up > diff_down) & (diff_up > 0), diff_up, 0.0)
+    neg = np.where((diff_down > diff_up) & (diff_down > 0), diff_down, 0.0)
+
+    trs = _wilder_sum(movement, window)
+    dip = _wilder_sum(pos, window)
+    din = _wilder_sum(neg, window)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        dip = np.where(trs != 0, 100 * dip / trs, 0.0)
+        din = np.where(trs != 0, 100 * din / trs, 0.0)
+        total = dip + din
+        dx = np.where(total != 0, 100 * np.abs((dip - din) / total), 0.0)
+
+    seed = dx[:window].mean()
+    result[2 * window - 1] = seed
+    result[2 * window :] = linear_recurrence(
+        dx[window:] / window, (window - 1) / window, seed
+    )
+    return result
+
+
+def rolling_mean(values: np.ndarray, window: int) -> np.ndarray:
+    """
+    Rolling mean with min_periods=1 from cumulative sums. NaNs are left out
+    of the sum and the count like pandas does, so a missing value only
+    affects the windows that contain it; a window of NaNs only is NaN.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    valid = ~np.isnan(values)
+    sums = np.cumsum(np.where(valid, values, 0.0))
+    counts = np.cumsum(valid)
+    sums[window:] = sums[window:] - sums[:-window]
+    counts[window:] = counts[window:] - counts[:-window]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(counts > 0, sums / counts, np.nan)
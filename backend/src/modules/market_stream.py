@@ -0,0 +1,607 @@
+"""
+Streaming market data.
+Subscribes to ticker, trade and candle channels over a WebSocket, builds
+candles locally and publishes them through an in-process PubSub, so the bot
+and the dashboard react to market data without polling REST endpoints.
+ReplayServer serves recorded messages from a local WebSocket for tests.
+"""
+
+import asyncio
+import json
+import logging
+import threading
+import time
+from collections import defaultdict
+from typing import Callable, Iterable, Optional
+
+import websockets
+from websockets.asyncio.client import connect
+from websockets.asyncio.server import serve
+
+from .candle_cache import CandleCache
+from .downloader import timeframe_ms
+
+logger = logging.getLogger("market_stream")
+
+CHANNELS = ("ticker", "trade", "candle")
+
+
+def ticker_topic(symbol: str) -> str:
+    return f"ticker:{symbol}"
+
+
+def trade_topic(symbol: str) -> str:
+    return f"trade:{symbol}"
+
+
+def candle_topic(symbol: str, timeframe: str) -> str:
+    """
+    Topic of closed candles, published as [timestamp, open, high, low, close,
+    volume] lists like fetch_ohlcv rows.
+    """
+    return f"candle:{symbol}:{timeframe}"
+
+
+class Subscription:
+    """
+    Bounded message queue of one asyncio subscriber. When a slow consumer
+    falls behind, the oldest message is dropped so publishers never block.
+    """
+
+    def __init__(self, pubsub: "PubSub", topic: str, maxsize: int):
+        self.topic = topic
+        self.dropped = 0
+        self._pubsub = pubsub
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize)
+        self._loop = asyncio.get_running_loop()
+
+    def _put(self, message):
+        if self._queue.full():
+            self._queue.get_nowait()
+            self.dropped += 1
+        self._queue.put_nowait(message)
+
+    async def get(self):
+        return await self._queue.get()
+
+    def get_nowait(self):
+        return self._queue.get_nowait()
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        return await self.get()
+
+    def close(self):
+        self._pubsub.unsubscribe(self)
+
+
+class PubSub:
+    """
+    Topic-based publish/subscribe between asyncio tasks and threads.
+
+    Asyncio subscribers receive messages through a Subscription queue in
+    their own event loop, whichever thread publishes. Callbacks run in the
+    publisher's thread and must return quickly. The latest message of every
+    topic is kept for readers that only need the current value.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscriptions: dict[str, list[Subscription]] = defaultdict(list)
+        self._callbacks: dict[str, list[Callable]] = defaultdict(list)
+        self._latest: dict[str, object] = {}
+        self.published = 0
+
+    def subscribe(self, topic: str, maxsize: int = 1000) -> Subscription:
+        """
+        Queue of future messages on topic; call from the consuming event loop.
+        """
+        subscription = Subscription(self, topic, maxsize)
+        with self._lock:
+            self._subscriptions[topic].append(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        with self._lock:
+            subscriptions = self._subscriptions.get(subscription.topic, [])
+            if subscription in subscriptions:
+                subscriptions.remove(subscription)
+
+    def add_callback(self, topic: str, callback: Callable):
+        with self._lock:
+            self._callbacks[topic].append(callback)
+
+    def remove_callback(self, topic: str, callback: Callable):
+        with self._lock:
+            if callback in self._callbacks.get(topic, []):
+                self._callbacks[topic].remove(callback)
+
+    def latest(self, topic: str, default=None):
+        return self._latest.get(topic, default)
+
+    def publish(self, topic: str, message):
+        with self._lock:
+            self._latest[topic] = message
+            self.published += 1
+            subscriptions = list(self._subscriptions.get(topic, ()))
+            callbacks = list(self._callbacks.get(topic, ()))
+        try:
+            current_loop = asyncio.get_running_loop()
+        except RuntimeError:
+            current_loop = None
+        for subscription in subscriptions:
+            if subscription._loop is current_loop:
+                subscription._put(message)
+            else:
+                try:
+                    subscription._loop.call_soon_threadsafe(subscription._put, message)
+                except RuntimeError:
+                    self.unsubscribe(subscription)  # Its loop is closed
+        for callback in callbacks:
+            try:
+                callback(message)
+            except Exception:
+                logger.exception(f"Callback for {topic} failed")
+
+
+class CandleBuilder:
+    """
+    Aggregates trades, or the exchange's own candle updates, into OHLCV bars
+    of one timeframe. Every method returns the bars it closed.
+
+    Updates older than the last closed bar are counted in late_updates and
+    ignored, so a closed bar is never emitted twice.
+    """
+
+    def __init__(self, timeframe: str):
+        self.timeframe = timeframe
+        self.step = timeframe_ms(timeframe)
+        self.current: Optional[list] = None
+        self.late_updates = 0
+        self._closed_until = 0
+
+    def _roll(self, start: int) -> Optional[list]:
+        """
+        Close the forming bar if start lies beyond it; None if start is late.
+        """
+        if start < self._closed_until or (
+            self.current is not None and start < self.current[0]
+        ):
+            self.late_updates += 1
+            return None
+        if self.current is not None and start > self.current[0]:
+            return self._close()
+        return []
+
+    def _close(self) -> list:
+        closed = self.current
+        self.current = None
+        self._closed_until = closed[0] + self.step
+        return [closed]
+
+    def add_trade(self, timestamp: int, price: float, amount: float) -> list:
+        start = timestamp - timestamp % self.step
+        closed = self._roll(start)
+        if closed is None:
+            return []
+        if self.current is None:
+            self.current = [start, price, price, price, price, abs(amount)]
+        else:
+            bar = self.current
+            bar[2] = max(bar[2], price)
+            bar[3] = min(bar[3], price)
+            bar[4] = price
+            bar[5] += abs(amount)
+        return closed
+
+    def add_candle(self, candle: list) -> list:
+        closed = self._roll(int(candle[0]))
+        if closed is None:
+            return []
+        self.current = [int(candle[0])] + [float(value) for value in candle[1:6]]
+        return closed
+
+    def close_until(self, now_ms: float) -> list:
+        """
+        Close the forming bar once now_ms has passed its end, without waiting
+        for the first update of the next bar.
+        """
+        if self.current is not None and self.current[0] + self.step <= now_ms:
+            return self._close()
+        return []
+
+
+class JsonProtocol:
+    """
+    Normalized wire format: every message is a JSON event, or a list of
+    them, shaped like the events MarketDataStream publishes, e.g.
+    {"channel": "trade", "symbol": "BTC/USD", "timestamp": ..., "price": ...,
+    "amount": ...}. ReplayServer recordings use it.
+    """
+
+    def subscribe_messages(self, symbols, channels, timeframe) -> list:
+        return [
+            json.dumps(
+                {
+                    "op": "subscribe",
+                    "symbols": list(symbols),
+                    "channels": list(channels),
+                    "timeframe": timeframe,
+                }
+            )
+        ]
+
+    def parse(self, raw) -> list[dict]:
+        message = json.loads(raw)
+        events = message if isinstance(message, list) else [message]
+        return [event for event in events if event.get("channel") in CHANNELS]
+
+
+class BitfinexProtocol:
+    """
+    Bitfinex v2 public channels: ticker, trades and candles.
+    """
+
+    def __init__(self):
+        self._channels: dict[int, tuple[str, str]] = {}
+        self._symbols: dict[str, str] = {}
+
+    @staticmethod
+    def market_id(symbol: str) -> str:
+        base, quote = symbol.split(":")[0].split("/")
+        separator = "" if len(base) == 3 and len(quote) == 3 else ":"
+        return f"t{base}{separator}{quote}"
+
+    def subscribe_messages(self, symbols, channels, timeframe) -> list:
+        messages = []
+        for symbol in symbols:
+            market = self.market_id(symbol)
+            if "ticker" in channels:
+                messages.append({"channel": "ticker", "symbol": market})
+            if "trade" in channels:
+                messages.append({"channel": "trades", "symbol": market})
+            if "candle" in channels:
+                messages.append(
+                    {"channel": "candles", "key": f"trade:{timeframe}:{market}"}
+                )
+        self._symbols = {self.market_id(symbol): symbol for symbol in symbols}
+        return [json.dumps({"event": "subscribe", **m}) for m in messages]
+
+    def parse(self, raw) -> list[dict]:
+        message = json.loads(raw)
+        if isinstance(message, dict):
+            if message.get("event") == "subscribed":
+                market = message.get("symbol") or message["key"].split(":", 2)[2]
+                channel = {"trades": "trade", "candles": "candle"}.get(
+                    message["channel"], message["channel"]
+                )
+                self._channels[message["chanId"]] = (channel, self._symbols[market])
+            return []
+        channel_id, payload = message[0], message[1]
+        if channel_id not in self._channels or payload in ("hb", []):
+            return []
+        channel, symbol = self._channels[channel_id]
+        if payload in ("te", "tu"):
+            if payload == "tu":
+                return []  # Repeats a "te" trade with its final id
+            rows = [message[2]]
+        elif payload and isinstance(payload[0], list):
+            rows = payload  # Snapshot
+        else:
+            rows = [payload]
+        if channel == "ticker":
+            bid, _, ask, _, _, _, last, volume = rows[0][:8]
+            return [
+                {
+                    "channel": "ticker",
+                    "symbol": symbol,
+                    "timestamp": int(time.time() * 1000),
+                    "bid": bid,
+                    "ask": ask,
+                    "last": last,
+                    "baseVolume": volume,
+                }
+            ]
+        if channel == "trade":
+            return [
+                {
+                    "channel": "trade",
+                    "symbol": symbol,
+                    "timestamp": row[1],
+                    "amount": row[2],
+                    "price": row[3],
+                }
+                for row in sorted(rows, key=lambda row: row[1])
+            ]
+        return [
+            {
+                "channel": "candle",
+                "symbol": symbol,
+                # Bitfinex orders candle fields as MTS, OPEN, CLOSE, HIGH, LOW
+                "candle": [row[0], row[1], row[3], row[4], row[2], row[5]],
+            }
+            for row in sorted(rows, key=lambda row: row[0])
+        ]
+
+
+PROTOCOLS = {"json": JsonProtocol, "bitfinex": BitfinexProtocol}
+
+
+class MarketDataStream:
+    """
+    WebSocket market-data client feeding a PubSub.
+
+    Tickers and trades are published as they arrive; candles are built per
+    symbol by a CandleBuilder, from the candle channel when subscribed and
+    from trades otherwise. A bar is published on its candle topic as soon as
+    its timeframe ends (plus close_grace seconds for late trades), and every
+    bar update is merged into the optional CandleCache so readers of recent
+    candles need no REST request. The connection is re-established with
+    exponential backoff.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        symbols: Iterable[str],
+        timeframe: str = "1m",
+        channels: Iterable[str] = ("ticker", "trade"),
+        protocol=None,
+        pubsub: Optional[PubSub] = None,
+        candle_cache: Optional[CandleCache] = None,
+        clock: Callable[[], float] = time.time,
+        close_grace: float = 0.0,
+        reconnect_delay: float = 1.0,
+        max_reconnect_delay: float = 30.0,
+        record_file: Optional[str] = None,
+    ):
+        """
+        :param url: WebSocket endpoint
+        :param channels: Any of CHANNELS
+        :param protocol: Wire-format adapter, a PROTOCOLS name or instance;
+            JsonProtocol if None
+        :param clock: Epoch seconds, used to close bars on time
+        :param close_grace: Seconds after a bar's end before it is closed
+        :param record_file: Append every raw message with its receive time,
+            in the format ReplayServer.from_file reads
+        """
+        self.url = url
+        self.symbols = list(symbols)
+        self.timeframe = timeframe
+        self.channels = tuple(channels)
+        unknown = set(self.channels) - set(CHANNELS)
+        if unknown:
+            raise ValueError(f"Unknown channels: {sorted(unknown)}")
+        if protocol is None or isinstance(protocol, str):
+            protocol = PROTOCOLS[protocol or "json"]()
+        self.protocol = protocol
+        self.pubsub = pubsub or PubSub()
+        self.candle_cache = candle_cache
+        self.clock = clock
+        self.close_grace = close_grace
+        self.reconnect_delay = reconnect_delay
+        self.max_reconnect_delay = max_reconnect_delay
+        self.record_file = record_file
+        self.builders = {symbol: CandleBuilder(timeframe) for symbol in self.symbols}
+        self.messages = 0
+        self.candles_published = 0
+        self.reconnects = 0
+        self.connected = False
+        self._running = False
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._stopped: Optional[asyncio.Event] = None
+
+    def handle(self, event: dict):
+        """
+        Publish one normalized event and update the symbol's candle.
+        """
+        symbol = event.get("symbol")
+        builder = self.builders.get(symbol)
+        if builder is None:
+            return
+        channel = event["channel"]
+        if channel == "ticker":
+            self.pubsub.publish(ticker_topic(symbol), event)
+            return
+        if channel == "trade":
+            self.pubsub.publish(trade_topic(symbol), event)
+            if "candle" in self.channels:
+                return
+            closed = builder.add_trade(
+                int(event["timestamp"]), float(event["price"]), float(event["amount"])
+            )
+        else:
+            closed = builder.add_candle(event["candle"])
+        self._publish_candles(symbol, closed)
+        if self.candle_cache is not None and builder.current is not None:
+            self.candle_cache.update(symbol, self.timeframe, [builder.current])
+
+    def _publish_candles(self, symbol: str, candles: list):
+        if not candles:
+            return
+        if self.candle_cache is not None:
+            self.candle_cache.update(symbol, self.timeframe, candles)
+        topic = candle_topic(symbol, self.timeframe)
+        for candle in candles:
+            self.pubsub.publish(topic, candle)
+            self.candles_published += 1
+
+    def close_due(self, now: Optional[float] = None):
+        """
+        Publish every forming bar whose timeframe has ended.
+        """
+        now_ms = ((self.clock() if now is None else now) - self.close_grace) * 1000
+        for symbol, builder in self.builders.items():
+            self._publish_candles(symbol, builder.close_until(now_ms))
+
+    async def run(self, max_reconnects: Optional[int] = None):
+        """
+        Stream until stop(), reconnecting after connection errors.
+        """
+        self._loop = asyncio.get_running_loop()
+        self._stopped = asyncio.Event()
+        self._running = True
+        closer = asyncio.create_task(self._close_on_time())
+        delay = self.reconnect_delay
+        try:
+            while self._running:
+                try:
+                    async with connect(self.url) as ws:
+                        self.connected = True
+                        delay = self.reconnect_delay
+                        await self._consume(ws)
+                except (OSError, websockets.ConnectionClosed) as e:
+                    logger.warning(f"Market stream {self.url} disconnected: {e}")
+                finally:
+                    self.connected = False
+                if not self._running:
+                    break
+                if max_reconnects is not None and self.reconnects >= max_reconnects:
+                    break
+                self.reconnects += 1
+                try:
+                    await asyncio.wait_for(self._stopped.wait(), delay)
+                except asyncio.TimeoutError:
+                    pass
+                delay = min(delay * 2, self.max_reconnect_delay)
+        finally:
+            self._running = False
+            closer.cancel()
+
+    async def _consume(self, ws):
+        for message in self.protocol.subscribe_messages(
+            self.symbols, self.channels, self.timeframe
+        ):
+            await ws.send(message)
+        receiver = asyncio.ensure_future(self._receive(ws))
+        stopper = asyncio.ensure_future(self._stopped.wait())
+        done, pending = await asyncio.wait(
+            {receiver, stopper}, return_when=asyncio.FIRST_COMPLETED
+        )
+        for task in pending:
+            task.cancel()
+        if receiver in done:
+            receiver.result()
+
+    async def _receive(self, ws):
+        record = (
+            open(self.record_file, "a", encoding="utf-8") if self.record_file else None
+        )
+        try:
+            async for raw in ws:
+                self.messages += 1
+                if record is not None:
+                    record.write(
+                        json.dumps({"t": time.time() * 1000, "raw": raw}) + "\n"
+                    )
+                try:
+                    events = self.protocol.parse(raw)
+                except (ValueError, KeyError, IndexError, TypeError) as e:
+                    logger.warning(f"Unparsable market message {raw!r}: {e}")
+                    continue
+                for event in events:
+                    self.handle(event)
+        finally:
+            if record is not None:
+                record.close()
+
+    async def _close_on_time(self):
+        step = timeframe_ms(self.timeframe) / 1000
+        while True:
+            now = self.clock()
+            close_at = (now // step + 1) * step + self.close_grace
+            await asyncio.sleep(max(close_at - now, 0.001))
+            self.close_due()
+
+    def stop(self):
+        self._running = False
+        if self._loop is not None and self._stopped is not None:
+            try:
+                self._loop.call_soon_threadsafe(self._stopped.set)
+            except RuntimeError:
+                pass  # Loop already closed
+
+    def start_in_thread(self) -> threading.Thread:
+        """
+        Run the stream in a daemon thread with its own event loop.
+        """
+        thread = threading.Thread(
+            target=lambda: asyncio.run(self.run()), name="market-stream", daemon=True
+        )
+        thread.start()
+        return thread
+
+
+class ReplayServer:
+    """
+    Local WebSocket server replaying recorded messages, a stand-in for an
+    exchange feed in tests and offline runs.
+
+    Each client receives the whole recording after its first (subscribe)
+    message. Gaps between recorded receive times are replayed divided by
+    speed; speed 0 sends everything at once.
+    """
+
+    def __init__(
+        self,
+        messages: list[tuple[float, object]],
+        host: str = "127.0.0.1",
+        port: int = 0,
+        speed: float = 0.0,
+    ):
+        """
+        :param messages: (receive time in ms, message) pairs; messages that
+            are not strings are sent JSON-encoded
+        :param port: 0 picks a free port
+        """
+        self.messages = [
+            (t, m if isinstance(m, str) else json.dumps(m)) for t, m in messages
+        ]
+        self.host = host
+        self.port = port
+        self.speed = speed
+        self.subscriptions: list[str] = []
+        self._server = None
+
+    @classmethod
+    def from_file(cls, path: str, **kwargs) -> "ReplayServer":
+        """
+        Load a MarketDataStream record_file.
+        """
+        with open(path, "r", encoding="utf-8") as f:
+            entries = [json.loads(line) for line in f if line.strip()]
+        return cls([(entry["t"], entry["raw"]) for entry in entries], **kwargs)
+
+    @property
+    def url(self) -> str:
+        return f"ws://{self.host}:{self.port}"
+
+    async def start(self) -> str:
+        self._server = await serve(self._handler, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self.url
+
+    async def close(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    async def __aenter__(self) -> "ReplayServer":
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    async def _handler(self, ws):
+        self.subscriptions.append(await ws.recv())
+        previous = None
+        for t, message in self.messages:
+            if self.speed and previous is not None and t > previous:
+                await asyncio.sleep((t - previous) / 1000 / self.speed)
+            previous = t
+            await ws.send(message)
+        await ws.wait_closed()
@@ -0,0 +1,197 @@
+"""
+Running trading metrics for the dashboard.
+The bot pushes closed trades and position changes into a MetricsAggregator,
+which keeps totals in O(1) per event and refreshes the account balance only
+after a change or once a slow TTL has expired.
+"""
+
+import logging
+import threading
+import time
+from typing import Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class MetricsAggregator:
+    """
+    Thread-safe running totals of closed trades: count, wins, losses, PnL,
+    win rate and drawdown of the cumulative PnL curve.
+
+    The balance is fetched with balance_fetcher by refresh_balance(), which
+    start_balance_refresher() runs in a thread that sleeps until a trade or
+    position change marks the balance stale, or balance_ttl has passed.
+    Every change increments version and is passed to listeners, so readers
+    can tell whether anything moved without polling.
+    """
+
+    def __init__(
+        self,
+        balance_fetcher: Optional[Callable[[], dict]] = None,
+        balance_ttl: float = 300.0,
+        retry_delay: float = 5.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        :param balance_fetcher: Returns the account balance, e.g. ccxt
+            fetch_balance; no balance is tracked if None
+        :param balance_ttl: Seconds after which an unchanged balance is
+            fetched again
+        :param retry_delay: Seconds before retrying a failed fetch
+        """
+        self.balance_fetcher = balance_fetcher
+        self.balance_ttl = balance_ttl
+        self.retry_delay = retry_delay
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._stale = threading.Event()
+        self._stale.set()
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.total_trades = 0
+        self.winning_trades = 0
+        self.losing_trades = 0
+        self.total_pnl = 0.0
+        self.peak_pnl = 0.0
+        self.max_drawdown = 0.0
+        self.current_position: Optional[dict] = None
+        self.last_trade: Optional[dict] = None
+        self.balance: Optional[dict] = None
+        self.balance_fetched_at: Optional[float] = None
+        self.balance_fetches = 0
+        self.version = 0
+        self._listeners: list[Callable[[str, object], None]] = []
+
+    def add_listener(self, callback: Callable[[str, object], None]):
+        """
+        Registers callback(event, data), called after every change with
+        event "trade", "position", "metrics" or "balance".
+        """
+        self._listeners.append(callback)
+
+    def _notify(self, event: str, data):
+        for callback in list(self._listeners):
+            try:
+                callback(event, data)
+            except Exception as e:
+                logger.error(f"Error in metrics listener: {e}")
+
+    def record_trade(self, trade: dict):
+        """
+        Adds a closed trade; trades with pnl > 0 count as wins.
+        """
+        pnl = float(trade.get("pnl") or 0.0)
+        with self._lock:
+            self.total_trades += 1
+            if pnl > 0:
+                self.winning_trades += 1
+            else:
+                self.losing_trades += 1
+            self.total_pnl += pnl
+            self.peak_pnl = max(self.peak_pnl, self.total_pnl)
+            self.max_drawdown = max(self.max_drawdown, self.peak_pnl - self.total_pnl)
+            self.last_trade = trade
+            self.version += 1
+            metrics = self._metrics()
+        self._stale.set()
+        self._notify("trade", trade)
+        self._notify("metrics", metrics)
+
+    def record_position(self, position: Optional[dict]):
+        """
+        Sets the open position, None once it is closed.
+        """
+        with self._lock:
+            self.current_position = position
+            self.version += 1
+        self._stale.set()
+        self._notify("position", position)
+
+    def mark_balance_stale(self):
+        """
+        Requests a balance refresh, e.g. after a manual order.
+        """
+        self._stale.set()
+
+    def metrics(self) -> dict:
+        with self._lock:
+            return self._metrics()
+
+    def _metrics(self) -> dict:
+        return {
+            "total_trades": self.total_trades,
+            "winning_trades": self.winning_trades,
+            "losing_trades": self.losing_trades,
+            "total_pnl": self.total_pnl,
+            "win_rate": (
+                self.winning_trades / self.total_trades if self.total_trades else 0
+            ),
+            "drawdown": self.peak_pnl - self.total_pnl,
+            "max_drawdown": self.max_drawdown,
+        }
+
+    def snapshot(self) -> dict:
+        """
+        Metrics, open position and last balance in one consistent read.
+        """
+        with self._lock:
+            return {
+                "metrics": self._metrics(),
+                "current_position": self.current_position,
+                "balance": self.balance,
+                "version": self.version,
+            }
+
+    def balance_due(self) -> bool:
+        if self.balance_fetcher is None:
+            return False
+        if self._stale.is_set() or self.balance_fetched_at is None:
+            return True
+        return self._clock() - self.balance_fetched_at >= self.balance_ttl
+
+    def refresh_balance(self) -> bool:
+        """
+        Fetches the balance now; a failure keeps the last one.
+
+        :return: True if the balance was fetched
+        """
+        self._stale.clear()
+        try:
+            balance = self.balance_fetcher()
+        except Exception as e:
+            logger.error(f"Error fetching balance: {e}")
+            self._stale.set()
+            return False
+        with self._lock:
+            self.balance = balance
+            self.balance_fetched_at = self._clock()
+            self.balance_fetches += 1
+            self.version += 1
+        self._notify("balance", balance)
+        return True
+
+    def _refresh_loop(self):
+        while self.balance_fetcher is not None and not self._stopped.is_set():
+            if self.balance_due() and not self.refresh_balance():
+                self._stopped.wait(self.retry_delay)
+                continue
+            remaining = self.balance_ttl
+            if self.balance_fetched_at is not None:
+                remaining -= self._clock() - self.balance_fetched_at
+            self._stale.wait(max(remaining, 0.0))
+
+    def start_balance_refresher(self) -> threading.Thread:
+        """
+        Keeps the balance fresh from a daemon thread until stop().
+        """
+        if self._thread is None or not self._thread.is_alive():
+            self._stopped.clear()
+            self._thread = threading.Thread(
+                target=self._refresh_loop, daemon=True, name="balance-refresher"
+            )
+            self._thread.start()
+        return self._thread
+
+    def stop(self):
+        self._stopped.set()
+        self._stale.set()
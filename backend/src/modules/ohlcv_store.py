@@ -0,0 +1,292 @@
+"""
+Columnar on-disk OHLCV store.
+Candles are kept as one raw .npy file per column, partitioned as
+<root>/<symbol>/<timeframe>/<YYYY-MM>/<version>/, and read back through
+memory maps. A CURRENT file in the month directory names the live version.
+"""
+
+import argparse
+import contextlib
+import os
+import shutil
+import tempfile
+import threading
+from typing import Iterable, Iterator, Optional
+
+import numpy as np
+import pandas as pd
+
+OHLCV_COLUMNS = ("timestamp", "open", "high", "low", "close", "volume")
+CURRENT_FILE = "CURRENT"
+
+
+def _to_datetime64(value) -> np.datetime64:
+    timestamp = pd.Timestamp(value)
+    if timestamp.tzinfo is not None:
+        timestamp = timestamp.tz_convert("UTC").tz_localize(None)
+    return np.datetime64(timestamp.as_unit("ns").to_datetime64(), "ns")
+
+
+def _naive_utc(timestamps: pd.Series) -> np.ndarray:
+    timestamps = pd.to_datetime(timestamps)
+    if timestamps.dt.tz is not None:
+        timestamps = timestamps.dt.tz_convert("UTC").dt.tz_localize(None)
+    return timestamps.to_numpy(dtype="datetime64[ns]")
+
+
+class OHLCVStore:
+    """
+    Candle history for many symbols and timeframes under one directory.
+
+    Timestamps are stored as naive UTC datetime64[ns], prices and volume as
+    float64, sorted and unique per partition. Reads memory-map only the
+    requested columns and binary-search the requested date range, so a
+    range inside one month is returned without copying.
+
+    A merge writes every column of a partition into a new version directory
+    and then swaps the CURRENT pointer with one os.replace, so readers see
+    either the old or the new partition and never a mix of the two.
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+        self._lock = threading.Lock()
+        os.makedirs(root, exist_ok=True)
+
+    @staticmethod
+    def _safe_name(name: str) -> str:
+        return name.replace("/", "-").replace(":", "_")
+
+    def _series_dir(self, symbol: str, timeframe: str) -> str:
+        return os.path.join(self.root, self._safe_name(symbol), timeframe)
+
+    def partitions(self, symbol: str, timeframe: str) -> list[str]:
+        """
+        Sorted YYYY-MM partitions stored for symbol/timeframe.
+        """
+        path = self._series_dir(symbol, timeframe)
+        if not os.path.isdir(path):
+            return []
+        return sorted(
+            entry.name
+            for entry in os.scandir(path)
+            if entry.is_dir()
+            and (
+                os.path.exists(os.path.join(entry.path, CURRENT_FILE))
+                or os.path.exists(os.path.join(entry.path, "timestamp.npy"))
+            )
+        )
+
+    @staticmethod
+    def _version_dir(month_dir: str) -> str:
+        """
+        Directory holding the live columns of a partition; the month
+        directory itself for partitions written before versioning.
+        """
+        try:
+            with open(os.path.join(month_dir, CURRENT_FILE), "r") as f:
+                return os.path.join(month_dir, f.read().strip())
+        except FileNotFoundError:
+            return month_dir
+
+    def _load_partition(
+        self, symbol: str, timeframe: str, month: str, columns: Iterable[str]
+    ) -> dict[str, np.ndarray]:
+        month_dir = os.path.join(self._series_dir(symbol, timeframe), month)
+        columns = list(columns)
+        for attempt in range(5):
+            path = self._version_dir(month_dir)
+            try:
+                arrays = {
+                    column: np.load(os.path.join(path, f"{column}.npy"), mmap_mode="r")
+                    for column in columns
+                }
+                break
+            except FileNotFoundError:
+                # A writer swapped in a new version and removed this one
+                if attempt == 4:
+                    raise
+        if len({len(values) for values in arrays.values()}) > 1:
+            raise ValueError(f"Columns of partition {path} differ in length")
+        return arrays
+
+    def write(self, symbol: str, timeframe: str, df: pd.DataFrame) -> int:
+        """
+        Merge OHLCV rows into the store, replacing rows with equal timestamps.
+
+        :return: Number of rows written
+        """
+        if df.empty:
+            return 0
+        timestamps = _naive_utc(df["timestamp"])
+        values = {
+            column: df[column].to_numpy(dtype=np.float64)
+            for column in OHLCV_COLUMNS[1:]
+        }
+        months = timestamps.astype("datetime64[M]")
+        with self._lock:
+            for month in np.unique(months):
+                mask = months == month
+                rows = {"timestamp": timestamps[mask]}
+                rows.update({column: array[mask] for column, array in values.items()})
+                self._merge_partition(symbol, timeframe, str(month), rows)
+        return len(df)
+
+    def _merge_partition(
+        self, symbol: str, timeframe: str, month: str, rows: dict[str, np.ndarray]
+    ):
+        month_dir = os.path.join(self._series_dir(symbol, timeframe), month)
+        old_dir = self._version_dir(month_dir)
+        if os.path.exists(os.path.join(old_dir, "timestamp.npy")):
+            existing = self._load_partition(symbol, timeframe, month, OHLCV_COLUMNS)
+            rows = {
+                column: np.concatenate((existing[column], rows[column]))
+                for column in OHLCV_COLUMNS
+            }
+        # Later rows win on duplicate timestamps
+        timestamps = rows["timestamp"]
+        order = np.argsort(timestamps, kind="stable")
+        reversed_order = order[::-1]
+        _, first = np.unique(timestamps[reversed_order], return_index=True)
+        keep = reversed_order[first]
+        os.makedirs(month_dir, exist_ok=True)
+        new_dir = tempfile.mkdtemp(prefix="v", dir=month_dir)
+        for column in OHLCV_COLUMNS:
+            with open(os.path.join(new_dir, f"{column}.npy"), "wb") as f:
+                np.save(f, np.ascontiguousarray(rows[column][keep]), allow_pickle=False)
+        pointer = os.path.join(month_dir, CURRENT_FILE)
+        tmp_path = f"{pointer}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w") as f:
+            f.write(os.path.basename(new_dir))
+        os.replace(tmp_path, pointer)
+        # Readers that already mapped old columns keep them; a reader that
+        # is just opening the old version retries with the new one
+        for entry in os.scandir(month_dir):
+            if entry.is_dir() and entry.path != new_dir:
+                shutil.rmtree(entry.path, ignore_errors=True)
+            elif entry.name.endswith(".npy"):
+                with contextlib.suppress(OSError):
+                    os.remove(entry.path)
+
+    def _columns(self, columns: Optional[Iterable[str]]) -> list[str]:
+        columns = list(OHLCV_COLUMNS[1:] if columns is None else columns)
+        unknown = set(columns) - set(OHLCV_COLUMNS)
+        if unknown:
+            raise ValueError(f"Unknown OHLCV columns: {sorted(unknown)}")
+        return ["timestamp"] + [c for c in columns if c != "timestamp"]
+
+    def _pieces(
+        self, symbol: str, timeframe: str, start, end, columns: list[str]
+    ) -> Iterator[dict[str, np.ndarray]]:
+        start = _to_datetime64(start) if start is not None else None
+        end = _to_datetime64(end) if end is not None else None
+        for month in self.partitions(symbol, timeframe):
+            month_start = np.datetime64(month, "M")
+            if end is not None and month_start >= end.astype("datetime64[M]") + 1:
+                break
+            if start is not None and month_start < start.astype("datetime64[M]"):
+                continue
+            arrays = self._load_partition(symbol, timeframe, month, columns)
+            timestamps = arrays["timestamp"]
+            lo = 0 if start is None else np.searchsorted(timestamps, start, "left")
+            hi = len(timestamps)
+            if end is not None:
+                hi = np.searchsorted(timestamps, end, "left")
+            if hi > lo:
+                yield {c: values[lo:hi] for c, values in arrays.items()}
+
+    def read(
+        self,
+        symbol: str,
+        timeframe: str,
+        start=None,
+        end=None,
+        columns: Optional[Iterable[str]] = None,
+    ) -> pd.DataFrame:
+        """
+        Candles with start <= timestamp < end as a DataFrame.
+
+        Columns are read-only views of the memory-mapped files when the range
+        falls inside one partition; spanning months concatenates them.
+
+        :param start: Inclusive lower bound, anything pd.Timestamp accepts
+        :param end: Exclusive upper bound
+        :param columns: Columns to load besides timestamp, defaults to all
+        """
+        columns = self._columns(columns)
+        pieces = list(self._pieces(symbol, timeframe, start, end, columns))
+        if not pieces:
+            data = {c: np.empty(0, dtype=self._dtype(c)) for c in columns}
+        elif len(pieces) == 1:
+            data = pieces[0]
+        else:
+            data = {c: np.concatenate([p[c] for p in pieces]) for c in columns}
+        return pd.DataFrame(data, copy=False)
+
+    def iter_months(
+        self,
+        symbol: str,
+        timeframe: str,
+        start=None,
+        end=None,
+        columns: Optional[Iterable[str]] = None,
+    ) -> Iterator[pd.DataFrame]:
+        """
+        Same rows as read(), as one memory-mapped DataFrame per partition.
+        """
+        columns = self._columns(columns)
+        for piece in self._pieces(symbol, timeframe, start, end, columns):
+            yield pd.DataFrame(piece, copy=False)
+
+    @staticmethod
+    def _dtype(column: str) -> str:
+        return "datetime64[ns]" if column == "timestamp" else "float64"
+
+    def first_timestamp(self, symbol: str, timeframe: str) -> Optional[pd.Timestamp]:
+        months = self.partitions(symbol, timeframe)
+        if not months:
+            return None
+        timestamps = self._load_partition(symbol, timeframe, months[0], ["timestamp"])
+        return pd.Timestamp(timestamps["timestamp"][0])
+
+    def last_timestamp(self, symbol: str, timeframe: str) -> Optional[pd.Timestamp]:
+        months = self.partitions(symbol, timeframe)
+        if not months:
+            return None
+        timestamps = self._load_partition(symbol, timeframe, months[-1], ["timestamp"])
+        return pd.Timestamp(timestamps["timestamp"][-1])
+
+    def import_csv(
+        self,
+        csv_file: str,
+        symbol: str,
+        timeframe: str,
+        chunksize: int = 1_000_000,
+    ) -> int:
+        """
+        Convert a CSV with timestamp/open/high/low/close/volume columns into
+        the store, reading it in chunks.
+
+        :return: Number of rows imported
+        """
+        total = 0
+        for chunk in pd.read_csv(
+            csv_file,
+            usecols=list(OHLCV_COLUMNS),
+            parse_dates=["timestamp"],
+            chunksize=chunksize,
+        ):
+            total += self.write(symbol, timeframe, chunk)
+        return total
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Import OHLCV CSV into the store")
+    parser.add_argument("csv_file", help="CSV with OHLCV data")
+    parser.add_argument("-r", "--root", required=True, help="Store directory")
+    parser.add_argument("-s", "--symbol", required=True, help="Symbol, e.g. BTC/USD")
+    parser.add_argument("-t", "--timeframe", required=True, help="Timeframe, e.g. 1h")
+    args = parser.parse_args()
+
+    rows = OHLCVStore(args.root).import_csv(args.csv_file, args.symbol, args.timeframe)
+    print(f"Imported {rows} candles into {args.root}")
@@ -1,63 +1,975 @@
 """
 Order management functions for trading bot.
-Includes exchange init, order placement, cancel, and balance fetch.
+Includes exchange init, shared rate limiting, single, batch and async order
+placement, cancel, and balance fetch.
 """
 
-from typing import Any, Optional
+import asyncio
+import contextlib
+import contextvars
+import hashlib
+import heapq
+import itertools
+import json
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Optional
 
 import ccxt
+import ccxt.async_support as ccxt_async
+from requests import Session
+from requests.adapters import HTTPAdapter
 
+from .paper_exchange import PAPER_EXCHANGE_ID, AsyncPaperExchange, PaperExchange
 from .utils import ensure_paper_trading_symbol
 
+logger = logging.getLogger(__name__)
+
 _Exchange: Optional[ccxt.Exchange] = None
 
-def init_exchange(api_key: str, api_secret: str, exchange_name: str) -> ccxt.Exchange:
+# Seconds a markets cache file is used without refreshing it
+MARKETS_CACHE_TTL = 6 * 3600
+
+
+def pooled_session(pool_size: int = 10) -> Session:
     """
-    Initializes and returns a ccxt exchange instance.
+    HTTP session keeping up to pool_size keep-alive connections per host.
     """
-    global _Exchange
+    session = Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def create_exchange(
+    api_key: str,
+    api_secret: str,
+    exchange_name: str,
+    session: Optional[Session] = None,
+    **paper_options,
+) -> ccxt.Exchange:
+    """
+    Builds a new rate-limited ccxt client, using session for HTTP if given.
+    The exchange name "paper" builds an in-process PaperExchange.
+
+    :param paper_options: PaperExchange arguments, e.g. candle_source,
+        timeframe and warmup; only valid for "paper"
+    """
+    if exchange_name == PAPER_EXCHANGE_ID:
+        return PaperExchange(
+            {"apiKey": api_key, "secret": api_secret}, session=session, **paper_options
+        )
+    if paper_options:
+        raise ValueError(f"Exchange '{exchange_name}' takes no paper options")
     exchange_class = getattr(ccxt, exchange_name, None)
     if not exchange_class:
         raise RuntimeError(f"Exchange '{exchange_name}' not found in ccxt.")
-    exchange = exchange_class({
+    config = {
         "apiKey": api_key,
         "secret": api_secret,
         "enableRateLimit": True,
-    })
+    }
+    if session is not None:
+        config["session"] = session
+    return exchange_class(config)
+
+
+def create_async_exchange(
+    api_key: str, api_secret: str, exchange_name: str
+) -> ccxt_async.Exchange:
+    """
+    Builds an asyncio ccxt client throttled by the exchange's shared rate
+    limiter. The caller must await close().
+    A "paper" client wraps the shared PaperExchange of client_registry.
+    """
+    if exchange_name == PAPER_EXCHANGE_ID:
+        return AsyncPaperExchange(
+            client_registry.get(api_key, api_secret, exchange_name)
+        )
+    exchange_class = getattr(ccxt_async, exchange_name, None)
+    if not exchange_class:
+        raise RuntimeError(f"Exchange '{exchange_name}' not found in ccxt.")
+    exchange = exchange_class(
+        {
+            "apiKey": api_key,
+            "secret": api_secret,
+            "enableRateLimit": True,
+        }
+    )
+    return attach_rate_limiter(
+        exchange, shared_rate_limiter(exchange_name, exchange.rateLimit)
+    )
+
+
+# Priority lanes of the shared rate limiter; lower values are served first
+LANES = {"orders": 0, "market_data": 1, "background": 2}
+DEFAULT_LANE = "market_data"
+
+_current_lane: contextvars.ContextVar = contextvars.ContextVar(
+    "rate_limit_lane", default=DEFAULT_LANE
+)
+
+
+@contextlib.contextmanager
+def rate_limit_lane(lane: str):
+    """
+    Sends the exchange requests made inside the block through lane.
+    The lane is tracked per thread and per asyncio task.
+    """
+    if lane not in LANES:
+        raise ValueError(f"Unknown rate limit lane: {lane}")
+    token = _current_lane.set(lane)
+    try:
+        yield
+    finally:
+        _current_lane.reset(token)
+
+
+class _Waiter:
+    __slots__ = (
+        "lane",
+        "weight",
+        "queued_at",
+        "waited",
+        "event",
+        "loop",
+        "future",
+        "cancelled",
+    )
+
+    def __init__(
+        self,
+        lane: str,
+        weight: float,
+        queued_at: float,
+        loop: Optional[asyncio.AbstractEventLoop],
+    ):
+        self.lane = lane
+        self.weight = weight
+        self.queued_at = queued_at
+        self.waited = 0.0
+        self.loop = loop
+        self.event = None if loop else threading.Event()
+        self.future = loop.create_future() if loop else None
+        self.cancelled = False
+
+
+class RateLimiter:
+    """
+    Token bucket shared by every exchange caller, with priority lanes.
+
+    Tokens refill at rate per second up to capacity and a request costs its
+    endpoint weight. Requests pass at once while tokens last. Otherwise they
+    queue, and a dispatcher thread grants tokens to the waiting request of
+    the most urgent lane first, in arrival order within a lane, so order
+    placement overtakes queued market-data and polling requests. Sync and
+    asyncio callers share one queue.
+
+    With state_file the bucket lives in a file locked with fcntl, so every
+    process using that file shares one budget.
+    """
+
+    def __init__(
+        self,
+        rate: Optional[float],
+        capacity: float = 1.0,
+        weights: Optional[dict] = None,
+        state_file: Optional[str] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        :param rate: Tokens per second, 0 or None for no limit
+        :param capacity: Burst size in tokens
+        :param weights: Cost per ccxt API path, overriding ccxt's own costs
+        :param state_file: File shared with other processes, in-memory if None
+        :param clock: Monotonic time source of the in-memory bucket
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self.weights = dict(weights or {})
+        self.state_file = state_file
+        self._clock = clock
+        self._tokens = capacity
+        self._updated = clock()
+        self._lock = threading.Lock()
+        self._wakeup = threading.Condition(self._lock)
+        self._waiters: list = []
+        self._seq = itertools.count()
+        self._dispatcher: Optional[threading.Thread] = None
+        self._stats = {
+            lane: {"requests": 0, "queued": 0, "wait_total": 0.0, "wait_max": 0.0}
+            for lane in LANES
+        }
+
+    def configure(
+        self,
+        rate: Optional[float] = None,
+        capacity: Optional[float] = None,
+        weights: Optional[dict] = None,
+        state_file: Optional[str] = None,
+    ):
+        """
+        Updates settings in place, so clients holding this limiter keep it.
+        """
+        with self._lock:
+            if rate is not None:
+                self.rate = rate
+            if capacity is not None:
+                self.capacity = capacity
+                self._tokens = min(self._tokens, capacity)
+            if weights:
+                self.weights.update(weights)
+            if state_file is not None:
+                self.state_file = state_file
+            self._wakeup.notify()
+
+    def _try_take(self, weight: float) -> float:
+        """
+        Takes weight tokens if available, otherwise returns the seconds until
+        they will be. A weight above capacity only needs a full bucket.
+        """
+        if not self.rate:
+            return 0.0
+        if self.state_file:
+            return self._try_take_shared(weight)
+        now = self._clock()
+        self._tokens = min(
+            self.capacity, self._tokens + (now - self._updated) * self.rate
+        )
+        self._updated = now
+        needed = min(weight, self.capacity)
+        if self._tokens >= needed:
+            self._tokens -= weight
+            return 0.0
+        return (needed - self._tokens) / self.rate
+
+    def _try_take_shared(self, weight: float) -> float:
+        import fcntl
+
+        with open(self.state_file, "a+", encoding="utf-8") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                f.seek(0)
+                now = time.time()
+                try:
+                    tokens, updated = (float(value) for value in f.read().split())
+                except ValueError:
+                    tokens, updated = self.capacity, now
+                tokens = min(
+                    self.capacity, tokens + max(now - updated, 0.0) * self.rate
+                )
+                needed = min(weight, self.capacity)
+                wait = 0.0
+                if tokens >= needed:
+                    tokens -= weight
+                else:
+                    wait = (needed - tokens) / self.rate
+                f.seek(0)
+                f.truncate()
+                f.write(f"{tokens!r} {now!r}")
+                f.flush()
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+        return wait
+
+    def _enqueue(self, weight: float, lane: Optional[str], loop) -> Optional[_Waiter]:
+        lane = lane or _current_lane.get()
+        with self._lock:
+            stats = self._stats[lane]
+            stats["requests"] += 1
+            if not self._waiters and self._try_take(weight) == 0.0:
+                return None
+            waiter = _Waiter(lane, weight, self._clock(), loop)
+            stats["queued"] += 1
+            heapq.heappush(self._waiters, (LANES[lane], next(self._seq), waiter))
+            if self._dispatcher is None:
+                self._dispatcher = threading.Thread(
+                    target=self._dispatch, daemon=True, name="rate-limiter"
+                )
+                self._dispatcher.start()
+            self._wakeup.notify()
+            return waiter
+
+    def _dispatch(self):
+        with self._lock:
+            while True:
+                while self._waiters and self._waiters[0][2].cancelled:
+                    heapq.heappop(self._waiters)
+                if not self._waiters:
+                    self._wakeup.wait(1.0)
+                    if not self._waiters:
+                        self._dispatcher = None
+                        return
+                    continue
+                waiter = self._waiters[0][2]
+                wait = self._try_take(waiter.weight)
+                if wait:
+                    # A more urgent request arriving meanwhile wakes us early
+                    self._wakeup.wait(wait)
+                    continue
+                heapq.heappop(self._waiters)
+                self._grant(waiter)
+
+    def _grant(self, waiter: _Waiter):
+        waiter.waited = self._clock() - waiter.queued_at
+        stats = self._stats[waiter.lane]
+        stats["wait_total"] += waiter.waited
+        stats["wait_max"] = max(stats["wait_max"], waiter.waited)
+        if waiter.event is not None:
+            waiter.event.set()
+            return
+        future = waiter.future
+        try:
+            waiter.loop.call_soon_threadsafe(
+                lambda: future.done() or future.set_result(None)
+            )
+        except RuntimeError:
+            pass  # Loop already closed
+
+    def _cancel(self, waiter: _Waiter) -> bool:
+        """
+        Withdraws a waiter; False if it was granted in the meantime.
+        """
+        with self._lock:
+            if any(entry[2] is waiter for entry in self._waiters):
+                waiter.cancelled = True
+                return True
+            return False
+
+    def acquire(
+        self,
+        weight: float = 1.0,
+        lane: Optional[str] = None,
+        timeout: Optional[float] = None,
+    ) -> float:
+        """
+        Blocks until weight tokens are granted.
+
+        :param lane: One of LANES, defaults to the rate_limit_lane in effect
+        :param timeout: Seconds to queue before raising RateLimitExceeded
+        :return: Seconds spent queueing
+        """
+        if not self.rate:
+            return 0.0
+        waiter = self._enqueue(weight, lane, None)
+        if waiter is None:
+            return 0.0
+        if not waiter.event.wait(timeout) and self._cancel(waiter):
+            raise ccxt.RateLimitExceeded(f"No rate limit tokens within {timeout}s")
+        return waiter.waited
+
+    async def acquire_async(
+        self,
+        weight: float = 1.0,
+        lane: Optional[str] = None,
+        timeout: Optional[float] = None,
+    ) -> float:
+        """
+        asyncio version of acquire(); does not block the event loop.
+        """
+        if not self.rate:
+            return 0.0
+        waiter = self._enqueue(weight, lane, asyncio.get_running_loop())
+        if waiter is None:
+            return 0.0
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter.future), timeout)
+        except asyncio.TimeoutError:
+            if self._cancel(waiter):
+                raise ccxt.RateLimitExceeded(f"No rate limit tokens within {timeout}s")
+        except asyncio.CancelledError:
+            self._cancel(waiter)
+            raise
+        return waiter.waited
+
+    def stats(self) -> dict[str, dict]:
+        """
+        Per-lane request counts and queueing delay in seconds.
+        """
+        with self._lock:
+            waiting = {lane: 0 for lane in LANES}
+            for _, _, waiter in self._waiters:
+                if not waiter.cancelled:
+                    waiting[waiter.lane] += 1
+            return {
+                lane: {
+                    **stats,
+                    "waiting": waiting[lane],
+                    "wait_avg": (
+                        stats["wait_total"] / stats["queued"]
+                        if stats["queued"]
+                        else 0.0
+                    ),
+                }
+                for lane, stats in self._stats.items()
+            }
+
+
+_rate_limiters: dict[str, RateLimiter] = {}
+_rate_limiters_lock = threading.Lock()
+
+
+def shared_rate_limiter(
+    exchange_name: str, rate_limit_ms: Optional[float] = None
+) -> RateLimiter:
+    """
+    Process-wide limiter of an exchange, created on first use with the rate
+    implied by ccxt's rateLimit (milliseconds per request of cost 1).
+    """
+    with _rate_limiters_lock:
+        limiter = _rate_limiters.get(exchange_name)
+        if limiter is None:
+            limiter = _rate_limiters[exchange_name] = RateLimiter(None)
+        if limiter.rate is None and rate_limit_ms is not None:
+            # Configured before the first client, keep any explicit rate
+            limiter.configure(rate=1000 / rate_limit_ms if rate_limit_ms else 0.0)
+        return limiter
+
+
+def configure_rate_limiter(
+    exchange_name: str,
+    rate: Optional[float] = None,
+    capacity: Optional[float] = None,
+    weights: Optional[dict] = None,
+    state_file: Optional[str] = None,
+) -> RateLimiter:
+    """
+    Overrides the settings of an exchange's shared limiter.
+    """
+    limiter = shared_rate_limiter(exchange_name)
+    limiter.configure(rate, capacity, weights, state_file)
+    return limiter
+
+
+def rate_limiter_stats() -> dict[str, dict]:
+    with _rate_limiters_lock:
+        limiters = dict(_rate_limiters)
+    return {name: limiter.stats() for name, limiter in limiters.items()}
+
+
+def attach_rate_limiter(exchange, limiter: RateLimiter):
+    """
+    Routes a ccxt client's request throttling through limiter, which then
+    replaces the client's own per-instance limit. Limiter weights take
+    precedence over ccxt's endpoint costs.
+    """
+    ccxt_cost = exchange.calculate_rate_limiter_cost
+
+    def cost(api, method, path, params, config={}):
+        weight = limiter.weights.get(path)
+        return (
+            weight
+            if weight is not None
+            else ccxt_cost(api, method, path, params, config)
+        )
+
+    if asyncio.iscoroutinefunction(exchange.throttle):
+
+        async def throttle(cost=None):
+            await limiter.acquire_async(1 if cost is None else cost)
+
+    else:
+
+        def throttle(cost=None):
+            limiter.acquire(1 if cost is None else cost)
+
+    exchange.calculate_rate_limiter_cost = cost
+    exchange.throttle = throttle
+    exchange.rate_limiter = limiter
+    return exchange
+
+
+class ClientRegistry:
+    """
+    Thread-safe registry of long-lived ccxt clients, one per exchange and
+    credential pair.
+
+    Clients keep their loaded markets, HTTP connection pool and rate-limit
+    state for the life of the process. reconnect() swaps the HTTP session of
+    an existing client in place, so every holder of the client recovers.
+    """
+
+    def __init__(
+        self,
+        factory: Callable[..., ccxt.Exchange] = create_exchange,
+        pool_size: int = 10,
+    ):
+        self._factory = factory
+        self.pool_size = pool_size
+        self._clients: dict[tuple, ccxt.Exchange] = {}
+        self._health: dict[tuple, dict] = {}
+        self._reconnect_hooks: list[Callable[[ccxt.Exchange], None]] = []
+        self._lock = threading.RLock()
+
+    @staticmethod
+    def key(api_key: str, api_secret: str, exchange_name: str) -> tuple:
+        secret_hash = hashlib.sha256((api_secret or "").encode()).hexdigest()
+        return (exchange_name, api_key or "", secret_hash)
+
+    def get(
+        self, api_key: str, api_secret: str, exchange_name: str, **options
+    ) -> ccxt.Exchange:
+        """
+        Returns the client for these credentials, creating it on first use.
+
+        :param options: Extra factory arguments, used only when the client
+            is created
+        """
+        key = self.key(api_key, api_secret, exchange_name)
+        client = self._clients.get(key)
+        if client is not None:
+            return client
+        with self._lock:
+            client = self._clients.get(key)
+            if client is None:
+                client = self._factory(
+                    api_key,
+                    api_secret,
+                    exchange_name,
+                    session=pooled_session(self.pool_size),
+                    **options,
+                )
+                if getattr(client, "rateLimit", 0) and hasattr(client, "throttle"):
+                    attach_rate_limiter(
+                        client, shared_rate_limiter(exchange_name, client.rateLimit)
+                    )
+                self._clients[key] = client
+            return client
+
+    def add_reconnect_hook(self, hook: Callable[[ccxt.Exchange], None]):
+        """
+        Registers hook(client), called after a client has been reconnected.
+        """
+        self._reconnect_hooks.append(hook)
+
+    def reconnect(
+        self, api_key: str, api_secret: str, exchange_name: str
+    ) -> ccxt.Exchange:
+        """
+        Replaces the client's HTTP session, dropping any broken connections.
+        """
+        client = self.get(api_key, api_secret, exchange_name)
+        with self._lock:
+            old_session = getattr(client, "session", None)
+            client.session = pooled_session(self.pool_size)
+        if old_session is not None:
+            old_session.close()
+        logger.info("Reconnected %s client", exchange_name)
+        for hook in list(self._reconnect_hooks):
+            hook(client)
+        return client
+
+    def check_health(
+        self, api_key: str, api_secret: str, exchange_name: str, reconnect: bool = True
+    ) -> dict:
+        """
+        Probes the exchange with a cheap public call and records the result.
+        A failed probe triggers reconnect() unless reconnect is False.
+
+        :return: Dict with ok, latency_ms, error and checked_at
+        """
+        client = self.get(api_key, api_secret, exchange_name)
+        started = time.perf_counter()
+        try:
+            if client.has.get("fetchTime"):
+                client.fetch_time()
+            else:
+                client.fetch_status()
+            status = {"ok": True, "error": None}
+        except Exception as e:
+            status = {"ok": False, "error": str(e)}
+        status["latency_ms"] = (time.perf_counter() - started) * 1000
+        status["checked_at"] = time.time()
+        self._health[self.key(api_key, api_secret, exchange_name)] = status
+        if not status["ok"] and reconnect:
+            self.reconnect(api_key, api_secret, exchange_name)
+        return status
+
+    def health(self) -> dict[str, dict]:
+        """
+        Last health status per client, keyed by exchange id and a short hash
+        of the secret so credentials are not exposed.
+        """
+        return {
+            f"{key[0]}:{key[2][:8]}": status for key, status in self._health.items()
+        }
+
+    def remove(self, api_key: str, api_secret: str, exchange_name: str):
+        with self._lock:
+            client = self._clients.pop(
+                self.key(api_key, api_secret, exchange_name), None
+            )
+            self._health.pop(self.key(api_key, api_secret, exchange_name), None)
+        session = getattr(client, "session", None)
+        if session is not None:
+            session.close()
+
+    def close_all(self):
+        with self._lock:
+            clients = list(self._clients.values())
+            self._clients.clear()
+            self._health.clear()
+        for client in clients:
+            session = getattr(client, "session", None)
+            if session is not None:
+                session.close()
+
+    def __len__(self) -> int:
+        return len(self._clients)
+
+
+client_registry = ClientRegistry()
+
+
+def save_markets(exchange: ccxt.Exchange, cache_file: str):
+    """
+    Writes the exchange's loaded markets and currencies to cache_file.
+    """
+    payload = {
+        "exchange": exchange.id,
+        "saved_at": time.time(),
+        "markets": exchange.markets,
+        "currencies": exchange.currencies,
+    }
+    os.makedirs(os.path.dirname(os.path.abspath(cache_file)), exist_ok=True)
+    tmp_file = f"{cache_file}.{os.getpid()}.tmp"
+    with open(tmp_file, "w", encoding="utf-8") as f:
+        json.dump(payload, f, default=str)
+    os.replace(tmp_file, cache_file)
+
+
+def load_cached_markets(exchange: ccxt.Exchange, cache_file: str) -> Optional[float]:
+    """
+    Applies markets from cache_file with set_markets.
+
+    :return: Age of the cache in seconds, or None if there was no usable cache
+    """
+    try:
+        with open(cache_file, "r", encoding="utf-8") as f:
+            payload = json.load(f)
+        if payload.get("exchange") != exchange.id or not payload.get("markets"):
+            return None
+        exchange.set_markets(payload["markets"], payload.get("currencies") or None)
+    except (OSError, ValueError, KeyError, TypeError) as e:
+        logger.warning("Ignoring markets cache %s: %s", cache_file, e)
+        return None
+    return time.time() - payload["saved_at"]
+
+
+def refresh_markets(exchange: ccxt.Exchange, cache_file: str):
+    """
+    Reloads markets from the exchange and rewrites cache_file.
+    """
+    try:
+        exchange.load_markets(reload=True)
+        save_markets(exchange, cache_file)
+    except Exception as e:
+        logger.warning("Markets refresh for %s failed: %s", exchange.id, e)
+
+
+def warm_start_markets(
+    exchange: ccxt.Exchange, cache_file: str, ttl: float = MARKETS_CACHE_TTL
+) -> Optional[threading.Thread]:
+    """
+    Loads markets from cache_file so the client is usable without a network
+    round trip. A stale cache is refreshed in a background thread; without a
+    cache the markets are loaded synchronously and saved.
+
+    :return: The background refresh thread, if one was started
+    """
+    age = load_cached_markets(exchange, cache_file)
+    if age is None:
+        exchange.load_markets()
+        save_markets(exchange, cache_file)
+        return None
+    if age < ttl:
+        return None
+    thread = threading.Thread(
+        target=refresh_markets,
+        args=(exchange, cache_file),
+        daemon=True,
+        name=f"markets-{exchange.id}",
+    )
+    thread.start()
+    return thread
+
+
+def init_exchange(
+    api_key: str,
+    api_secret: str,
+    exchange_name: str,
+    markets_cache_file: Optional[str] = None,
+    markets_ttl: float = MARKETS_CACHE_TTL,
+    **paper_options,
+) -> ccxt.Exchange:
+    """
+    Returns the shared ccxt client for these credentials from client_registry.
+
+    :param markets_cache_file: Warm-start the client's markets from this file
+        (see warm_start_markets) if they are not loaded yet
+    :param markets_ttl: Age in seconds after which the cache is refreshed
+    :param paper_options: create_exchange arguments of a "paper" client,
+        used only when the client is created
+    """
+    global _Exchange
+    exchange = client_registry.get(api_key, api_secret, exchange_name, **paper_options)
+    # A paper client's markets come from its candles
+    if markets_cache_file and not exchange.markets and exchange.id != PAPER_EXCHANGE_ID:
+        warm_start_markets(exchange, markets_cache_file, markets_ttl)
     _Exchange = exchange
     return exchange
 
+
+ORDER_SIDES = ("buy", "sell")
+ORDER_TYPES = ("market", "limit", "stop")
+
+
+def order_request(
+    symbol: str,
+    side: str,
+    amount: float,
+    order_type: str = "market",
+    price: Optional[float] = None,
+    stop_price: Optional[float] = None,
+    params: Optional[dict] = None,
+) -> dict:
+    """
+    Builds an order for submit_orders(), in ccxt's createOrders format.
+    """
+    request = {
+        "symbol": symbol,
+        "type": order_type,
+        "side": side,
+        "amount": amount,
+        "price": price,
+        "params": dict(params or {}),
+    }
+    if stop_price is not None:
+        request["params"]["triggerPrice"] = stop_price
+    return request
+
+
+def _create_order_args(exchange, order: dict) -> tuple:
+    """
+    Validates an order request and maps it to ccxt create_order arguments.
+    A stop order is sent as a market order with a trigger price, ccxt's
+    unified form for stop-market orders.
+    """
+    side, order_type, amount, price = (
+        order.get("side"),
+        order.get("type", "market"),
+        order.get("amount"),
+        order.get("price"),
+    )
+    params = dict(order.get("params") or {})
+    if side not in ORDER_SIDES:
+        raise ValueError(f"Unknown order side: {side}")
+    if order_type not in ORDER_TYPES:
+        raise ValueError(f"Unknown order type: {order_type}")
+    if not amount or amount <= 0:
+        raise ValueError("Order amount must be positive.")
+    if order_type == "limit" and price is None:
+        raise ValueError("Price required for limit order.")
+    if order_type == "stop":
+        if params.get("triggerPrice", params.get("stopPrice")) is None:
+            if price is None:
+                raise ValueError("Stop price required for stop order.")
+            params["triggerPrice"] = price
+        order_type, price = "market", None
+    symbol = order["symbol"]
+    sym = (
+        ensure_paper_trading_symbol(symbol)
+        if getattr(exchange, "id", None) == "bitfinex"
+        else symbol
+    )
+    return sym, order_type, side, amount, price, params
+
+
+def submit_order(
+    exchange: ccxt.Exchange,
+    symbol: str,
+    side: str,
+    amount: float,
+    order_type: str = "market",
+    price: Optional[float] = None,
+    stop_price: Optional[float] = None,
+    params: Optional[dict] = None,
+) -> dict:
+    """
+    Places a buy or sell market, limit or stop order in the "orders" lane.
+
+    :param price: Limit price, required for limit orders
+    :param stop_price: Trigger price of a stop order
+    :raises ValueError: If the order is incomplete or invalid
+    """
+    args = _create_order_args(
+        exchange,
+        order_request(symbol, side, amount, order_type, price, stop_price, params),
+    )
+    with rate_limit_lane("orders"):
+        return exchange.create_order(*args)
+
+
+async def submit_order_async(
+    exchange: ccxt_async.Exchange,
+    symbol: str,
+    side: str,
+    amount: float,
+    order_type: str = "market",
+    price: Optional[float] = None,
+    stop_price: Optional[float] = None,
+    params: Optional[dict] = None,
+) -> dict:
+    """
+    submit_order() for asyncio clients from create_async_exchange.
+    """
+    args = _create_order_args(
+        exchange,
+        order_request(symbol, side, amount, order_type, price, stop_price, params),
+    )
+    with rate_limit_lane("orders"):
+        return await exchange.create_order(*args)
+
+
+def _prepare_batch(exchange, orders: list[dict]) -> tuple[list, dict]:
+    """
+    Per-order results pre-filled with validation errors, and the create_order
+    arguments of the valid orders by index.
+    """
+    results: list = [None] * len(orders)
+    valid = {}
+    for i, order in enumerate(orders):
+        try:
+            valid[i] = _create_order_args(exchange, order)
+        except (ValueError, KeyError) as e:
+            results[i] = e
+    return results, valid
+
+
+def _batch_payload(args: tuple) -> dict:
+    symbol, order_type, side, amount, price, params = args
+    return {
+        "symbol": symbol,
+        "type": order_type,
+        "side": side,
+        "amount": amount,
+        "price": price,
+        "params": params,
+    }
+
+
+def _use_batch_endpoint(exchange, valid: dict) -> bool:
+    return len(valid) > 1 and bool(getattr(exchange, "has", {}).get("createOrders"))
+
+
+def submit_orders(
+    exchange: ccxt.Exchange, orders: list[dict], max_workers: int = 8
+) -> list:
+    """
+    Submits several orders at once, in about one round trip.
+
+    Uses the exchange's batch endpoint (ccxt create_orders) when it has one,
+    otherwise sends the orders concurrently from a thread pool.
+
+    :param orders: Order requests, see order_request()
+    :return: One result per order, in order: the ccxt order, or the
+        exception that order failed with
+    """
+    results, valid = _prepare_batch(exchange, orders)
+
+    def create(args):
+        # Pool threads do not inherit the caller's lane
+        with rate_limit_lane("orders"):
+            try:
+                return exchange.create_order(*args)
+            except Exception as e:
+                return e
+
+    if _use_batch_endpoint(exchange, valid):
+        with rate_limit_lane("orders"):
+            try:
+                placed = exchange.create_orders(
+                    [_batch_payload(args) for args in valid.values()]
+                )
+            except Exception as e:
+                placed = [e] * len(valid)
+    elif valid:
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(valid))) as pool:
+            placed = list(pool.map(create, valid.values()))
+    else:
+        placed = []
+    for i, result in zip(valid, placed):
+        results[i] = result
+    return results
+
+
+async def submit_orders_async(
+    exchange: ccxt_async.Exchange, orders: list[dict]
+) -> list:
+    """
+    submit_orders() for asyncio clients; without a batch endpoint the
+    orders are sent concurrently with asyncio.gather.
+    """
+    results, valid = _prepare_batch(exchange, orders)
+    with rate_limit_lane("orders"):
+        if _use_batch_endpoint(exchange, valid):
+            try:
+                placed = await exchange.create_orders(
+                    [_batch_payload(args) for args in valid.values()]
+                )
+            except Exception as e:
+                placed = [e] * len(valid)
+        else:
+            placed = await asyncio.gather(
+                *(exchange.create_order(*args) for args in valid.values()),
+                return_exceptions=True,
+            )
+    for i, result in zip(valid, placed):
+        results[i] = result
+    return results
+
+
 def place_order(
     order_type: str,
     symbol: str,
     amount: float,
-    price: float | None = None,
-    params: dict | None = None,
+    price: Optional[float] = None,
+    params: Optional[dict] = None,
+    side: str = "buy",
 ) -> Any:
     """
-    Places an order using the initialized exchange.
+    Places an order using the initialized exchange, see submit_order().
     """
     global _Exchange
     if _Exchange is None:
         raise RuntimeError("Exchange not initialized. Call init_exchange first.")
-    ex = _Exchange
-    sym = ensure_paper_trading_symbol(symbol) if ex.id == "bitfinex" else symbol
-    params = params or {}
-    if order_type == "market":
-        return ex.create_market_order(sym, "buy", amount, params)
-    elif order_type == "limit":
-        if price is None:
-            raise ValueError("Price required for limit order.")
-        return ex.create_limit_order(sym, "buy", amount, price, params)
-    else:
-        raise ValueError(f"Unknown order type: {order_type}")
+    return submit_order(
+        _Exchange, symbol, side, amount, order_type, price, params=params
+    )
+
 
-def cancel_order(exchange: ccxt.Exchange, order_id: str, symbol: str | None = None) -> Any:
+def cancel_order(
+    exchange: ccxt.Exchange, order_id: str, symbol: Optional[str] = None
+) -> Any:
     """
     Cancels an order on the given exchange.
     """
-    sym = ensure_paper_trading_symbol(symbol) if symbol and exchange.id == "bitfinex" else symbol
-    return exchange.cancel_order(order_id, sym) if sym else exchange.cancel_order(order_id)
+    sym = (
+        ensure_paper_trading_symbol(symbol)
+        if symbol and exchange.id == "bitfinex"
+        else symbol
+    )
+    with rate_limit_lane("orders"):
+        return (
+            exchange.cancel_order(order_id, sym)
+            if sym
+            else exchange.cancel_order(order_id)
+        )
+
 
 def fetch_balance(exchange: ccxt.Exchange) -> dict:
     """
@@ -65,6 +977,7 @@ def fetch_balance(exchange: ccxt.Exchange) -> dict:
     """
     return exchange.fetch_balance()
 
+
 def calculate_position_size(
     equity: float, risk_per_trade: float, entry_price: float, stop_loss_price: float
 ) -> float:
@@ -81,5 +994,7 @@ def calculate_position_size(
     risk_amount = equity * risk_per_trade
     stop_loss_distance = entry_price - stop_loss_price
     if stop_loss_distance <= 0:
-        raise ValueError("Stop loss distance must be positive (entry_price > stop_loss_price for long positions).")
+        raise ValueError(
+            "Stop loss distance must be positive (entry_price > stop_loss_price for long positions)."
+        )
     return risk_amount / stop_loss_distance
@@ -0,0 +1,642 @@
+"""
+In-process paper exchange.
+Implements the ccxt methods the bot and dashboard call on top of a
+price-time-priority order book, filling orders against each other and
+against replayed candles, with maker/taker fees and balance accounting.
+"""
+
+import bisect
+import heapq
+import itertools
+import os
+from collections import deque
+from typing import Optional
+
+import ccxt
+import pandas as pd
+
+from .candle_cache import CANDLE_COLUMNS
+from .ohlcv_store import OHLCVStore
+
+PAPER_EXCHANGE_ID = "paper"
+
+
+def read_candles(source: str, symbol: str, timeframe: str) -> pd.DataFrame:
+    """
+    Candles of symbol from an OHLCVStore directory, or from a CSV file with
+    CANDLE_COLUMNS, which then holds the candles of every symbol.
+    """
+    if os.path.isdir(source):
+        return OHLCVStore(source).read(symbol, timeframe)
+    return pd.read_csv(source, usecols=CANDLE_COLUMNS)
+
+
+class _Order:
+    """
+    Mutable order state; converted to a ccxt order dict when returned.
+    """
+
+    __slots__ = (
+        "id",
+        "symbol",
+        "type",
+        "side",
+        "price",
+        "stop_price",
+        "amount",
+        "filled",
+        "cost",
+        "fee",
+        "reserved",
+        "status",
+        "timestamp",
+    )
+
+    def __init__(self, id, symbol, type, side, amount, price, stop_price, timestamp):
+        self.id = id
+        self.symbol = symbol
+        self.type = type
+        self.side = side
+        self.amount = amount
+        self.price = price
+        self.stop_price = stop_price
+        self.filled = 0.0
+        self.cost = 0.0
+        self.fee = 0.0
+        self.reserved = 0.0
+        self.status = "open"
+        self.timestamp = timestamp
+
+    @property
+    def remaining(self) -> float:
+        return self.amount - self.filled
+
+
+class _Book:
+    """
+    Resting limit orders of one symbol. Each side keeps a FIFO queue per
+    price level and a heap of level prices; cancelled orders are skipped
+    lazily when they reach the front.
+    """
+
+    def __init__(self):
+        self.levels = {"buy": {}, "sell": {}}
+        self.prices = {"buy": [], "sell": []}
+
+    def add(self, order: _Order):
+        levels = self.levels[order.side]
+        level = levels.get(order.price)
+        if level is None:
+            level = levels[order.price] = deque()
+            key = -order.price if order.side == "buy" else order.price
+            heapq.heappush(self.prices[order.side], key)
+        level.append(order)
+
+    def best(self, side: str) -> Optional[deque]:
+        """
+        Level with the best price on side, with an open order at its front.
+        """
+        heap = self.prices[side]
+        levels = self.levels[side]
+        while heap:
+            price = -heap[0] if side == "buy" else heap[0]
+            level = levels[price]
+            while level and level[0].status != "open":
+                level.popleft()
+            if level:
+                return level
+            heapq.heappop(heap)
+            del levels[price]
+        return None
+
+    def best_price(self, side: str) -> Optional[float]:
+        level = self.best(side)
+        return level[0].price if level else None
+
+
+class PaperExchange:
+    """
+    Simulated single-account exchange with the ccxt interface we use:
+    create_order and its market/limit shortcuts, cancel_order, fetch_order,
+    fetch_open_orders, fetch_balance, fetch_ticker and fetch_ohlcv.
+
+    Time is driven by replayed candles: load_candles() supplies history, or
+    the candle_source is read the first time a symbol is used, and advance()
+    or advance_to() closes candles, filling resting limit orders and
+    triggering stop orders whose price the candle traded through.
+    An incoming order first matches resting orders in price-time priority
+    at their price; a market order, or a limit order crossing the last
+    close, takes any remainder at the last close plus slippage. Resting
+    orders pay the maker fee and incoming ones the taker fee, both in the
+    quote currency.
+    """
+
+    id = PAPER_EXCHANGE_ID
+    rateLimit = 0
+    has = {"fetchTime": True, "createOrders": False}
+
+    def __init__(
+        self,
+        config: Optional[dict] = None,
+        balances: Optional[dict] = None,
+        maker_fee: float = 0.001,
+        taker_fee: float = 0.002,
+        slippage: float = 0.0,
+        session=None,
+        candle_source: Optional[str] = None,
+        timeframe: str = "1m",
+        warmup: int = 0,
+    ):
+        """
+        :param config: ccxt-style client config, accepted for compatibility
+        :param balances: Starting totals per currency, default 10000 USD
+        :param maker_fee: Fee rate of resting orders
+        :param taker_fee: Fee rate of incoming orders
+        :param slippage: Fraction of the price market orders pay beyond
+            the last close
+        :param candle_source: CSV file or OHLCVStore directory replayed for
+            symbols that load_candles() was not called for (see read_candles)
+        :param timeframe: Timeframe of the candle_source candles
+        :param warmup: Candles of candle_source already closed when the
+            first symbol is loaded
+        """
+        self.config = config or {}
+        self.maker_fee = maker_fee
+        self.taker_fee = taker_fee
+        self.slippage = slippage
+        self.session = session
+        self.candle_source = candle_source
+        self.timeframe = timeframe
+        self.warmup = warmup
+        self.markets: dict[str, dict] = {}
+        self._balances = {
+            currency: [float(total), 0.0]
+            for currency, total in (balances or {"USD": 10000.0}).items()
+        }
+        self._candles: dict[str, list] = {}
+        self._timeframes: dict[str, str] = {}
+        self._steps: dict[str, int] = {}
+        self._cursor: dict[str, int] = {}
+        self._books: dict[str, _Book] = {}
+        self._stops: dict[str, list[_Order]] = {}
+        self._orders: dict[str, _Order] = {}
+        self._ids = itertools.count(1)
+
+    # Market data
+
+    def load_candles(self, symbol: str, timeframe: str, candles, position: int = 0):
+        """
+        Supply the candles replayed for symbol.
+
+        :param candles: fetch_ohlcv rows or a DataFrame with CANDLE_COLUMNS,
+            timestamps in ms or as datetimes
+        :param position: Number of candles that are already closed
+        """
+        if isinstance(candles, pd.DataFrame):
+            frame = candles[CANDLE_COLUMNS].copy()
+            if not pd.api.types.is_numeric_dtype(frame["timestamp"]):
+                since_epoch = pd.to_datetime(
+                    frame["timestamp"], utc=True
+                ) - pd.Timestamp(0, tz="UTC")
+                frame["timestamp"] = since_epoch // pd.Timedelta(milliseconds=1)
+            candles = frame.values.tolist()
+        rows = [[int(row[0])] + [float(v) for v in row[1:6]] for row in candles]
+        base, quote = symbol.split("/")
+        self.markets[symbol] = {
+            "id": symbol,
+            "symbol": symbol,
+            "base": base,
+            "quote": quote,
+            "active": True,
+            "type": "spot",
+            "spot": True,
+            "maker": self.maker_fee,
+            "taker": self.taker_fee,
+        }
+        for currency in (base, quote):
+            self._balances.setdefault(currency, [0.0, 0.0])
+        self._candles[symbol] = rows
+        self._timeframes[symbol] = timeframe
+        self._steps[symbol] = int(ccxt.Exchange.parse_timeframe(timeframe) * 1000)
+        self._cursor[symbol] = min(position, len(rows))
+        self._books.setdefault(symbol, _Book())
+        self._stops.setdefault(symbol, [])
+
+    def advance(self, candles: int = 1) -> int:
+        """
+        Close the next candles of every symbol, filling the resting and stop
+        orders they reach.
+
+        :return: Number of candles closed over all symbols
+        """
+        closed = 0
+        for _ in range(candles):
+            for symbol, rows in self._candles.items():
+                cursor = self._cursor[symbol]
+                if cursor >= len(rows):
+                    continue
+                self._cursor[symbol] = cursor + 1
+                self._match_candle(symbol, rows[cursor])
+                closed += 1
+        return closed
+
+    def advance_to(self, now: int) -> int:
+        """
+        Close every candle of every symbol that closes by now, in ms.
+
+        :return: Number of candles closed over all symbols
+        """
+        closed = 0
+        while True:
+            due = [
+                symbol
+                for symbol, rows in self._candles.items()
+                if self._cursor[symbol] < len(rows)
+                and rows[self._cursor[symbol]][0] + self._steps[symbol] <= now
+            ]
+            if not due:
+                return closed
+            for symbol in due:
+                cursor = self._cursor[symbol]
+                self._cursor[symbol] = cursor + 1
+                self._match_candle(symbol, self._candles[symbol][cursor])
+                closed += 1
+
+    @property
+    def replay_finished(self) -> bool:
+        """
+        Whether every loaded candle has closed.
+        """
+        return all(
+            self._cursor[symbol] >= len(rows) for symbol, rows in self._candles.items()
+        )
+
+    def _load_source(self, symbol: str):
+        """
+        Load symbol from candle_source, closed up to the current exchange
+        time, or up to warmup candles if nothing has been replayed yet.
+        """
+        candles = read_candles(self.candle_source, symbol, self.timeframe)
+        if candles.empty:
+            raise ccxt.BadSymbol(f"{self.candle_source} has no candles of {symbol}")
+        now = self.milliseconds()
+        self.load_candles(symbol, self.timeframe, candles, position=self.warmup)
+        if now:
+            step = self._steps[symbol]
+            closes = [row[0] + step for row in self._candles[symbol]]
+            self._cursor[symbol] = bisect.bisect_right(closes, now)
+
+    def _last_candle(self, symbol: str) -> list:
+        cursor = self._cursor[symbol]
+        if not cursor:
+            raise ccxt.ExchangeNotAvailable(f"No candle of {symbol} has closed yet")
+        return self._candles[symbol][cursor - 1]
+
+    def milliseconds(self) -> int:
+        """
+        Exchange time: the close of the latest replayed candle.
+        """
+        now = 0
+        for symbol, cursor in self._cursor.items():
+            if cursor:
+                now = max(
+                    now, self._candles[symbol][cursor - 1][0] + self._steps[symbol]
+                )
+        return now
+
+    def fetch_time(self, params=None) -> int:
+        return self.milliseconds()
+
+    def load_markets(self, reload: bool = False, params=None) -> dict:
+        return self.markets
+
+    def _market(self, symbol: str) -> dict:
+        market = self.markets.get(symbol)
+        if market is None and self.candle_source:
+            self._load_source(symbol)
+            market = self.markets[symbol]
+        if market is None:
+            raise ccxt.BadSymbol(f"{self.id} does not have market symbol {symbol}")
+        return market
+
+    def fetch_ohlcv(self, symbol, timeframe="1m", since=None, limit=None, params=None):
+        self._market(symbol)
+        if timeframe != self._timeframes[symbol]:
+            raise ccxt.NotSupported(
+                f"{symbol} is replayed in {self._timeframes[symbol]} candles"
+            )
+        rows = self._candles[symbol][: self._cursor[symbol]]
+        if since is not None:
+            rows = [row for row in rows if row[0] >= since]
+            rows = rows[:limit] if limit else rows
+        elif limit:
+            rows = rows[-limit:]
+        return [list(row) for row in rows]
+
+    def fetch_ticker(self, symbol, params=None) -> dict:
+        self._market(symbol)
+        timestamp, open_, high, low, close, volume = self._last_candle(symbol)
+        book = self._books[symbol]
+        bid = book.best_price("buy")
+        ask = book.best_price("sell")
+        return {
+            "symbol": symbol,
+            "timestamp": self.milliseconds(),
+            "datetime": ccxt.Exchange.iso8601(self.milliseconds()),
+            "open": open_,
+            "high": high,
+            "low": low,
+            "close": close,
+            "last": close,
+            "bid": bid if bid is not None else close,
+            "ask": ask if ask is not None else close,
+            "baseVolume": volume,
+            "info": {},
+        }
+
+    # Account
+
+    def fetch_balance(self, params=None) -> dict:
+        balance = {"free": {}, "used": {}, "total": {}, "info": {}}
+        for currency, (total, used) in self._balances.items():
+            entry = {"free": total - used, "used": used, "total": total}
+            balance[currency] = entry
+            for key, value in entry.items():
+                balance[key][currency] = value
+        return balance
+
+    def _free(self, currency: str) -> float:
+        total, used = self._balances[currency]
+        return total - used
+
+    # Orders
+
+    def create_order(self, symbol, type, side, amount, price=None, params=None):
+        """
+        Place a market, limit or stop order; stop orders take their trigger
+        from params["stopPrice"] (or "triggerPrice"), or from price.
+        """
+        market = self._market(symbol)
+        params = params or {}
+        if side not in ("buy", "sell"):
+            raise ccxt.InvalidOrder(f"Unknown order side: {side}")
+        if not amount or amount <= 0:
+            raise ccxt.InvalidOrder("Order amount must be positive")
+        stop_price = params.get("stopPrice", params.get("triggerPrice"))
+        if type in ("stop", "stop_market"):
+            stop_price = stop_price if stop_price is not None else price
+            if stop_price is None:
+                raise ccxt.InvalidOrder("Stop orders need a stop price")
+        elif type == "limit":
+            if price is None:
+                raise ccxt.InvalidOrder("Price required for limit order")
+        elif type != "market":
+            raise ccxt.InvalidOrder(f"Unknown order type: {type}")
+        order = _Order(
+            str(next(self._ids)),
+            symbol,
+            type,
+            side,
+            float(amount),
+            None if price is None or type != "limit" else float(price),
+            None if stop_price is None else float(stop_price),
+            self.milliseconds(),
+        )
+        if type == "limit":
+            self._place_limit(order, market)
+        elif order.stop_price is not None:
+            self._reserve(order, market, order.stop_price, self.taker_fee)
+            self._stops[symbol].append(order)
+        else:
+            self._check_funds(order, market, self._market_price(order))
+            self._take(order, market, None)
+            self._fill_at_market(order, market, self._market_price(order))
+        self._orders[order.id] = order
+        return self._to_dict(order)
+
+    def create_market_order(self, symbol, side, amount, price=None, params=None):
+        return self.create_order(symbol, "market", side, amount, price, params)
+
+    def create_limit_order(self, symbol, side, amount, price, params=None):
+        return self.create_order(symbol, "limit", side, amount, price, params)
+
+    def create_market_buy_order(self, symbol, amount, params=None):
+        return self.create_order(symbol, "market", "buy", amount, None, params)
+
+    def create_market_sell_order(self, symbol, amount, params=None):
+        return self.create_order(symbol, "market", "sell", amount, None, params)
+
+    def create_limit_buy_order(self, symbol, amount, price, params=None):
+        return self.create_order(symbol, "limit", "buy", amount, price, params)
+
+    def create_limit_sell_order(self, symbol, amount, price, params=None):
+        return self.create_order(symbol, "limit", "sell", amount, price, params)
+
+    def cancel_order(self, id, symbol=None, params=None) -> dict:
+        order = self._orders.get(str(id))
+        if order is None or (symbol is not None and order.symbol != symbol):
+            raise ccxt.OrderNotFound(f"Order {id} not found")
+        if order.status != "open":
+            raise ccxt.OrderNotFound(f"Order {id} is already {order.status}")
+        order.status = "canceled"
+        self._release(order, order.reserved)
+        if order.stop_price is not None and order.type != "limit":
+            self._stops[order.symbol].remove(order)
+        return self._to_dict(order)
+
+    def fetch_order(self, id, symbol=None, params=None) -> dict:
+        order = self._orders.get(str(id))
+        if order is None:
+            raise ccxt.OrderNotFound(f"Order {id} not found")
+        return self._to_dict(order)
+
+    def fetch_open_orders(self, symbol=None, since=None, limit=None, params=None):
+        orders = [
+            self._to_dict(order)
+            for order in self._orders.values()
+            if order.status == "open" and (symbol is None or order.symbol == symbol)
+        ]
+        return orders[-limit:] if limit else orders
+
+    def close(self):
+        pass
+
+    # Matching
+
+    def _market_price(self, order: _Order) -> float:
+        close = self._last_candle(order.symbol)[4]
+        return close * (1 + self.slippage if order.side == "buy" else 1 - self.slippage)
+
+    def _check_funds(self, order: _Order, market: dict, price: float):
+        if order.side == "buy":
+            needed = order.remaining * price * (1 + self.taker_fee)
+            currency = market["quote"]
+        else:
+            needed = order.remaining
+            currency = market["base"]
+        if self._free(currency) + 1e-12 < needed:
+            raise ccxt.InsufficientFunds(
+                f"{needed} {currency} needed, {self._free(currency)} free"
+            )
+
+    def _reserve(self, order: _Order, market: dict, price: float, fee: float):
+        self._check_funds(order, market, price)
+        if order.side == "buy":
+            order.reserved = order.remaining * price * (1 + fee)
+            self._balances[market["quote"]][1] += order.reserved
+        else:
+            order.reserved = order.remaining
+            self._balances[market["base"]][1] += order.reserved
+
+    def _release(self, order: _Order, amount: float):
+        market = self.markets[order.symbol]
+        currency = market["quote"] if order.side == "buy" else market["base"]
+        self._balances[currency][1] -= amount
+        order.reserved -= amount
+
+    def _fill(self, order: _Order, amount: float, price: float, fee_rate: float):
+        market = self.markets[order.symbol]
+        if order.reserved:
+            if order.side == "buy":
+                share = order.reserved * amount / order.remaining
+            else:
+                share = amount
+            self._release(order, share)
+        cost = amount * price
+        fee = cost * fee_rate
+        base = self._balances[market["base"]]
+        quote = self._balances[market["quote"]]
+        if order.side == "buy":
+            base[0] += amount
+            quote[0] -= cost + fee
+        else:
+            base[0] -= amount
+            quote[0] += cost - fee
+        order.filled += amount
+        order.cost += cost
+        order.fee += fee
+        if order.remaining <= 1e-12:
+            order.filled = order.amount
+            order.status = "closed"
+
+    def _take(self, order: _Order, market: dict, limit: Optional[float]):
+        """
+        Match an incoming order against resting ones in price-time priority.
+        """
+        book = self._books[order.symbol]
+        opposite = "sell" if order.side == "buy" else "buy"
+        while order.status == "open":
+            level = book.best(opposite)
+            if level is None:
+                return
+            maker = level[0]
+            if limit is not None and (
+                maker.price > limit if order.side == "buy" else maker.price < limit
+            ):
+                return
+            amount = min(order.remaining, maker.remaining)
+            self._fill(maker, amount, maker.price, self.maker_fee)
+            self._fill(order, amount, maker.price, self.taker_fee)
+            if maker.status != "open":
+                level.popleft()
+
+    def _fill_at_market(self, order: _Order, market: dict, price: float):
+        if order.status == "open":
+            self._fill(order, order.remaining, price, self.taker_fee)
+
+    def _place_limit(self, order: _Order, market: dict):
+        self._check_funds(order, market, order.price)
+        self._take(order, market, order.price)
+        if order.status != "open":
+            return
+        close = (
+            self._last_candle(order.symbol)[4] if self._cursor[order.symbol] else None
+        )
+        if close is not None and (
+            order.price >= close if order.side == "buy" else order.price <= close
+        ):
+            # Marketable against the last close: taker at the better price
+            self._fill(order, order.remaining, close, self.taker_fee)
+            return
+        self._reserve(order, market, order.price, self.maker_fee)
+        self._books[order.symbol].add(order)
+
+    def _match_candle(self, symbol: str, candle: list):
+        _, open_, high, low, _, _ = candle
+        book = self._books[symbol]
+        while True:
+            level = book.best("buy")
+            if level is None or level[0].price < low:
+                break
+            order = level.popleft()
+            self._fill(order, order.remaining, min(order.price, open_), self.maker_fee)
+        while True:
+            level = book.best("sell")
+            if level is None or level[0].price > high:
+                break
+            order = level.popleft()
+            self._fill(order, order.remaining, max(order.price, open_), self.maker_fee)
+        stops = self._stops[symbol]
+        if not stops:
+            return
+        remaining = []
+        for order in stops:
+            if order.side == "buy" and high >= order.stop_price:
+                self._fill(
+                    order, order.remaining, max(order.stop_price, open_), self.taker_fee
+                )
+            elif order.side == "sell" and low <= order.stop_price:
+                self._fill(
+                    order, order.remaining, min(order.stop_price, open_), self.taker_fee
+                )
+            else:
+                remaining.append(order)
+        self._stops[symbol] = remaining
+
+    def _to_dict(self, order: _Order) -> dict:
+        market = self.markets[order.symbol]
+        return {
+            "id": order.id,
+            "clientOrderId": None,
+            "timestamp": order.timestamp,
+            "datetime": ccxt.Exchange.iso8601(order.timestamp),
+            "symbol": order.symbol,
+            "type": order.type,
+            "side": order.side,
+            "price": order.price,
+            "stopPrice": order.stop_price,
+            "amount": order.amount,
+            "filled": order.filled,
+            "remaining": order.remaining,
+            "cost": order.cost,
+            "average": order.cost / order.filled if order.filled else None,
+            "status": order.status,
+            "fee": {"cost": order.fee, "currency": market["quote"]},
+            "trades": [],
+            "info": {},
+        }
+
+
+class AsyncPaperExchange:
+    """
+    ccxt.async_support-style facade over a PaperExchange, so async trading
+    loops and sync callers can share one simulated account.
+    """
+
+    id = PAPER_EXCHANGE_ID
+
+    def __init__(self, exchange: Optional[PaperExchange] = None, **kwargs):
+        self.sync = exchange or PaperExchange(**kwargs)
+
+    def __getattr__(self, name):
+        attribute = getattr(self.sync, name)
+        if not name.startswith(("create_", "cancel_", "fetch_", "load_markets")):
+            return attribute
+
+        async def call(*args, **kwargs):
+            return attribute(*args, **kwargs)
+
+        return call
+
+    async def close(self):
+        pass
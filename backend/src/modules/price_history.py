@@ -0,0 +1,167 @@
+"""
+Tick history behind the dashboard price chart.
+A fixed-capacity RingBuffer keeps timestamps and prices in preallocated
+NumPy arrays, and a query downsamples a time range with LTTB or min/max
+bucketing, so chart payloads stay small however much history is kept.
+"""
+
+import threading
+from typing import Optional
+
+import numpy as np
+
+DOWNSAMPLING_METHODS = ("lttb", "minmax")
+
+
+def lttb(x: np.ndarray, y: np.ndarray, threshold: int) -> np.ndarray:
+    """
+    Indices of the points kept by Largest-Triangle-Three-Buckets.
+
+    The first and last points are kept; every bucket in between keeps the
+    point forming the largest triangle with the point kept before it and
+    the average of the next bucket, which preserves the visual shape.
+    """
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n) if threshold >= n else np.array([0, n - 1][:threshold])
+    buckets = threshold - 2
+    edges = (np.arange(buckets + 1) * ((n - 2) / buckets)).astype(np.int64) + 1
+    edges[-1] = n - 1
+    widths = np.diff(edges)
+    # Reduced in the arrays' own dtypes, a cast would copy the whole range
+    avg_x = np.add.reduceat(x[:-1], edges[:-1]) / widths
+    avg_y = np.add.reduceat(y[:-1], edges[:-1]) / widths
+    # The last bucket looks ahead to the last point
+    next_x = np.append(avg_x[1:], x[-1])
+    next_y = np.append(avg_y[1:], y[-1])
+
+    selected = np.empty(threshold, dtype=np.int64)
+    selected[0] = a = 0
+    selected[-1] = n - 1
+    for i in range(buckets):
+        lo, hi = edges[i], edges[i + 1]
+        ax, ay = x[a], y[a]
+        area = np.abs(
+            (ax - next_x[i]) * (y[lo:hi] - ay) - (x[lo:hi] - ax) * (ay - next_y[i])
+        )
+        a = lo + int(np.argmax(area))
+        selected[i + 1] = a
+    return selected
+
+
+def minmax(x: np.ndarray, y: np.ndarray, threshold: int) -> np.ndarray:
+    """
+    Indices of the lowest and highest point of threshold // 2 equal time
+    buckets, in time order, so no spike is lost at any zoom level.
+    """
+    n = len(x)
+    if threshold >= n:
+        return np.arange(n)
+    buckets = max(threshold // 2, 1)
+    bounds = np.linspace(x[0], x[-1], buckets + 1)[1:-1].astype(x.dtype)
+    edges = np.concatenate(([0], np.searchsorted(x, bounds, side="right"), [n]))
+    selected = []
+    for lo, hi in zip(edges[:-1], edges[1:]):
+        if lo == hi:
+            continue
+        bucket = y[lo:hi]
+        low, high = lo + int(np.argmin(bucket)), lo + int(np.argmax(bucket))
+        selected.extend(sorted({low, high}))
+    return np.array(selected, dtype=np.int64)
+
+
+_DOWNSAMPLERS = {"lttb": lttb, "minmax": minmax}
+
+
+class RingBuffer:
+    """
+    Thread-safe, fixed-capacity (timestamp, price) history, oldest first.
+
+    Every tick is written at its slot and at slot + capacity, so the
+    retained ticks are always one contiguous slice: queries search and
+    downsample views of the arrays and copy only the points they return.
+    Timestamps must not go backwards; an older tick is dropped and one
+    with the last timestamp replaces the last price.
+    """
+
+    def __init__(self, capacity: int = 1_000_000):
+        """
+        :param capacity: Ticks kept; the oldest are overwritten after that
+        """
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1")
+        self.capacity = capacity
+        self._timestamps = np.zeros(2 * capacity, dtype=np.int64)
+        self._prices = np.zeros(2 * capacity, dtype=np.float64)
+        self._next = 0
+        self._size = 0
+        self._lock = threading.Lock()
+        self.appended = 0
+        self.dropped = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def append(self, timestamp: int, price: float) -> bool:
+        """
+        :return: False if the tick was older than the last one
+        """
+        with self._lock:
+            if self._size:
+                last = (self._next - 1) % self.capacity
+                if timestamp < self._timestamps[last]:
+                    self.dropped += 1
+                    return False
+                if timestamp == self._timestamps[last]:
+                    self._prices[last] = self._prices[last + self.capacity] = price
+                    return True
+            i = self._next
+            self._timestamps[i] = self._timestamps[i + self.capacity] = timestamp
+            self._prices[i] = self._prices[i + self.capacity] = price
+            self._next = (i + 1) % self.capacity
+            self._size = min(self._size + 1, self.capacity)
+            self.appended += 1
+            return True
+
+    def _window(self, start: Optional[int], end: Optional[int]):
+        first = (self._next - self._size) % self.capacity
+        timestamps = self._timestamps[first : first + self._size]
+        prices = self._prices[first : first + self._size]
+        lo = 0 if start is None else np.searchsorted(timestamps, start, side="left")
+        hi = (
+            self._size
+            if end is None
+            else np.searchsorted(timestamps, end, side="right")
+        )
+        return timestamps[lo:hi], prices[lo:hi]
+
+    def query(
+        self,
+        start: Optional[int] = None,
+        end: Optional[int] = None,
+        max_points: Optional[int] = None,
+        method: str = "lttb",
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Timestamps and prices with start <= timestamp <= end.
+
+        :param max_points: Downsample to at most this many points
+        :param method: "lttb" or "minmax", see DOWNSAMPLING_METHODS
+        """
+        if method not in _DOWNSAMPLERS:
+            raise ValueError(f"Unknown downsampling method: {method}")
+        with self._lock:
+            timestamps, prices = self._window(start, end)
+            if max_points is None or len(timestamps) <= max_points:
+                return timestamps.copy(), prices.copy()
+            indices = _DOWNSAMPLERS[method](timestamps, prices, max_points)
+            return timestamps[indices], prices[indices]
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "size": self._size,
+                "capacity": self.capacity,
+                "appended": self.appended,
+                "dropped": self.dropped,
+            }
@@ -0,0 +1,207 @@
+"""
+TTL cache of rendered HTTP responses for the dashboard's read routes.
+Concurrent requests for the same key share a single render (single-flight),
+and every cached body carries an ETag so clients can revalidate with
+If-None-Match and get a 304 without a body.
+"""
+
+import asyncio
+import hashlib
+import threading
+import time
+from typing import Awaitable, Callable, Optional
+
+
+class CachedResponse:
+    """
+    Rendered body with its status, content type and ETag (unquoted).
+    """
+
+    __slots__ = ("body", "status", "content_type", "etag", "created_at")
+
+    def __init__(self, body: bytes, status: int, content_type: str, created_at: float):
+        self.body = body
+        self.status = status
+        self.content_type = content_type
+        self.etag = hashlib.blake2b(body, digest_size=16).hexdigest()
+        self.created_at = created_at
+
+    def not_modified(self, if_none_match: Optional[str]) -> bool:
+        """
+        True if an If-None-Match header matches the ETag (weak comparison).
+        """
+        if not if_none_match:
+            return False
+        for tag in if_none_match.split(","):
+            tag = tag.strip()
+            if tag == "*" or tag.removeprefix("W/").strip('"') == self.etag:
+                return True
+        return False
+
+    def headers(self) -> dict[str, str]:
+        """
+        Validation headers; browsers revalidate every time, which is a 304
+        until the data changes.
+        """
+        return {"ETag": f'"{self.etag}"', "Cache-Control": "no-cache"}
+
+
+class _Flight:
+    __slots__ = ("generation", "done", "result", "error", "futures")
+
+    def __init__(self, generation: int):
+        # Invalidations since this render started make its result stale
+        self.generation = generation
+        self.done = threading.Event()
+        self.result: Optional[CachedResponse] = None
+        self.error: Optional[BaseException] = None
+        # Waiting coroutines, resolved on their own loops
+        self.futures: list[asyncio.Future] = []
+
+    def finish(self):
+        self.done.set()
+        for future in self.futures:
+            future.get_loop().call_soon_threadsafe(_resolve, future)
+
+    def outcome(self) -> CachedResponse:
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+
+def _resolve(future: asyncio.Future):
+    if not future.done():
+        future.set_result(None)
+
+
+class ResponseCache:
+    """
+    Framework-independent response cache keyed by request path and query.
+
+    get() serves a fresh entry from memory, and otherwise renders once per
+    key however many requests arrive meanwhile: the others wait for that
+    render and share its result. Only 200 responses are stored. invalidate()
+    drops entries by key prefix, and a render that started before the
+    invalidation is not stored, so writes are never masked by stale reads.
+    """
+
+    def __init__(
+        self, max_entries: int = 1024, clock: Callable[[], float] = time.monotonic
+    ):
+        self.max_entries = max_entries
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries: dict[str, CachedResponse] = {}
+        self._flights: dict[str, _Flight] = {}
+        self._generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.shared = 0
+
+    def _begin(self, key: str, ttl: float, future: Optional[asyncio.Future] = None):
+        """
+        A fresh entry, or the flight rendering key and whether the caller
+        leads it. A future is added to the waiters of a running flight.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self._clock() - entry.created_at < ttl:
+                self.hits += 1
+                return entry, None, False
+            flight = self._flights.get(key)
+            if flight is None:
+                flight = self._flights[key] = _Flight(self._generation)
+                self.misses += 1
+                return None, flight, True
+            self.shared += 1
+            if future is not None:
+                flight.futures.append(future)
+            return None, flight, False
+
+    def _finish(self, key: str, flight: _Flight):
+        with self._lock:
+            del self._flights[key]
+            result = flight.result
+            if (
+                result is not None
+                and result.status == 200
+                and flight.generation == self._generation
+            ):
+                self._entries.pop(key, None)
+                self._entries[key] = result
+                while len(self._entries) > self.max_entries:
+                    del self._entries[next(iter(self._entries))]
+        flight.finish()
+
+    def get(
+        self,
+        key: str,
+        ttl: float,
+        render: Callable[[], tuple[bytes, int, str]],
+    ) -> CachedResponse:
+        """
+        :param render: Returns (body, status, content_type) on a miss
+        """
+        entry, flight, leader = self._begin(key, ttl)
+        if entry is not None:
+            return entry
+        if not leader:
+            flight.done.wait()
+            return flight.outcome()
+        try:
+            body, status, content_type = render()
+            flight.result = CachedResponse(body, status, content_type, self._clock())
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            self._finish(key, flight)
+        return flight.result
+
+    async def get_async(
+        self,
+        key: str,
+        ttl: float,
+        render: Callable[[], Awaitable[tuple[bytes, int, str]]],
+    ) -> CachedResponse:
+        """
+        get() for coroutines: render is awaited, and callers that share a
+        render wait without blocking the event loop.
+        """
+        future = asyncio.get_running_loop().create_future()
+        entry, flight, leader = self._begin(key, ttl, future)
+        if entry is not None:
+            return entry
+        if not leader:
+            await future
+            return flight.outcome()
+        try:
+            body, status, content_type = await render()
+            flight.result = CachedResponse(body, status, content_type, self._clock())
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            self._finish(key, flight)
+        return flight.result
+
+    def invalidate(self, *prefixes: str):
+        """
+        Drops entries whose key starts with any of prefixes, all if none.
+        """
+        with self._lock:
+            self._generation += 1
+            if not prefixes:
+                self._entries.clear()
+                return
+            for key in [k for k in self._entries if k.startswith(prefixes)]:
+                del self._entries[key]
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "shared": self.shared,
+            }
@@ -1,33 +1,229 @@
 """
 Utility functions for trading bot modules.
-Includes retry decorator, symbol helpers, and nonce management.
+Includes retry decorator, circuit breaker, symbol helpers, and nonce
+management.
 """
 
+import asyncio
+import contextlib
 import functools
+import inspect
+import itertools
 import os
+import random
+import threading
 import time
-from typing import Callable
+from typing import Callable, Optional, Union
+
+import ccxt
 
 NONCE_FILE = "nonce.txt"
 
 
-def retry(max_attempts: int = 3, initial_delay: float = 1.0) -> Callable:
+def is_retryable(error: BaseException) -> bool:
+    """
+    Default retry classifier: ccxt network errors (timeouts, rate limits,
+    exchange unavailable) are retried, other ccxt errors such as rejected
+    orders or bad credentials are not. Non-ccxt errors are retried.
+    """
+    if isinstance(error, ccxt.NetworkError):
+        return True
+    return not isinstance(error, ccxt.BaseError)
+
+
+class CircuitOpenError(Exception):
+    """
+    Raised instead of calling an endpoint whose circuit breaker is open.
+    """
+
+
+class CircuitBreaker:
+    """
+    Fails calls to an endpoint fast after repeated failures.
+
+    After failure_threshold consecutive failures the breaker opens and
+    rejects calls for reset_timeout seconds. Then it lets a single trial
+    call through (half-open): success closes it, failure opens it again.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._trial = False
+        self.rejected = 0
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._state()
+
+    def _state(self) -> str:
+        if self._opened_at is None:
+            return "closed"
+        if self._clock() - self._opened_at < self.reset_timeout:
+            return "open"
+        return "half_open"
+
+    def allow(self) -> bool:
+        """
+        Whether a call may proceed; claims the trial call when half-open.
+        """
+        with self._lock:
+            state = self._state()
+            if state == "closed" or (state == "half_open" and not self._trial):
+                self._trial = state == "half_open"
+                return True
+            self.rejected += 1
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._trial or self._failures >= self.failure_threshold:
+                self._opened_at = self._clock()
+            self._trial = False
+
+    def release(self):
+        """
+        Give back a claimed trial call that ended without a result, e.g.
+        cancelled, so the next call can try instead of being rejected.
+        """
+        with self._lock:
+            self._trial = False
+
+
+_breakers: dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+
+def circuit_breaker(name: str, **kwargs) -> CircuitBreaker:
     """
-    Decorator for retrying a function on exception.
+    Process-wide breaker for an endpoint name, created on first use with
+    kwargs for CircuitBreaker.
     """
+    with _breakers_lock:
+        if name not in _breakers:
+            _breakers[name] = CircuitBreaker(**kwargs)
+        return _breakers[name]
+
+
+def retry(
+    max_attempts: int = 3,
+    initial_delay: float = 1.0,
+    max_delay: float = 30.0,
+    jitter: bool = True,
+    deadline: Optional[float] = None,
+    retry_on: Callable[[BaseException], bool] = is_retryable,
+    breaker: Union[CircuitBreaker, str, None] = None,
+) -> Callable:
+    """
+    Decorator for retrying a function or coroutine function on exception.
+
+    Delays double from initial_delay up to max_delay; with jitter each
+    sleep is drawn uniformly from zero to that delay, so concurrent
+    callers do not retry in lockstep. Coroutines sleep with asyncio.sleep.
+
+    :param deadline: Total seconds for all attempts; no retry is started
+        that would sleep past it
+    :param retry_on: Classifier; exceptions it rejects are raised at once
+    :param breaker: CircuitBreaker, or endpoint name for circuit_breaker();
+        retryable failures count against it and calls fail with
+        CircuitOpenError while it is open
+    """
+    if isinstance(breaker, str):
+        breaker = circuit_breaker(breaker)
+
+    def next_delay(error: Exception, attempt: int, started: float) -> Optional[float]:
+        """
+        Seconds to sleep before the next attempt, None to give up.
+        """
+        retryable = retry_on(error)
+        if breaker is not None:
+            # A rejected request still shows the endpoint is reachable
+            if retryable:
+                breaker.record_failure()
+            else:
+                breaker.record_success()
+        if not retryable or attempt == max_attempts:
+            return None
+        delay = min(max_delay, initial_delay * 2 ** (attempt - 1))
+        if jitter:
+            delay = random.uniform(0, delay)
+        if deadline is not None and time.monotonic() + delay - started > deadline:
+            return None
+        return delay
+
+    def check_breaker(last_error: Optional[Exception]):
+        if breaker is not None and not breaker.allow():
+            raise CircuitOpenError("Circuit breaker is open") from last_error
 
     def decorator(func: Callable) -> Callable:
+        if inspect.iscoroutinefunction(func):
+
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                started = time.monotonic()
+                error = None
+                for attempt in range(1, max_attempts + 1):
+                    check_breaker(error)
+                    try:
+                        result = await func(*args, **kwargs)
+                    except Exception as e:
+                        delay = next_delay(e, attempt, started)
+                        if delay is None:
+                            raise
+                        error = e
+                        await asyncio.sleep(delay)
+                    except BaseException:
+                        # Cancelled or interrupted, e.g. asyncio.CancelledError
+                        if breaker is not None:
+                            breaker.release()
+                        raise
+                    else:
+                        if breaker is not None:
+                            breaker.record_success()
+                        return result
+
+            return async_wrapper
+
         @functools.wraps(func)
         def wrapper(*args, **kwargs):
-            delay = initial_delay
+            started = time.monotonic()
+            error = None
             for attempt in range(1, max_attempts + 1):
+                check_breaker(error)
                 try:
-                    return func(*args, **kwargs)
+                    result = func(*args, **kwargs)
                 except Exception as e:
-                    if attempt == max_attempts:
+                    delay = next_delay(e, attempt, started)
+                    if delay is None:
                         raise
+                    error = e
                     time.sleep(delay)
-                    delay *= 2
+                except BaseException:
+                    # Cancelled or interrupted, e.g. asyncio.CancelledError
+                    if breaker is not None:
+                        breaker.release()
+                    raise
+                else:
+                    if breaker is not None:
+                        breaker.record_success()
+                    return result
 
         return wrapper
 
@@ -45,18 +241,128 @@ def ensure_paper_trading_symbol(symbol: str) -> str:
     return symbol
 
 
-def get_next_nonce() -> int:
+@contextlib.contextmanager
+def _file_lock(f):
     """
-    Returns next nonce, persisting last value in NONCE_FILE.
+    Exclusive lock on an open file, shared with other processes.
     """
-    last_nonce = 0
-    if os.path.exists(NONCE_FILE):
-        with open(NONCE_FILE, "r", encoding="utf-8") as f:
+    if os.name == "nt":  # Windows
+        import msvcrt
+
+        f.seek(0)
+        msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+    else:
+        import fcntl
+
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+class NonceAllocator:
+    """
+    Hands out unique, increasing nonces from memory.
+
+    Nonces are reserved from a file in blocks of block_size under an
+    exclusive file lock. The file records the last nonce reserved by any
+    process, so processes sharing it never receive the same nonce. Within
+    a block a nonce costs one next() on an itertools.count, which is atomic
+    under the GIL, so threads take nonces without locking. Once half a
+    block is used the next block is reserved by a background thread.
+
+    Nonces are strictly increasing within a process. Across processes
+    they are unique but only ordered per block; use block_size=1 if the
+    exchange rejects any nonce lower than the last one it saw.
+    """
+
+    def __init__(self, path: str = NONCE_FILE, block_size: int = 1000):
+        self.path = path
+        self.block_size = block_size
+        self.reservations = 0
+        self._lock = threading.Lock()
+        self._spare: Optional[tuple[int, int]] = None
+        self._prefetch: Optional[threading.Thread] = None
+        self._block = self._new_block(*self._reserve())
+
+    def _reserve(self) -> tuple[int, int]:
+        """
+        Claims the next block in the file, returning its [start, stop).
+        """
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        with os.fdopen(fd, "r+", encoding="utf-8") as f, _file_lock(f):
             try:
-                last_nonce = int(f.read().strip())
-            except Exception:
-                last_nonce = 0
-    next_nonce = last_nonce + 1
-    with open(NONCE_FILE, "w", encoding="utf-8") as f:
-        f.write(str(next_nonce))
-    return next_nonce
+                last = int(f.read().strip() or 0)
+            except ValueError:
+                last = 0
+            # Overwrite in place: the value only grows, so a process dying
+            # mid-update never leaves an empty file behind
+            f.seek(0)
+            f.write(str(last + self.block_size))
+            f.truncate()
+            f.flush()
+            os.fsync(f.fileno())
+        self.reservations += 1
+        return last + 1, last + 1 + self.block_size
+
+    def _new_block(self, start: int, stop: int) -> tuple:
+        return itertools.count(start), stop, start + self.block_size // 2
+
+    def _fill_spare(self):
+        self._spare = self._reserve()
+
+    def next(self) -> int:
+        counter, stop, prefetch_from = self._block
+        nonce = next(counter)
+        if nonce < prefetch_from:
+            return nonce
+        if nonce < stop:
+            if self._prefetch is None:
+                self._start_prefetch()
+            return nonce
+        return self._switch_block(counter)
+
+    def _start_prefetch(self):
+        with self._lock:
+            if self._prefetch is None:
+                self._prefetch = threading.Thread(
+                    target=self._fill_spare, daemon=True, name="nonce-prefetch"
+                )
+                self._prefetch.start()
+
+    def _switch_block(self, exhausted) -> int:
+        with self._lock:
+            if self._block[0] is exhausted:
+                if self._prefetch is not None:
+                    self._prefetch.join()
+                block, self._spare, self._prefetch = self._spare, None, None
+                # Reserve synchronously if the prefetch failed
+                self._block = self._new_block(*(block or self._reserve()))
+        return self.next()
+
+
+_nonce_allocators: dict[str, NonceAllocator] = {}
+_nonce_allocators_lock = threading.Lock()
+
+if hasattr(os, "register_at_fork"):
+    # A forked child must reserve its own blocks
+    os.register_at_fork(after_in_child=_nonce_allocators.clear)
+
+
+def get_next_nonce() -> int:
+    """
+    Returns next nonce from the shared NonceAllocator of NONCE_FILE.
+    """
+    allocator = _nonce_allocators.get(NONCE_FILE)
+    if allocator is None:
+        with _nonce_allocators_lock:
+            allocator = _nonce_allocators.get(NONCE_FILE)
+            if allocator is None:
+                allocator = _nonce_allocators[NONCE_FILE] = NonceAllocator(NONCE_FILE)
+    return allocator.next()
@@ -0,0 +1,347 @@
+"""
+Parallel parameter-sweep optimizer for the backtest strategy.
+Runs grid or random searches over BotConfig fields across a process pool.
+"""
+
+import argparse
+import itertools
+import json
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+from backtest import backtest_dataframe, load_ohlcv, trade_statistics
+from config_loader import BotConfig, load_config
+from modules.indicator_cache import IndicatorCache, data_fingerprint
+
+# Result column for each ranking key and whether it sorts ascending
+RANK_KEYS = {
+    "pnl": ("total_pnl", False),
+    "drawdown": ("max_drawdown", True),
+    "sharpe": ("sharpe", False),
+}
+
+
+class SharedOHLCV:
+    """
+    OHLCV columns placed once in shared memory.
+
+    Pool workers attach by name and build DataFrames whose columns are views
+    into the shared block, so the data is neither pickled nor copied per task.
+    """
+
+    VALUE_COLUMNS = ("open", "high", "low", "close", "volume")
+
+    def __init__(
+        self, shm: shared_memory.SharedMemory, length: int, tz: Optional[str] = None
+    ):
+        self.shm = shm
+        self.length = length
+        self.tz = tz
+        self.values = np.ndarray(
+            (len(self.VALUE_COLUMNS), length), dtype=np.float64, buffer=shm.buf
+        )
+        self.timestamps = np.ndarray(
+            (length,), dtype=np.int64, buffer=shm.buf, offset=self.values.nbytes
+        )
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame) -> "SharedOHLCV":
+        """
+        Copy an OHLCV frame into a new shared memory block.
+        """
+        length = len(df)
+        size = (len(cls.VALUE_COLUMNS) + 1) * length * 8
+        shm = shared_memory.SharedMemory(create=True, size=max(size, 1))
+        timestamps = pd.to_datetime(df["timestamp"])
+        tz = None
+        if timestamps.dt.tz is not None:
+            tz = str(timestamps.dt.tz)
+            timestamps = timestamps.dt.tz_convert("UTC").dt.tz_localize(None)
+        shared = cls(shm, length, tz)
+        for row, column in enumerate(cls.VALUE_COLUMNS):
+            shared.values[row] = df[column].to_numpy(dtype=np.float64)
+        shared.timestamps[:] = timestamps.astype("int64")
+        return shared
+
+    @classmethod
+    def attach(cls, descriptor: tuple) -> "SharedOHLCV":
+        """
+        Map an existing block from the descriptor() of its owner.
+        """
+        name, length, tz = descriptor
+        return cls(shared_memory.SharedMemory(name=name), length, tz)
+
+    def descriptor(self) -> tuple:
+        return (self.shm.name, self.length, self.tz)
+
+    def frame(self) -> pd.DataFrame:
+        """
+        Read-only DataFrame view of the shared columns.
+        """
+        self.values.flags.writeable = False
+        self.timestamps.flags.writeable = False
+        timestamps = pd.Series(self.timestamps.view("datetime64[ns]"), copy=False)
+        if self.tz:
+            timestamps = timestamps.dt.tz_localize("UTC").dt.tz_convert(self.tz)
+        columns = {"timestamp": timestamps}
+        columns.update(zip(self.VALUE_COLUMNS, self.values))
+        return pd.DataFrame(columns, copy=False)
+
+    def close(self):
+        self.values = self.timestamps = None
+        self.shm.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        self.shm.unlink()
+
+
+def grid_space(grid: dict) -> list[dict]:
+    """
+    Expand {field: [values]} into every parameter combination.
+    """
+    _check_fields(grid)
+    keys = list(grid)
+    return [dict(zip(keys, values)) for values in itertools.product(*grid.values())]
+
+
+def random_space(space: dict, samples: int, seed: Optional[int] = None) -> list[dict]:
+    """
+    Draw parameter sets from {field: [choices]} or {field: (low, high)}.
+
+    A (low, high) pair of ints samples integers inclusively, otherwise floats
+    are drawn uniformly.
+    """
+    _check_fields(space)
+    rng = random.Random(seed)
+    draws = []
+    for _ in range(samples):
+        params = {}
+        for key, spec in space.items():
+            if isinstance(spec, tuple):
+                low, high = spec
+                if isinstance(low, int) and isinstance(high, int):
+                    params[key] = rng.randint(low, high)
+                else:
+                    params[key] = rng.uniform(low, high)
+            else:
+                params[key] = rng.choice(list(spec))
+        draws.append(params)
+    return draws
+
+
+def _check_fields(space: dict):
+    unknown = set(space) - set(BotConfig.model_fields)
+    if unknown:
+        raise ValueError(f"Unknown BotConfig fields: {sorted(unknown)}")
+
+
+# Per-worker state set by _init_worker
+_worker_data: Optional[SharedOHLCV] = None
+_worker_frame: Optional[pd.DataFrame] = None
+_worker_args: dict = {}
+
+
+def _init_worker(
+    descriptor: tuple,
+    base_config: dict,
+    initial_equity: float,
+    hold_bars: int,
+    fingerprint: str,
+    cache_dir: Optional[str],
+):
+    global _worker_data, _worker_frame, _worker_args
+    _worker_data = SharedOHLCV.attach(descriptor)
+    _worker_frame = _worker_data.frame()
+    _worker_args = {
+        "base_config": base_config,
+        "initial_equity": initial_equity,
+        "hold_bars": hold_bars,
+        "cache": IndicatorCache(cache_dir=cache_dir),
+        "fingerprint": fingerprint,
+    }
+
+
+def evaluate(
+    df: pd.DataFrame,
+    base_config: dict,
+    params: dict,
+    initial_equity: float = 10000.0,
+    hold_bars: int = 1,
+    cache: Optional[IndicatorCache] = None,
+    fingerprint: Optional[str] = None,
+) -> dict:
+    """
+    Backtest one parameter set and return its parameters with trade statistics.
+    Invalid parameter sets are reported through an "error" entry.
+    """
+    result = dict(params)
+    try:
+        cfg = BotConfig(**{**base_config, **params})
+        positions = backtest_dataframe(
+            df, cfg, initial_equity, hold_bars, cache, fingerprint
+        )
+        result.update(trade_statistics(positions, initial_equity))
+        result["error"] = None
+    except Exception as e:
+        result["error"] = str(e)
+    return result
+
+
+def _evaluate_in_worker(params: dict) -> dict:
+    return evaluate(_worker_frame, params=params, **_worker_args)
+
+
+def rank_results(results: list[dict], sort_by: str = "pnl") -> pd.DataFrame:
+    """
+    Rank sweep results by PnL, drawdown or Sharpe, using the other two as
+    tie-breakers. Failed parameter sets are listed last.
+    """
+    if sort_by not in RANK_KEYS:
+        raise ValueError(f"sort_by must be one of {sorted(RANK_KEYS)}")
+    order = [sort_by] + [key for key in RANK_KEYS if key != sort_by]
+    columns = [RANK_KEYS[key][0] for key in order]
+    ascending = [RANK_KEYS[key][1] for key in order]
+    df = pd.DataFrame(results)
+    for column in columns:
+        if column not in df.columns:
+            df[column] = np.nan
+    return df.sort_values(columns, ascending=ascending, na_position="last").reset_index(
+        drop=True
+    )
+
+
+def optimize(
+    df: pd.DataFrame,
+    base_config: BotConfig,
+    param_sets: list[dict],
+    initial_equity: float = 10000.0,
+    hold_bars: int = 1,
+    workers: Optional[int] = None,
+    sort_by: str = "pnl",
+    cache_dir: Optional[str] = None,
+) -> pd.DataFrame:
+    """
+    Backtest every parameter set in parallel and return the ranked results.
+
+    The OHLCV frame is copied once into shared memory and mapped by each
+    worker; tasks only carry their parameter dicts. Each worker keeps an
+    indicator cache, so parameter sets that only change SL/TP or sizing
+    reuse the indicator columns of earlier runs.
+
+    :param df: Raw OHLCV data
+    :param base_config: Config the parameter sets override
+    :param param_sets: Output of grid_space or random_space
+    :param workers: Process count, defaults to the number of CPUs
+    :param sort_by: "pnl", "drawdown" or "sharpe"
+    :param cache_dir: Optional on-disk indicator cache shared by the workers
+    """
+    workers = workers or os.cpu_count() or 1
+    workers = max(1, min(workers, len(param_sets)))
+    chunksize = max(1, len(param_sets) // (workers * 4))
+    with SharedOHLCV.from_frame(df) as shared:
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_worker,
+            initargs=(
+                shared.descriptor(),
+                base_config.model_dump(),
+                initial_equity,
+                hold_bars,
+                data_fingerprint(df),
+                cache_dir,
+            ),
+        ) as executor:
+            results = list(
+                executor.map(_evaluate_in_worker, param_sets, chunksize=chunksize)
+            )
+    return rank_results(results, sort_by)
+
+
+def _load_json_arg(value: str):
+    if os.path.exists(value):
+        with open(value, "r", encoding="utf-8") as f:
+            return json.load(f)
+    return json.loads(value)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Parallel parameter sweep over strategy config fields"
+    )
+    parser.add_argument("-d", "--data-file", required=True, help="CSV with OHLCV data")
+    parser.add_argument(
+        "-c", "--config", default="config.json", help="Path to config.json"
+    )
+    search = parser.add_mutually_exclusive_group(required=True)
+    search.add_argument(
+        "-g", "--grid", help='JSON (or file) like {"LOOKBACK": [3, 5, 8]}'
+    )
+    search.add_argument(
+        "-s",
+        "--space",
+        help="JSON (or file) for random search; two-element lists are "
+        "(low, high) ranges, longer lists are choices",
+    )
+    parser.add_argument(
+        "-n", "--samples", type=int, default=100, help="Random search samples"
+    )
+    parser.add_argument("--seed", type=int, default=None, help="Random search seed")
+    parser.add_argument(
+        "-w", "--workers", type=int, default=None, help="Worker processes"
+    )
+    parser.add_argument(
+        "--sort", choices=sorted(RANK_KEYS), default="pnl", help="Ranking key"
+    )
+    parser.add_argument(
+        "-ie",
+        "--initial-equity",
+        type=float,
+        default=10000.0,
+        help="Starting account equity",
+    )
+    parser.add_argument(
+        "-hb",
+        "--hold-bars",
+        type=int,
+        default=1,
+        help="Candles to hold position if no SL/TP",
+    )
+    parser.add_argument(
+        "-o", "--output", default="optimizer_results.csv", help="Results CSV"
+    )
+    parser.add_argument(
+        "--cache-dir", default=None, help="Directory for on-disk indicator cache"
+    )
+    args = parser.parse_args()
+
+    if args.grid:
+        param_sets = grid_space(_load_json_arg(args.grid))
+    else:
+        space = {
+            key: tuple(spec) if len(spec) == 2 else spec
+            for key, spec in _load_json_arg(args.space).items()
+        }
+        param_sets = random_space(space, args.samples, args.seed)
+
+    ranked = optimize(
+        load_ohlcv(args.data_file),
+        load_config(args.config),
+        param_sets,
+        initial_equity=args.initial_equity,
+        hold_bars=args.hold_bars,
+        workers=args.workers,
+        sort_by=args.sort,
+        cache_dir=args.cache_dir,
+    )
+    ranked.to_csv(args.output, index=False)
+    print(ranked.head(10).to_string())
+    print(f"{len(ranked)} parameter sets evaluated, results saved to {args.output}")
@@ -0,0 +1,207 @@
+"""
+Multi-symbol runner.
+Hosts one TradingBot strategy per symbol as asyncio tasks in a single
+process, sharing the exchange client, its rate limiter and the candle cache.
+"""
+
+import asyncio
+import logging
+import statistics
+from typing import Optional
+
+from .config_loader import BotConfig, load_config
+from .modules.candle_cache import CandleCache
+from .modules.orders import create_async_exchange
+from .tradingbot import Clock, TradingBot, default_clock
+
+logger = logging.getLogger("runner")
+
+
+def symbol_config(base: BotConfig, symbol: str, overrides: Optional[dict]) -> BotConfig:
+    """
+    Validated copy of base for one symbol with its overrides applied.
+    """
+    data = {**base.model_dump(), **(overrides or {}), "SYMBOL": symbol}
+    data["SYMBOLS"] = None
+    return BotConfig(**data)
+
+
+class _Slot:
+    """
+    Supervision state of one symbol's task.
+    """
+
+    def __init__(self, bot: TradingBot):
+        self.bot = bot
+        self.task: Optional[asyncio.Task] = None
+        self.errors = 0
+        self.restarts = 0
+        self.last_error: Optional[str] = None
+
+
+class BotRunner:
+    """
+    Runs many symbol strategies concurrently in one event loop.
+
+    All bots trade through one ccxt.async_support client, so they share its
+    connection pool and built-in rate limiter (enableRateLimit throttles
+    every request of the client, whichever task sends it). Every bot pushes
+    the candles it fetches into one CandleCache, which the dashboard reads
+    without extra exchange requests. An exception in one symbol is logged
+    and that symbol alone is restarted after restart_delay; the others keep
+    trading.
+    """
+
+    def __init__(
+        self,
+        config: Optional[BotConfig] = None,
+        symbols: Optional[dict[str, dict]] = None,
+        exchange=None,
+        candle_cache: Optional[CandleCache] = None,
+        clock: Optional[Clock] = None,
+        restart_delay: float = 5.0,
+        max_restarts: Optional[int] = None,
+    ):
+        """
+        :param config: Base config, loaded from config.json if None
+        :param symbols: Config overrides per symbol, defaults to
+            config.SYMBOLS or just config.SYMBOL
+        :param exchange: Shared ccxt.async_support client, created from the
+            base config when the runner starts if None
+        :param candle_cache: Shared cache, defaults to the first bot's
+        :param clock: Time source shared by all bots, defaults to
+            default_clock(exchange)
+        :param restart_delay: Seconds before a failed symbol is restarted
+        :param max_restarts: Restarts per symbol before giving up, unlimited if None
+        """
+        self.config = config or load_config()
+        if symbols is None:
+            symbols = self.config.SYMBOLS or {self.config.SYMBOL: {}}
+        self.exchange = exchange
+        self.clock = clock
+        self.restart_delay = restart_delay
+        self.max_restarts = max_restarts
+        self.candles = candle_cache
+        self.slots: dict[str, _Slot] = {}
+        for symbol, overrides in symbols.items():
+            bot = TradingBot(
+                symbol_config(self.config, symbol, overrides),
+                candle_cache=self.candles,
+            )
+            self.candles = self.candles or bot.candles
+            self.slots[symbol] = _Slot(bot)
+        self._running = False
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._stopped: Optional[asyncio.Event] = None
+
+    @property
+    def bots(self) -> dict[str, TradingBot]:
+        return {symbol: slot.bot for symbol, slot in self.slots.items()}
+
+    async def run(self, max_candles: Optional[int] = None, **kwargs):
+        """
+        Run every symbol until stop(), or until each has processed
+        max_candles candles. Extra keyword arguments go to
+        TradingBot.run_async.
+        """
+        own_exchange = self.exchange is None
+        if own_exchange:
+            self.exchange = create_async_exchange(
+                self.config.API_KEY, self.config.API_SECRET, self.config.EXCHANGE
+            )
+        if self.clock is None:
+            self.clock = default_clock(self.exchange)
+        self._loop = asyncio.get_running_loop()
+        self._stopped = asyncio.Event()
+        self._running = True
+        try:
+            for symbol, slot in self.slots.items():
+                slot.task = asyncio.create_task(
+                    self._supervise(slot, max_candles, kwargs), name=symbol
+                )
+            await asyncio.gather(*(slot.task for slot in self.slots.values()))
+        finally:
+            self._running = False
+            self._stopped = None
+            for slot in self.slots.values():
+                if slot.task is not None and not slot.task.done():
+                    slot.task.cancel()
+            if own_exchange:
+                await self.exchange.close()
+                self.exchange = None
+
+    async def _supervise(self, slot: _Slot, max_candles: Optional[int], kwargs):
+        bot = slot.bot
+        symbol = bot.config.SYMBOL
+        while self._running:
+            try:
+                await bot.run_async(
+                    exchange=self.exchange,
+                    clock=self.clock,
+                    max_candles=max_candles,
+                    **kwargs,
+                )
+                return
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                slot.errors += 1
+                slot.last_error = f"{type(e).__name__}: {e}"
+                logger.exception(f"{symbol} strategy failed")
+            if self.max_restarts is not None and slot.restarts >= self.max_restarts:
+                logger.error(f"{symbol} stopped after {slot.restarts} restarts")
+                return
+            slot.restarts += 1
+            try:
+                await asyncio.wait_for(self._stopped.wait(), self.restart_delay)
+            except asyncio.TimeoutError:
+                pass
+
+    def stop(self):
+        self._running = False
+        if self._loop is not None and self._stopped is not None:
+            try:
+                self._loop.call_soon_threadsafe(self._stopped.set)
+            except RuntimeError:
+                pass  # Loop already closed
+        for slot in self.slots.values():
+            slot.bot.stop()
+        return True
+
+    def stats(self) -> dict[str, dict]:
+        """
+        Per-symbol counters: candles processed, CPU time spent on them,
+        decision latency, trades, failures and restarts.
+        """
+        result = {}
+        for symbol, slot in self.slots.items():
+            bot = slot.bot
+            latencies = list(bot.decision_latencies)
+            result[symbol] = {
+                "running": bot.is_running,
+                "candles": bot.candles_processed,
+                "cpu_ms": bot.cpu_seconds * 1000,
+                "cpu_ms_per_candle": (
+                    bot.cpu_seconds * 1000 / bot.candles_processed
+                    if bot.candles_processed
+                    else None
+                ),
+                "latency_p50_ms": statistics.median(latencies) if latencies else None,
+                "latency_max_ms": max(latencies) if latencies else None,
+                "equity": bot.equity,
+                "in_position": bot.current_position is not None,
+                "trades": len(bot.trade_history),
+                "errors": slot.errors,
+                "restarts": slot.restarts,
+                "last_error": slot.last_error,
+            }
+        return result
+
+
+async def main():
+    runner = BotRunner()
+    await runner.run()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
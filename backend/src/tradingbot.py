@@ -4,37 +4,153 @@ Loads config, initializes exchange, runs trading loop.
 """
 
 import asyncio
+import contextlib
 import logging
+import math
+import time
+from collections import deque
+from datetime import datetime, timezone
+from typing import Optional
 
+import ccxt
 import pandas as pd
 
 from .config_loader import load_config
-from .modules.indicators import calculate_indicators, detect_fvg
-from .modules.orders import init_exchange, place_order
+from .modules.candle_cache import CandleCache
+from .modules.incremental import IncrementalIndicators
+from .modules.indicators import (
+    add_fvg_columns,
+    calculate_indicators,
+    detect_fvg,
+    fvg_entry_signals,
+)
+from .modules.market_stream import candle_topic
+from .modules.metrics import MetricsAggregator
+from .modules.orders import (
+    MARKETS_CACHE_TTL,
+    PAPER_EXCHANGE_ID,
+    calculate_position_size,
+    configure_rate_limiter,
+    create_async_exchange,
+    init_exchange,
+    place_order,
+    submit_order_async,
+)
+from .modules.paper_exchange import AsyncPaperExchange, PaperExchange
 from .modules.utils import ensure_paper_trading_symbol, retry
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("tradingbot")
 
 
+class Clock:
+    """
+    Wall-clock time and asyncio sleep, replaceable by a fake clock in tests.
+    """
+
+    def time(self) -> float:
+        return time.time()
+
+    async def sleep(self, seconds: float):
+        await asyncio.sleep(seconds)
+
+
+class ReplayClock(Clock):
+    """
+    Simulated time of a PaperExchange replay. Sleeping closes the exchange's
+    candles up to the wake-up time instead of waiting; once the replay is
+    used up, time passes at wall-clock speed.
+    """
+
+    def __init__(self, exchange: PaperExchange):
+        self.exchange = exchange
+        self.now = 0.0
+
+    def time(self) -> float:
+        return max(self.now, self.exchange.milliseconds() / 1000)
+
+    def sleep(self, seconds: float):
+        # Advances before returning, so concurrent sleepers of one clock
+        # see the new time as soon as the first of them sleeps
+        self.now = self.time() + max(seconds, 0.0)
+        if self.exchange.replay_finished:
+            return asyncio.sleep(seconds)
+        self.exchange.advance_to(int(self.now * 1000))
+        return asyncio.sleep(0)
+
+
+def default_clock(exchange) -> Clock:
+    """
+    The replay clock of a paper exchange, the wall clock otherwise.
+    """
+    if isinstance(exchange, AsyncPaperExchange):
+        return ReplayClock(exchange.sync)
+    return Clock()
+
+
+def next_candle_close(now: float, timeframe_seconds: float) -> float:
+    """
+    Epoch seconds of the first candle close strictly after now.
+    """
+    return (math.floor(now / timeframe_seconds) + 1) * timeframe_seconds
+
+
 class TradingBot:
     """
     TradingBot class for use in dashboard and tests.
     """
 
-    def __init__(self, config=None):
+    def __init__(self, config=None, candle_cache=None, metrics=None):
         self.config = config or load_config()
         self.cfg = self.config  # Alias for compatibility with tests
+        cfg = self.config
+        if (
+            cfg.RATE_LIMIT_PER_SECOND
+            or cfg.RATE_LIMIT_BURST
+            or cfg.RATE_LIMIT_WEIGHTS
+            or cfg.RATE_LIMIT_STATE_FILE
+        ):
+            configure_rate_limiter(
+                cfg.EXCHANGE,
+                rate=cfg.RATE_LIMIT_PER_SECOND,
+                capacity=cfg.RATE_LIMIT_BURST,
+                weights=cfg.RATE_LIMIT_WEIGHTS,
+                state_file=cfg.RATE_LIMIT_STATE_FILE,
+            )
+        paper_options = {}
+        if cfg.EXCHANGE == PAPER_EXCHANGE_ID and cfg.PAPER_CANDLES:
+            paper_options = {
+                "candle_source": cfg.PAPER_CANDLES,
+                "timeframe": cfg.TIMEFRAME,
+                "warmup": cfg.LIMIT,
+            }
         self.exchange = init_exchange(
-            self.config.API_KEY, self.config.API_SECRET, self.config.EXCHANGE
+            self.config.API_KEY,
+            self.config.API_SECRET,
+            self.config.EXCHANGE,
+            markets_cache_file=self.config.MARKETS_CACHE_FILE,
+            markets_ttl=self.config.MARKETS_CACHE_TTL or MARKETS_CACHE_TTL,
+            **paper_options,
         )
+        self.candles = candle_cache or CandleCache(self.exchange)
         self.is_running = False
         self.trade_history = []
         self.current_position = None
+        self.metrics = metrics or MetricsAggregator()
         self.last_update = None
         self.real_symbol = (
             self.config.SYMBOL if hasattr(self.config, "SYMBOL") else "BTC/USD"
         )
+        self.equity = None
+        self.indicators = None
+        self.decision_latencies: deque = deque(maxlen=1000)
+        self.candles_processed = 0
+        self.cpu_seconds = 0.0
+        # The FVG window before the latest candle, plus that candle
+        self._fvg_window: deque = deque(maxlen=self.config.LOOKBACK + 3)
+        self._last_candle_ms: Optional[int] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._stopped: Optional[asyncio.Event] = None
 
     def start(self):
         self.is_running = True
@@ -42,22 +158,29 @@ class TradingBot:
 
     def stop(self):
         self.is_running = False
+        if self._loop is not None and self._stopped is not None:
+            try:
+                self._loop.call_soon_threadsafe(self._stopped.set)
+            except RuntimeError:
+                pass  # Loop already closed
         return True
 
+    def fetch_candles(self, limit=None) -> pd.DataFrame:
+        """
+        Recent candles for the configured symbol from the shared candle cache,
+        with timestamps converted to UTC datetimes.
+        """
+        df = self.candles.get(
+            self.config.SYMBOL, self.config.TIMEFRAME, limit or self.config.LIMIT
+        )
+        df["timestamp"] = pd.to_datetime(df["timestamp"], unit="ms", utc=True)
+        return df
+
     def run(self):
         """
         Example run method for TradingBot.
         """
-        df = pd.DataFrame(
-            {
-                "timestamp": pd.date_range("2024-01-01", periods=100, freq="h"),
-                "open": [1.0] * 100,
-                "high": [1.1] * 100,
-                "low": [0.9] * 100,
-                "close": [1.0] * 100,
-                "volume": [100] * 100,
-            }
-        )
+        df = self.fetch_candles()
         df = calculate_indicators(
             df,
             ema_length=14,
@@ -65,6 +188,7 @@ class TradingBot:
             trading_start_hour=9,
             trading_end_hour=17,
         )
+        df = add_fvg_columns(df, lookback=3)
         logger.info("Indicators calculated.")
         fvg = detect_fvg(df, lookback=3, bullish=True)
         logger.info(f"Detected FVG: {fvg}")
@@ -72,17 +196,305 @@ class TradingBot:
         # place_order("market", self.config.SYMBOL, 0.01)
         logger.info("Trading bot run complete.")
 
+    async def run_async(
+        self,
+        exchange=None,
+        clock: Optional[Clock] = None,
+        max_candles: Optional[int] = None,
+        poll_interval: float = 0.25,
+        max_polls: int = 40,
+    ):
+        """
+        Long-running trading loop that wakes at every TIMEFRAME candle close.
+
+        Each wake-up target is computed from the clock rather than by adding
+        sleeps, so timer drift never accumulates. After a close the new bar
+        is fetched (polling briefly until the exchange publishes it),
+        indicators are updated incrementally and the signal is acted on with
+        async orders. decision_latencies records, per candle, the
+        milliseconds from candle close to the finished decision.
+
+        :param exchange: ccxt.async_support client, created from config if None
+        :param clock: Time source, defaults to default_clock(exchange)
+        :param max_candles: Stop after this many candles, run until stop() if None
+        :param poll_interval: Seconds between fetches while a bar is unpublished
+        :param max_polls: Fetch attempts per candle before waiting for the next
+        """
+        step = ccxt.Exchange.parse_timeframe(self.config.TIMEFRAME)
+        async with self._session(exchange, clock) as exchange:
+            await self._warm_up(exchange, step)
+            processed = 0
+            while self.is_running and (max_candles is None or processed < max_candles):
+                close_at = next_candle_close(self.clock.time(), step)
+                if not await self._sleep_until(close_at):
+                    break
+                try:
+                    for _ in range(max_polls):
+                        bars = await self._fetch_closed_bars(exchange, step)
+                        if bars:
+                            break
+                        if not await self._sleep_until(
+                            self.clock.time() + poll_interval
+                        ):
+                            # Stopped before the candle was published
+                            return
+                    else:
+                        logger.warning(f"No closed candle published for {close_at}")
+                        continue
+                except Exception as e:
+                    # Missed bars are backfilled with the next candle
+                    logger.error(f"Error fetching candle {close_at}: {e}")
+                    continue
+                for bar in bars:
+                    await self._handle_candle(exchange, bar)
+                self._record_decision(close_at)
+                processed += 1
+
+    async def run_stream(
+        self,
+        pubsub,
+        exchange=None,
+        clock: Optional[Clock] = None,
+        max_candles: Optional[int] = None,
+    ):
+        """
+        Trading loop driven by closed candles from a MarketDataStream.
+
+        REST is used only to warm up, to backfill bars missed while the
+        stream was disconnected, and for orders, so a decision follows a
+        candle close as soon as the stream publishes it.
+
+        :param pubsub: PubSub the stream publishes candle_topic messages on
+        :param exchange: ccxt.async_support client, created from config if None
+        :param clock: Time source, defaults to default_clock(exchange)
+        :param max_candles: Stop after this many candles, run until stop() if None
+        """
+        step = ccxt.Exchange.parse_timeframe(self.config.TIMEFRAME)
+        subscription = pubsub.subscribe(
+            candle_topic(self.config.SYMBOL, self.config.TIMEFRAME)
+        )
+        try:
+            async with self._session(exchange, clock) as exchange:
+                await self._warm_up(exchange, step)
+                processed = 0
+                while self.is_running and (
+                    max_candles is None or processed < max_candles
+                ):
+                    bar = await self._next_message(subscription)
+                    if bar is None:
+                        break
+                    last = self._last_candle_ms
+                    if last is not None and bar[0] <= last:
+                        continue
+                    bars = [bar]
+                    if last is not None and bar[0] > last + step * 1000:
+                        try:
+                            missed = await self._fetch_closed_bars(exchange, step)
+                            bars = [b for b in missed if b[0] < bar[0]] + bars
+                        except Exception as e:
+                            logger.error(f"Error backfilling candles: {e}")
+                    for closed in bars:
+                        await self._handle_candle(exchange, closed)
+                    self._record_decision(bars[-1][0] / 1000 + step)
+                    processed += 1
+        finally:
+            subscription.close()
+
+    @contextlib.asynccontextmanager
+    async def _session(self, exchange, clock: Optional[Clock]):
+        """
+        Running state of one trading loop; closes the exchange it created.
+        """
+        own_exchange = exchange is None
+        if own_exchange:
+            exchange = create_async_exchange(
+                self.config.API_KEY, self.config.API_SECRET, self.config.EXCHANGE
+            )
+        self.clock = clock or default_clock(exchange)
+        self._loop = asyncio.get_running_loop()
+        self._stopped = asyncio.Event()
+        self.is_running = True
+        try:
+            yield exchange
+        finally:
+            self.is_running = False
+            self._stopped = None
+            if own_exchange:
+                await exchange.close()
+
+    def _record_decision(self, close_at: float):
+        self.decision_latencies.append((self.clock.time() - close_at) * 1000)
+        self.last_update = datetime.now(timezone.utc).isoformat()
+
+    async def _next_message(self, subscription):
+        """
+        Next message of subscription, or None once stop() is called.
+        """
+        getter = asyncio.ensure_future(subscription.get())
+        stopper = asyncio.ensure_future(self._stopped.wait())
+        done, pending = await asyncio.wait(
+            {getter, stopper}, return_when=asyncio.FIRST_COMPLETED
+        )
+        for task in pending:
+            task.cancel()
+        return getter.result() if getter in done else None
+
+    async def _sleep_until(self, target: float) -> bool:
+        """
+        Sleep until the clock reaches target, re-sleeping after an early
+        wake-up. Returns False if stop() was called meanwhile.
+        """
+        while self.is_running:
+            remaining = target - self.clock.time()
+            if remaining <= 0:
+                return True
+            sleeper = asyncio.ensure_future(self.clock.sleep(remaining))
+            stopper = asyncio.ensure_future(self._stopped.wait())
+            _, pending = await asyncio.wait(
+                {sleeper, stopper}, return_when=asyncio.FIRST_COMPLETED
+            )
+            for task in pending:
+                task.cancel()
+        return False
+
+    async def _warm_up(self, exchange, step: float):
+        """
+        Seed indicators, the FVG window and equity from recent history.
+        """
+        self.indicators = IncrementalIndicators.from_config(self.config)
+        self._fvg_window.clear()
+        self._last_candle_ms = None
+        history = await exchange.fetch_ohlcv(
+            self.config.SYMBOL, self.config.TIMEFRAME, limit=self.config.LIMIT
+        )
+        self.candles.update(self.config.SYMBOL, self.config.TIMEFRAME, history)
+        for bar in self._closed(history, step):
+            self._update_state(bar)
+        if self.equity is None:
+            balance = await exchange.fetch_balance()
+            quote = self.config.SYMBOL.split("/")[-1].split(":")[0]
+            self.equity = float((balance.get("free") or {}).get(quote) or 0.0)
+
+    def _closed(self, bars: list, step: float) -> list:
+        now_ms = self.clock.time() * 1000
+        step_ms = step * 1000
+        return [
+            bar
+            for bar in bars or []
+            if bar[0] + step_ms <= now_ms
+            and (self._last_candle_ms is None or bar[0] > self._last_candle_ms)
+        ]
+
+    async def _fetch_closed_bars(self, exchange, step: float) -> list:
+        since = None
+        if self._last_candle_ms is not None:
+            since = int(self._last_candle_ms + step * 1000)
+        bars = await exchange.fetch_ohlcv(
+            self.config.SYMBOL, self.config.TIMEFRAME, since=since
+        )
+        self.candles.update(self.config.SYMBOL, self.config.TIMEFRAME, bars)
+        return self._closed(bars, step)
+
+    def _update_state(self, bar: list) -> dict:
+        timestamp, _, high, low, close, volume = bar[:6]
+        latest = self.indicators.update(
+            pd.Timestamp(timestamp, unit="ms", tz="UTC"), high, low, close, volume
+        )
+        self._fvg_window.append({"high": high, "low": low, "close": close, **latest})
+        self._last_candle_ms = timestamp
+        return latest
+
+    async def _handle_candle(self, exchange, bar: list):
+        """
+        on_candle() that logs exchange and order errors instead of ending
+        the trading loop.
+        """
+        try:
+            await self.on_candle(exchange, bar)
+        except Exception as e:
+            logger.error(f"Error handling candle {bar[0]}: {e}")
+
+    async def on_candle(self, exchange, bar: list):
+        """
+        Update state with one closed candle, then manage the open position
+        or enter on a signal.
+        """
+        started = time.thread_time()
+        self._update_state(bar)
+        _, _, high, low, close, _ = bar[:6]
+        # The same rule the backtests simulate, on the last few candles
+        signal = self.current_position is None and bool(
+            fvg_entry_signals(pd.DataFrame(self._fvg_window), self.config.LOOKBACK)[-1]
+        )
+        # Only the synchronous part is timed; awaits would count other tasks
+        self.cpu_seconds += time.thread_time() - started
+        self.candles_processed += 1
+        if self.current_position is not None:
+            await self._manage_position(exchange, high, low)
+        elif signal:
+            await self._enter(exchange, close)
+
+    async def _enter(self, exchange, price: float):
+        cfg = self.config
+        sl_price = price * (1 - cfg.STOP_LOSS_PERCENT / 100)
+        tp_price = price * (1 + cfg.TAKE_PROFIT_PERCENT / 100)
+        amount = calculate_position_size(
+            self.equity, cfg.RISK_PER_TRADE, price, sl_price
+        )
+        if amount <= 0:
+            return
+        order = await submit_order_async(exchange, cfg.SYMBOL, "buy", amount)
+        entry_price = order.get("average") or order.get("price") or price
+        self.current_position = {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "entry_price": entry_price,
+            "size": amount,
+            "sl_price": sl_price,
+            "tp_price": tp_price,
+            "order_id": order.get("id"),
+        }
+        self.metrics.record_position(self.current_position)
+        logger.info(f"Entered {cfg.SYMBOL} {amount} @ {entry_price}")
+
+    async def _manage_position(self, exchange, high: float, low: float):
+        position = self.current_position
+        if low <= position["sl_price"]:
+            reason = "SL"
+        elif high >= position["tp_price"]:
+            reason = "TP"
+        else:
+            return
+        order = await submit_order_async(
+            exchange, self.config.SYMBOL, "sell", position["size"]
+        )
+        exit_price = order.get("average") or order.get("price")
+        if not exit_price:
+            exit_price = position["sl_price" if reason == "SL" else "tp_price"]
+        pnl = position["size"] * (exit_price - position["entry_price"])
+        self.equity += pnl
+        trade = {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "type": "buy",
+            "entry_price": position["entry_price"],
+            "exit_price": exit_price,
+            "size": position["size"],
+            "pnl": pnl,
+            "reason": reason,
+        }
+        self.trade_history.append(trade)
+        self.current_position = None
+        self.metrics.record_trade(trade)
+        self.metrics.record_position(None)
+        logger.info(f"Exited {self.config.SYMBOL} ({reason}) PnL {pnl:.2f}")
+
 
 async def main():
     """
     Main async trading loop.
     """
     bot = TradingBot()
-    bot.start()
-    bot.run()
-    bot.stop()
+    await bot.run_async()
 
 
 if __name__ == "__main__":
     asyncio.run(main())
-    asyncio.run(main())
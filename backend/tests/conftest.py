@@ -15,7 +15,7 @@ from dotenv import load_dotenv
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from backend.src.config_loader import BotConfig, load_config
-from backend.src.modules.orders import init_exchange
+from backend.src.modules.orders import create_exchange, init_exchange
 from backend.src.tradingbot import TradingBot
 
 # Load environment variables
@@ -62,23 +62,56 @@ def config():
 
 
 @pytest.fixture
-def exchange(config):
-    """Create an exchange instance for testing"""
-    if not config.API_KEY or not config.API_SECRET:
-        pytest.skip("API credentials not found in .env file")
-
-    exchange = ccxt.bitfinex(
+def exchange(config, tmp_path):
+    """Create a paper exchange replaying generated candles of config.TIMEFRAME"""
+    periods = config.LIMIT * 2
+    rng = np.random.default_rng(0)
+    close = 50000 + rng.normal(0, 100, periods).cumsum()
+    open_ = np.concatenate(([50000.0], close[:-1]))
+    candles = pd.DataFrame(
         {
-            "apiKey": config.API_KEY,
-            "secret": config.API_SECRET,
-            "enableRateLimit": True,
-            "options": {"paper": True, "defaultType": "spot"},  # Enable paper trading
+            "timestamp": pd.date_range(
+                start="2024-01-01",
+                periods=periods,
+                freq=pd.Timedelta(
+                    seconds=ccxt.Exchange.parse_timeframe(config.TIMEFRAME)
+                ),
+            ),
+            "open": open_,
+            "high": np.maximum(open_, close) + rng.exponential(20, periods),
+            "low": np.minimum(open_, close) - rng.exponential(20, periods),
+            "close": close,
+            "volume": rng.uniform(50, 150, periods),
         }
     )
-    exchange.load_markets()
+    candle_file = tmp_path / "candles.csv"
+    candles.to_csv(candle_file, index=False)
+
+    exchange = create_exchange(
+        config.API_KEY,
+        config.API_SECRET,
+        "paper",
+        candle_source=str(candle_file),
+        timeframe=config.TIMEFRAME,
+        warmup=config.LIMIT,
+    )
+    exchange.fetch_ticker(config.SYMBOL)  # Loads the symbol's market
     return exchange
 
 
+@pytest.fixture
+def bot_config(config):
+    """Test configuration for TradingBot runs on 1m candles around the clock"""
+    return config.model_copy(
+        update={
+            "TIMEFRAME": "1m",
+            "LIMIT": 100,
+            "TRADING_START_HOUR": 0,
+            "TRADING_END_HOUR": 24,
+        }
+    )
+
+
 @pytest.fixture
 def bot(config):
     """Create a trading bot instance for testing"""
@@ -0,0 +1,247 @@
+import asyncio
+import json
+import threading
+import time
+
+import pytest
+
+from backend.src import dashboard, dashboard_asgi
+
+
+class FakeAsyncExchange:
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.tickers = 0
+        self.closed = False
+
+    async def fetch_ticker(self, symbol):
+        self.tickers += 1
+        await asyncio.sleep(self.delay)
+        return {
+            "last": 100.0,
+            "bid": 99.5,
+            "ask": 100.5,
+            "baseVolume": 3.0,
+            "timestamp": int(time.time() * 1000),
+        }
+
+    async def create_order(self, *args):
+        raise AssertionError("no order should reach the exchange")
+
+    async def close(self):
+        self.closed = True
+
+
+async def call(app, method, path, query=b"", headers=(), body=b""):
+    scope = {
+        "type": "http",
+        "method": method,
+        "path": path,
+        "query_string": query,
+        "headers": [(k.encode(), v.encode()) for k, v in headers],
+        "http_version": "1.1",
+        "scheme": "http",
+        "server": ("127.0.0.1", 5001),
+    }
+    requests = [{"type": "http.request", "body": body}]
+    sent = []
+
+    async def receive():
+        if requests:
+            return requests.pop(0)
+        await asyncio.Event().wait()
+
+    async def send(message):
+        sent.append(message)
+
+    await app(scope, receive, send)
+    response_headers = {k.decode(): v.decode() for k, v in sent[0]["headers"]}
+    return (
+        sent[0]["status"],
+        response_headers,
+        b"".join(message.get("body", b"") for message in sent[1:]),
+    )
+
+
+@pytest.fixture
+def asgi(monkeypatch):
+    exchange = FakeAsyncExchange(delay=0.05)
+    monkeypatch.setattr(dashboard_asgi, "create_async_exchange", lambda *a: exchange)
+    monkeypatch.setattr(dashboard, "streamed_ticker", lambda: None)
+    dashboard.response_cache.invalidate()
+    yield dashboard_asgi.create_app(dashboard, max_workers=4), exchange
+    dashboard.response_cache.invalidate()
+
+
+@pytest.mark.unit
+def test_slow_upstream_calls_run_concurrently_without_threads(asgi, monkeypatch):
+    app, exchange = asgi
+    monkeypatch.setitem(dashboard.RESPONSE_CACHE_TTLS, "/api/price", 0)
+
+    async def burst():
+        threads = threading.active_count()
+        started = time.perf_counter()
+        results = await asyncio.gather(
+            *(call(app, "GET", "/api/price") for _ in range(200))
+        )
+        return (
+            results,
+            time.perf_counter() - started,
+            threading.active_count() - threads,
+        )
+
+    results, elapsed, extra_threads = asyncio.run(burst())
+
+    assert exchange.tickers == 200
+    assert {status for status, _, _ in results} == {200}
+    assert json.loads(results[0][2])["price"] == 100.0
+    assert elapsed < 2.0  # 200 x 50 ms sequentially would be 10 s
+    assert extra_threads <= 0
+
+
+@pytest.mark.unit
+def test_cached_price_is_fetched_once_and_revalidated(asgi, monkeypatch):
+    app, exchange = asgi
+    monkeypatch.setitem(dashboard.RESPONSE_CACHE_TTLS, "/api/price", 60)
+
+    async def run():
+        results = await asyncio.gather(
+            *(call(app, "GET", "/api/price") for _ in range(50))
+        )
+        etag = results[0][1]["etag"]
+        revalidated = await call(
+            app, "GET", "/api/price", headers=[("If-None-Match", etag)]
+        )
+        return results, etag, revalidated
+
+    results, etag, (status, headers, body) = asyncio.run(run())
+
+    assert exchange.tickers == 1
+    assert {result[1]["etag"] for result in results} == {etag}
+    assert (status, body, headers["etag"]) == (304, b"", etag)
+
+
+@pytest.mark.unit
+def test_other_routes_are_served_by_flask(asgi):
+    app, _ = asgi
+
+    async def run():
+        settings = await call(app, "GET", "/api/settings")
+        missing = await call(app, "GET", "/api/missing")
+        invalid = await call(
+            app,
+            "POST",
+            "/api/price/alerts",
+            headers=[("Content-Type", "application/json")],
+            body=json.dumps({"type": "sideways", "price": 1}).encode(),
+        )
+        return settings, missing, invalid
+
+    settings, missing, invalid = asyncio.run(run())
+
+    assert settings[0] == 200 and "etag" in settings[1]
+    assert missing[0] == 404
+    assert invalid[0] == 400
+    assert json.loads(invalid[2]) == {"error": "Invalid alert type"}
+
+
+@pytest.mark.unit
+def test_invalid_trades_are_rejected_before_the_exchange(asgi):
+    app, _ = asgi
+
+    async def trade(data):
+        status, _, body = await call(
+            app, "POST", "/api/trade", body=json.dumps(data).encode()
+        )
+        return status, json.loads(body)
+
+    assert asyncio.run(trade({"type": "hold", "amount": 1})) == (
+        400,
+        {"error": "Invalid trade type"},
+    )
+    status, body = asyncio.run(
+        trade({"type": "buy", "amount": 1, "order_type": "limit"})
+    )
+    assert status == 400 and "price" in body["error"].lower()
+
+
+@pytest.mark.unit
+def test_manual_trades_only_refresh_the_balance(monkeypatch):
+    metrics = dashboard.MetricsAggregator(lambda: {"total": {"USD": 1.0}})
+    metrics.refresh_balance()
+    monkeypatch.setattr(dashboard, "metrics", metrics)
+    order = {"id": "1", "price": 100.0, "status": "closed"}
+
+    body = dashboard.record_manual_trade({"type": "buy", "amount": 0.5}, order)
+
+    assert body["order"] == order
+    # The bot's trade totals and position are not touched
+    assert metrics.metrics()["total_trades"] == 0
+    assert metrics.metrics()["losing_trades"] == 0
+    assert metrics.current_position is None
+    assert metrics.balance_due()
+
+
+@pytest.mark.unit
+def test_event_stream_ends_when_the_client_leaves(asgi):
+    app, _ = asgi
+
+    async def run():
+        chunks = asyncio.Queue()
+        requests = asyncio.Queue()
+        await requests.put({"type": "http.request", "body": b""})
+        scope = {
+            "type": "http",
+            "method": "GET",
+            "path": "/api/stream",
+            "query_string": b"events=trade",
+            "headers": [],
+        }
+
+        async def send(message):
+            await chunks.put(message)
+
+        task = asyncio.ensure_future(app(scope, requests.get, send))
+        start = await chunks.get()
+        while dashboard.events.stats()["clients"] == 0:
+            await asyncio.sleep(0.001)
+        # Published from another thread, as the bot does
+        threading.Thread(
+            target=dashboard.events.publish, args=("trade", {"id": 7})
+        ).start()
+        body = await asyncio.wait_for(chunks.get(), 2)
+        await requests.put({"type": "http.disconnect"})
+        await asyncio.wait_for(task, 2)
+        return start, body
+
+    start, body = asyncio.run(run())
+
+    assert start["status"] == 200
+    assert (b"content-type", b"text/event-stream") in start["headers"]
+    assert body["body"] == b'event: trade\ndata: {"id":7}\n\n'
+    assert dashboard.events.stats()["clients"] == 0
+
+
+@pytest.mark.unit
+def test_shutdown_closes_the_async_exchange(asgi):
+    app, exchange = asgi
+
+    async def run():
+        await call(app, "GET", "/api/price")
+        messages = [{"type": "lifespan.startup"}, {"type": "lifespan.shutdown"}]
+        sent = []
+
+        async def receive():
+            return messages.pop(0)
+
+        async def send(message):
+            sent.append(message["type"])
+
+        await app({"type": "lifespan"}, receive, send)
+        return sent
+
+    assert asyncio.run(run()) == [
+        "lifespan.startup.complete",
+        "lifespan.shutdown.complete",
+    ]
+    assert exchange.closed
@@ -0,0 +1,187 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from backend.src.backtest import (
+    StreamingBacktest,
+    backtest_dataframe,
+    backtest_stream,
+    entry_signals,
+    run_backtest,
+    simulate_trades,
+    simulate_trades_loop,
+)
+from backend.src.modules.indicators import calculate_indicators
+from backend.src.modules.ohlcv_store import OHLCVStore
+
+
+def make_ohlcv(seed: int, periods: int = 300) -> pd.DataFrame:
+    """Random-walk OHLCV data with valid bars: low <= open, close <= high"""
+    rng = np.random.default_rng(seed)
+    close = rng.standard_normal(periods).cumsum() + 100
+    open_ = np.concatenate(([100.0], close[:-1])) + 0.2 * rng.standard_normal(periods)
+    body_high = np.maximum(open_, close)
+    body_low = np.minimum(open_, close)
+    return pd.DataFrame(
+        {
+            "timestamp": pd.date_range(start="2024-01-01", periods=periods, freq="h"),
+            "open": open_,
+            "high": body_high + rng.exponential(0.5, periods),
+            "low": body_low - rng.exponential(0.5, periods),
+            "close": close,
+            "volume": rng.integers(1000, 10000, periods),
+        }
+    )
+
+
+@pytest.fixture
+def strategy_config(config):
+    return config.model_copy(
+        update={
+            "LOOKBACK": 5,
+            "STOP_LOSS_PERCENT": 2.0,
+            "TAKE_PROFIT_PERCENT": 2.0,
+            "RISK_PER_TRADE": 0.02,
+        }
+    )
+
+
+def with_indicators(df, cfg):
+    return calculate_indicators(
+        df,
+        ema_length=cfg.EMA_LENGTH,
+        volume_multiplier=cfg.VOLUME_MULTIPLIER,
+        trading_start_hour=cfg.TRADING_START_HOUR,
+        trading_end_hour=cfg.TRADING_END_HOUR,
+    )
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("seed", [1, 7, 42])
+@pytest.mark.parametrize("hold_bars", [0, 1, 5])
+@pytest.mark.parametrize("lookback", [2, 5])
+def test_vectorized_matches_loop(strategy_config, seed, hold_bars, lookback):
+    cfg = strategy_config.model_copy(update={"LOOKBACK": lookback})
+    df = with_indicators(make_ohlcv(seed), cfg)
+
+    expected = simulate_trades_loop(df, cfg, 10000.0, hold_bars)
+    actual = simulate_trades(df, cfg, 10000.0, hold_bars)
+
+    assert expected, "fixture should produce trades"
+    pd.testing.assert_frame_equal(pd.DataFrame(actual), pd.DataFrame(expected))
+
+
+@pytest.mark.unit
+def test_fixture_bars_are_valid_and_exercise_every_exit(strategy_config):
+    df = make_ohlcv(1)
+    assert (df["high"] >= df[["open", "close"]].max(axis=1)).all()
+    assert (df["low"] <= df[["open", "close"]].min(axis=1)).all()
+
+    reasons = {
+        trade["reason"]
+        for seed in (1, 7, 42)
+        for trade in simulate_trades(
+            with_indicators(make_ohlcv(seed), strategy_config), strategy_config
+        )
+    }
+    assert reasons == {"SL", "TP", "TIME"}
+
+
+@pytest.mark.unit
+def test_vectorized_matches_loop_on_sample_fixture(strategy_config, sample_ohlcv_data):
+    df = sample_ohlcv_data.drop(columns=["timestamp"]).rename(
+        columns={"datetime": "timestamp"}
+    )
+    df = with_indicators(df, strategy_config)
+
+    expected = simulate_trades_loop(df, strategy_config)
+    actual = simulate_trades(df, strategy_config)
+
+    pd.testing.assert_frame_equal(pd.DataFrame(actual), pd.DataFrame(expected))
+
+
+@pytest.mark.unit
+def test_entry_signals_skip_warmup_and_last_bar(strategy_config):
+    df = make_ohlcv(3).assign(ema=0.0, high_volume=True, within_trading_hours=True)
+    # Every close breaks above all earlier highs
+    df["close"] = df["high"] = 1000.0 + np.arange(len(df))
+
+    signals = entry_signals(df, strategy_config.LOOKBACK)
+
+    # The first bar with a full FVG window of earlier bars is LOOKBACK + 2
+    assert not signals[: strategy_config.LOOKBACK + 2].any()
+    assert not signals[-1]
+    assert signals[strategy_config.LOOKBACK + 2 : -1].all()
+
+
+@pytest.mark.unit
+def test_simulate_trades_requires_positive_stop_loss(strategy_config):
+    cfg = strategy_config.model_copy(update={"STOP_LOSS_PERCENT": 0})
+    with pytest.raises(ValueError):
+        simulate_trades(make_ohlcv(1), cfg)
+
+
+def chunked(df, size):
+    return (df.iloc[i : i + size] for i in range(0, len(df), size))
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("chunk_size", [3, 37, 1000])
+@pytest.mark.parametrize("hold_bars", [0, 1, 5])
+@pytest.mark.parametrize("seed", [1, 42])
+def test_streaming_matches_in_memory(strategy_config, seed, hold_bars, chunk_size):
+    df = make_ohlcv(seed, periods=400)
+
+    expected = backtest_dataframe(df, strategy_config, 10000.0, hold_bars)
+    actual = backtest_stream(
+        chunked(df, chunk_size), strategy_config, 10000.0, hold_bars
+    )
+
+    assert expected, "fixture should produce trades"
+    pd.testing.assert_frame_equal(pd.DataFrame(actual), pd.DataFrame(expected))
+
+
+@pytest.mark.unit
+def test_streaming_keeps_bounded_tail(strategy_config):
+    df = make_ohlcv(7, periods=2000)
+    backtest = StreamingBacktest(strategy_config, hold_bars=3)
+    for chunk in chunked(df, 100):
+        backtest.feed(chunk)
+        assert len(backtest._tail) <= strategy_config.LOOKBACK + 3 + 100
+
+    assert backtest.rows == len(df)
+    assert backtest.indicators.bars == len(df)
+
+
+@pytest.mark.unit
+def test_run_backtest_inputs_produce_the_same_trades(
+    strategy_config, tmp_path, monkeypatch
+):
+    monkeypatch.chdir(tmp_path)
+    config_file = tmp_path / "config.json"
+    config_file.write_text(
+        strategy_config.model_copy(
+            update={"SYMBOL": "BTC/USD", "TIMEFRAME": "1h"}
+        ).model_dump_json(exclude={"API_KEY", "API_SECRET"})
+    )
+    # About three months of hourly bars, so the store has several partitions
+    df = make_ohlcv(3, periods=2000)
+    df["volume"] = df["volume"].astype(float)
+    data_file = tmp_path / "ohlcv.csv"
+    df.to_csv(data_file, index=False)
+    store_dir = tmp_path / "store"
+    OHLCVStore(str(store_dir)).write("BTC/USD", "1h", df)
+
+    runs = {
+        "csv": run_backtest(str(data_file), str(config_file)),
+        "csv chunked": run_backtest(str(data_file), str(config_file), chunksize=150),
+        "store": run_backtest(None, str(config_file), store_dir=str(store_dir)),
+        "store chunked": run_backtest(
+            None, str(config_file), store_dir=str(store_dir), chunksize=150
+        ),
+    }
+
+    expected = runs.pop("csv")
+    assert len(expected) > 0, "fixture should produce trades"
+    for name, results in runs.items():
+        pd.testing.assert_frame_equal(results, expected, obj=name)
@@ -0,0 +1,153 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from backend.src.modules.candle_cache import CandleCache
+from backend.src.tradingbot import TradingBot
+
+MINUTE_MS = 60 * 1000
+
+
+class FakeExchange:
+    """Minute candles up to `now`, whose last bar is still forming"""
+
+    def __init__(self, candles: int = 300):
+        self.end = candles
+        self.forming_close = 0.0
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def candle(self, i):
+        close = float(i) + (self.forming_close if i == self.end - 1 else 0.0)
+        return [i * MINUTE_MS, float(i), i + 1.0, i - 1.0, close, 5.0]
+
+    def fetch_ohlcv(self, symbol, timeframe="1m", since=None, limit=None):
+        with self._lock:
+            self.calls.append({"since": since, "limit": limit})
+        first = 0 if since is None else since // MINUTE_MS
+        if since is None and limit:
+            first = max(self.end - limit, 0)
+        last = self.end if limit is None else min(self.end, first + limit)
+        return [self.candle(i) for i in range(first, last)]
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def exchange():
+    return FakeExchange()
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def cache(exchange, clock):
+    return CandleCache(exchange, refresh_interval=5.0, clock=clock)
+
+
+def expected_rows(exchange, limit):
+    return [exchange.candle(i) for i in range(exchange.end - limit, exchange.end)]
+
+
+@pytest.mark.unit
+def test_first_request_loads_full_window(cache, exchange):
+    df = cache.get("BTC/USD", "1m", 100)
+
+    assert df.values.tolist() == expected_rows(exchange, 100)
+    assert exchange.calls == [{"since": None, "limit": 100}]
+
+
+@pytest.mark.unit
+def test_requests_within_refresh_interval_hit_memory(cache, exchange, clock):
+    cache.get("BTC/USD", "1m", 100)
+    for _ in range(50):
+        clock.now += 0.05
+        cache.get("BTC/USD", "1m", 100)
+
+    assert len(exchange.calls) == 1
+    assert cache.hits == 50
+
+
+@pytest.mark.unit
+def test_polling_faster_than_refresh_interval_still_refreshes(exchange, clock):
+    cache = CandleCache(exchange, refresh_interval=1.0, clock=clock)
+    cache.get("BTC/USD", "1m", 100)
+    for _ in range(20):
+        clock.now += 0.5
+        exchange.end += 1
+        df = cache.get("BTC/USD", "1m", 100)
+
+    assert cache.incremental_fetches == 10
+    assert cache.hits == 10
+    assert df.values.tolist() == expected_rows(exchange, 100)
+
+
+@pytest.mark.unit
+def test_refresh_fetches_only_new_candles(cache, exchange, clock):
+    cache.get("BTC/USD", "1m", 100)
+    exchange.forming_close = 0.5
+    exchange.end += 3
+    clock.now += 10
+
+    df = cache.get("BTC/USD", "1m", 100)
+
+    assert exchange.calls[-1]["since"] == 299 * MINUTE_MS
+    assert df.values.tolist() == expected_rows(exchange, 100)
+    assert df["close"].iloc[-1] == 302.5
+    assert cache.incremental_fetches == 1
+
+
+@pytest.mark.unit
+def test_forming_bar_replaced_in_place(cache, exchange, clock):
+    cache.get("BTC/USD", "1m", 100)
+    exchange.forming_close = 0.25
+    clock.now += 10
+
+    df = cache.get("BTC/USD", "1m", 100)
+
+    assert len(df) == 100
+    assert df["close"].iloc[-1] == 299.25
+    assert df["timestamp"].is_unique
+
+
+@pytest.mark.unit
+def test_larger_limit_reloads(cache, exchange):
+    cache.get("BTC/USD", "1m", 50)
+    df = cache.get("BTC/USD", "1m", 200)
+
+    assert len(df) == 200
+    assert exchange.calls[-1] == {"since": None, "limit": 200}
+    assert len(cache.get("BTC/USD", "1m", 20)) == 20
+
+
+@pytest.mark.unit
+def test_concurrent_readers_share_one_fetch(exchange):
+    cache = CandleCache(exchange, refresh_interval=60)
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        frames = list(pool.map(lambda _: cache.get("BTC/USD", "1m", 100), range(64)))
+
+    assert len(exchange.calls) == 1
+    assert all(len(df) == 100 for df in frames)
+
+
+@pytest.mark.unit
+def test_trading_bot_reads_shared_cache(config, exchange):
+    cache = CandleCache(exchange, refresh_interval=60)
+    bot = TradingBot(config, candle_cache=cache)
+
+    df = bot.fetch_candles(limit=30)
+    cache.get(config.SYMBOL, config.TIMEFRAME, 30)
+
+    assert len(df) == 30
+    assert str(df["timestamp"].dt.tz) == "UTC"
+    assert len(exchange.calls) == 1
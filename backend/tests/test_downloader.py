@@ -0,0 +1,208 @@
+import json
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from backend.src.modules import downloader as downloader_module
+from backend.src.modules.downloader import OHLCVDownloader, to_ms
+from backend.src.modules.ohlcv_store import OHLCVStore
+
+HOUR_MS = 3600 * 1000
+START = to_ms("2024-01-01")
+
+
+class FakeExchange:
+    """Serves deterministic hourly candles through fetch_ohlcv"""
+
+    id = "fake"
+    rateLimit = 0
+
+    def __init__(self, candles: int = 500, fail_after=None):
+        self.candles = candles
+        self.fail_after = fail_after
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def candle(self, symbol, ts):
+        base = sum(map(ord, symbol)) + (ts - START) / HOUR_MS
+        return [ts, base, base + 2, base - 2, base + 1, 10.0]
+
+    def fetch_ohlcv(self, symbol, timeframe="1h", since=None, limit=None):
+        with self._lock:
+            self.calls.append((symbol, timeframe, since, limit))
+            if self.fail_after is not None and len(self.calls) > self.fail_after:
+                raise ConnectionError("exchange unavailable")
+        first = max(since, START)
+        first += -(first - START) % HOUR_MS
+        end = START + self.candles * HOUR_MS
+        return [
+            self.candle(symbol, ts) for ts in range(first, end, HOUR_MS)[: limit or 100]
+        ]
+
+
+@pytest.fixture
+def store(tmp_path):
+    return OHLCVStore(str(tmp_path / "store"))
+
+
+def make_downloader(exchange, store, **kwargs):
+    kwargs.setdefault("page_limit", 50)
+    kwargs.setdefault("retry_delay", 0)
+    return OHLCVDownloader(exchange, store, **kwargs)
+
+
+@pytest.mark.unit
+def test_download_pages_through_history(store):
+    exchange = FakeExchange(candles=500)
+    downloader = make_downloader(exchange, store)
+
+    totals = downloader.download(["BTC/USD", "ETH/USD"], ["1h"], START)
+
+    assert totals == {("BTC/USD", "1h"): 500, ("ETH/USD", "1h"): 500}
+    df = store.read("ETH/USD", "1h")
+    assert len(df) == 500
+    assert df["timestamp"].is_monotonic_increasing
+    assert df["timestamp"].iloc[0] == pd.Timestamp("2024-01-01")
+    assert df["close"].iloc[-1] == exchange.candle("ETH/USD", START + 499 * HOUR_MS)[4]
+
+
+@pytest.mark.unit
+def test_until_is_exclusive(store):
+    downloader = make_downloader(FakeExchange(candles=500), store)
+    downloader.download(["BTC/USD"], ["1h"], START, START + 120 * HOUR_MS)
+
+    assert len(store.read("BTC/USD", "1h")) == 120
+
+
+@pytest.mark.unit
+def test_segments_split_range_without_gaps(store):
+    exchange = FakeExchange(candles=500)
+    downloader = make_downloader(exchange, store, max_workers=4)
+
+    downloader.download(["BTC/USD"], ["1h"], START, START + 500 * HOUR_MS, segments=4)
+
+    segment_starts = {since for _, _, since, _ in exchange.calls}
+    assert len(downloader.split(START, START + 500 * HOUR_MS, "1h", 4)) == 4
+    assert START + 125 * HOUR_MS in segment_starts
+    df = store.read("BTC/USD", "1h")
+    assert len(df) == 500
+    assert df["timestamp"].diff().dropna().eq(pd.Timedelta(hours=1)).all()
+
+
+@pytest.mark.unit
+def test_resume_from_checkpoint(store, tmp_path):
+    checkpoint = str(tmp_path / "checkpoint.json")
+    failing = FakeExchange(candles=500, fail_after=4)
+    downloader = make_downloader(
+        failing, store, checkpoint_file=checkpoint, max_attempts=1
+    )
+    with pytest.raises(ConnectionError):
+        downloader.download(["BTC/USD"], ["1h"], START)
+
+    with open(checkpoint, "r", encoding="utf-8") as f:
+        saved = json.load(f)
+    assert saved[f"BTC/USD|1h|{START}"] == START + 200 * HOUR_MS
+    assert len(store.read("BTC/USD", "1h")) == 200
+
+    exchange = FakeExchange(candles=500)
+    resumed = make_downloader(exchange, store, checkpoint_file=checkpoint)
+    resumed.download(["BTC/USD"], ["1h"], START)
+
+    assert exchange.calls[0][2] == START + 200 * HOUR_MS
+    assert len(store.read("BTC/USD", "1h")) == 500
+
+
+@pytest.mark.unit
+def test_every_segment_resumes_when_until_defaults_to_now(store, tmp_path, monkeypatch):
+    checkpoint = str(tmp_path / "checkpoint.json")
+    now = {"ms": START + 400 * HOUR_MS}
+    monkeypatch.setattr(downloader_module.time, "time", lambda: now["ms"] / 1000)
+    # Three 100-candle segments take two pages each, the fourth fails
+    failing = FakeExchange(candles=500, fail_after=6)
+    downloader = make_downloader(
+        failing, store, checkpoint_file=checkpoint, max_attempts=1, max_workers=1
+    )
+    with pytest.raises(ConnectionError):
+        downloader.download(["BTC/USD"], ["1h"], START, segments=4)
+    assert len(store.read("BTC/USD", "1h")) == 300
+
+    now["ms"] = START + 450 * HOUR_MS
+    exchange = FakeExchange(candles=500)
+    resumed = make_downloader(exchange, store, checkpoint_file=checkpoint)
+    resumed.download(["BTC/USD"], ["1h"], START, segments=4)
+
+    # The finished segments are not fetched again, the last one stretches
+    assert sorted(since for _, _, since, _ in exchange.calls) == [
+        START + 300 * HOUR_MS,
+        START + 350 * HOUR_MS,
+        START + 400 * HOUR_MS,
+    ]
+    df = store.read("BTC/USD", "1h")
+    assert len(df) == 450
+    assert df["timestamp"].diff().dropna().eq(pd.Timedelta(hours=1)).all()
+
+
+@pytest.mark.unit
+def test_page_without_new_candles_does_not_end_the_range(store):
+    exchange = FakeExchange(candles=300)
+    original = exchange.fetch_ohlcv
+    hole = range(START + 100 * HOUR_MS, START + 200 * HOUR_MS)
+
+    def with_hole(symbol, timeframe="1h", since=None, limit=None):
+        if since in hole:
+            # Some exchanges answer with the last candle before a gap
+            return [exchange.candle(symbol, hole.start - HOUR_MS)]
+        rows = original(symbol, timeframe, since, limit)
+        return [row for row in rows if row[0] not in hole]
+
+    exchange.fetch_ohlcv = with_hole
+    downloader = make_downloader(exchange, store)
+    downloader.download(["BTC/USD"], ["1h"], START, START + 300 * HOUR_MS)
+
+    df = store.read("BTC/USD", "1h")
+    assert len(df) == 200
+    assert df["timestamp"].iloc[-1] == pd.Timestamp("2024-01-13 11:00")
+    # The hole costs one request per page, not one per candle
+    assert downloader.requests == 6
+
+
+@pytest.mark.unit
+def test_to_ms_keeps_numpy_integers_as_milliseconds():
+    assert to_ms(np.int64(START)) == START
+    assert type(to_ms(np.int64(START))) is int
+    assert to_ms("2024-01-01") == 1704067200000
+
+
+@pytest.mark.unit
+def test_retries_transient_errors(store):
+    exchange = FakeExchange(candles=60)
+    original = exchange.fetch_ohlcv
+    failures = iter([True, False, False, False])
+
+    def flaky(*args, **kwargs):
+        if next(failures, False):
+            raise ConnectionError("timeout")
+        return original(*args, **kwargs)
+
+    exchange.fetch_ohlcv = flaky
+    downloader = make_downloader(exchange, store)
+    downloader.download(["BTC/USD"], ["1h"], START)
+
+    assert len(store.read("BTC/USD", "1h")) == 60
+
+
+@pytest.mark.unit
+def test_requests_respect_rate(store):
+    downloader = make_downloader(
+        FakeExchange(candles=200), store, requests_per_second=100, max_workers=4
+    )
+    started = time.monotonic()
+    downloader.download(["A/USD", "B/USD"], ["1h"], START)
+    elapsed = time.monotonic() - started
+
+    # 2 symbols x (4 full pages + 1 empty page) spaced at least 10 ms apart
+    assert downloader.requests == 10
+    assert elapsed >= 0.09
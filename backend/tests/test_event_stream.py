@@ -0,0 +1,118 @@
+import json
+import threading
+
+import pytest
+
+from backend.src.modules.event_stream import KEEP_ALIVE, EventHub, encode_event
+from backend.src.modules.metrics import MetricsAggregator
+
+
+def decode(chunk: bytes) -> list[tuple[str, object]]:
+    messages = []
+    for block in chunk.decode().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.splitlines() if line)
+        if "event" in lines:
+            messages.append((lines["event"], json.loads(lines["data"])))
+    return messages
+
+
+@pytest.mark.unit
+def test_event_is_encoded_once_for_all_clients():
+    hub = EventHub()
+    clients = [hub.connect() for _ in range(300)]
+
+    hub.publish("trade", {"pnl": 1.5})
+
+    payloads = [client.take(0) for client in clients]
+    assert payloads[0] == [encode_event("trade", {"pnl": 1.5})]
+    assert all(payload[0] is payloads[0][0] for payload in payloads)
+    assert hub.stats()["delivered"] == 300
+
+
+@pytest.mark.unit
+def test_slow_client_gets_coalesced_updates():
+    hub = EventHub(max_backlog=3)
+    client = hub.connect()
+
+    for i in range(100):
+        hub.publish("price", {"price": 100 + i}, key="price")
+    for i in range(5):
+        hub.publish("trade", {"id": i})
+    hub.publish("metrics", {"total_trades": 1, "total_pnl": 5.0}, key="m", merge=True)
+    hub.publish("metrics", {"total_trades": 2, "total_pnl": 5.0}, key="m", merge=True)
+
+    messages = decode(b"".join(client.take(0)))
+    assert messages == [
+        ("trade", {"id": 2}),
+        ("trade", {"id": 3}),
+        ("trade", {"id": 4}),
+        ("price", {"price": 199}),
+        ("metrics", {"total_trades": 2, "total_pnl": 5.0}),
+    ]
+    assert client.coalesced == 100
+    assert client.dropped == 2
+
+
+@pytest.mark.unit
+def test_new_client_is_primed_and_receives_only_deltas():
+    hub = EventHub()
+    hub.publish("metrics", {"total_trades": 1, "win_rate": 1.0}, key="m", merge=True)
+    hub.publish("price", {"price": 10}, key="price")
+
+    client = hub.connect(["metrics"])
+    assert decode(b"".join(client.take(0))) == [
+        ("metrics", {"total_trades": 1, "win_rate": 1.0})
+    ]
+
+    hub.publish("metrics", {"total_trades": 1, "win_rate": 1.0}, key="m", merge=True)
+    hub.publish("price", {"price": 11}, key="price")
+    assert client.take(0) == []
+    hub.publish("metrics", {"total_trades": 2, "win_rate": 0.5}, key="m", merge=True)
+    assert decode(b"".join(client.take(0))) == [
+        ("metrics", {"total_trades": 2, "win_rate": 0.5})
+    ]
+
+
+@pytest.mark.unit
+def test_stream_sends_keep_alive_and_ends_on_close():
+    hub = EventHub(keep_alive=0.01)
+    client = hub.connect()
+    stream = hub.stream(client)
+
+    assert next(stream) == KEEP_ALIVE
+    hub.keep_alive = 2
+    threading.Timer(0.01, hub.publish, args=("trade", {"id": 1})).start()
+    assert decode(next(stream)) == [("trade", {"id": 1})]
+    hub.close()
+    assert list(stream) in ([], [KEEP_ALIVE])
+    assert hub.stats()["clients"] == 0
+
+
+@pytest.mark.unit
+def test_dashboard_streams_metrics_and_trades():
+    from backend.src import dashboard
+
+    metrics = MetricsAggregator()
+    metrics.add_listener(dashboard.publish_metrics_event)
+    metrics.record_trade({"pnl": 3.0})
+    response = dashboard.app.test_client().get(
+        "/api/stream?events=trade,metrics", buffered=False
+    )
+    assert response.mimetype == "text/event-stream"
+    chunks = iter(response.response)
+
+    # The current metrics arrive on connect, then only what changes
+    first = decode(next(chunks))
+    metrics.record_trade({"pnl": -2.0})
+    second = decode(next(chunks))
+    response.close()
+
+    assert [event for event, _ in first] == ["metrics"]
+    assert first[0][1]["total_pnl"] == pytest.approx(3.0)
+    assert ("trade", {"pnl": -2.0}) in second
+    assert ("metrics", {"total_pnl": 1.0, "losing_trades": 1}) in [
+        (event, {k: data[k] for k in ("total_pnl", "losing_trades")})
+        for event, data in second
+        if event == "metrics"
+    ]
+    assert dashboard.events.stats()["clients"] == 0
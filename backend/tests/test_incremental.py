@@ -0,0 +1,77 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from backend.src.modules.incremental import INDICATOR_COLUMNS, IncrementalIndicators
+from backend.src.modules.indicators import calculate_indicators
+from backend.tests.test_backtest import make_ohlcv
+
+INDICATOR_ARGS = {
+    "ema_length": 20,
+    "volume_multiplier": 1.5,
+    "trading_start_hour": 9,
+    "trading_end_hour": 17,
+}
+
+
+def assert_columns_identical(actual: pd.DataFrame, expected: pd.DataFrame):
+    for column in INDICATOR_COLUMNS:
+        np.testing.assert_array_equal(
+            actual[column].to_numpy(dtype=float),
+            expected[column].to_numpy(dtype=float),
+            err_msg=column,
+        )
+
+
+@pytest.mark.indicators
+@pytest.mark.unit
+@pytest.mark.parametrize("seed", [0, 1, 2])
+@pytest.mark.parametrize("split", [30, 150, 399])
+def test_seed_then_stream_matches_batch(seed, split):
+    df = make_ohlcv(seed, periods=400)
+    expected = calculate_indicators(df, **INDICATOR_ARGS)
+
+    engine = IncrementalIndicators(**INDICATOR_ARGS)
+    history = engine.update_frame(df.iloc[:split])
+    streamed = [
+        engine.update(row.timestamp, row.high, row.low, row.close, row.volume)
+        for row in df.iloc[split:].itertuples()
+    ]
+    actual = pd.concat([history, pd.DataFrame(streamed, index=df.index[split:])])
+
+    assert_columns_identical(actual, expected)
+
+
+@pytest.mark.indicators
+@pytest.mark.unit
+def test_float_volume_matches_batch():
+    df = make_ohlcv(4, periods=300)
+    df["volume"] = np.random.default_rng(4).random(300) * 1e6
+
+    actual = IncrementalIndicators(**INDICATOR_ARGS).update_frame(df)
+
+    assert_columns_identical(actual, calculate_indicators(df, **INDICATOR_ARGS))
+
+
+@pytest.mark.indicators
+@pytest.mark.unit
+def test_warmup_values():
+    df = make_ohlcv(5, periods=40)
+    engine = IncrementalIndicators(**INDICATOR_ARGS, window=14)
+    result = engine.update_frame(df)
+
+    assert result["ema"].iloc[:19].isna().all()
+    assert not np.isnan(result["ema"].iloc[19])
+    assert (result["atr"].iloc[:13] == 0).all()
+    assert result["atr"].iloc[13] > 0
+    assert (result["adx"].iloc[:27] == 0).all()
+    assert result["adx"].iloc[27] > 0
+    assert engine.bars == 40
+    assert engine.latest["adx"] == result["adx"].iloc[-1]
+
+
+@pytest.mark.unit
+def test_from_config(config):
+    engine = IncrementalIndicators.from_config(config)
+    assert engine.ema_length == config.EMA_LENGTH
+    assert engine.volume_multiplier == config.VOLUME_MULTIPLIER
@@ -0,0 +1,97 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import backend.src.modules.indicators as indicators
+from backend.src.modules.indicator_cache import (
+    IndicatorCache,
+    cached_calculate_indicators,
+    data_fingerprint,
+)
+from backend.tests.test_backtest import make_ohlcv
+
+INDICATOR_ARGS = {
+    "ema_length": 20,
+    "volume_multiplier": 1.5,
+    "trading_start_hour": 9,
+    "trading_end_hour": 17,
+}
+
+
+@pytest.fixture
+def sample_data():
+    return make_ohlcv(11, periods=200)
+
+
+@pytest.mark.indicators
+@pytest.mark.unit
+def test_cached_output_matches_calculate_indicators(sample_data):
+    cache = IndicatorCache()
+    expected = indicators.calculate_indicators(sample_data, **INDICATOR_ARGS)
+
+    first = cached_calculate_indicators(sample_data, **INDICATOR_ARGS, cache=cache)
+    second = cached_calculate_indicators(sample_data, **INDICATOR_ARGS, cache=cache)
+
+    pd.testing.assert_frame_equal(first, expected)
+    pd.testing.assert_frame_equal(second, expected)
+    assert cache.misses == 7
+    assert cache.hits == 7
+
+
+@pytest.mark.indicators
+@pytest.mark.unit
+def test_only_changed_parameters_recompute(sample_data):
+    cache = IndicatorCache()
+    cached_calculate_indicators(sample_data, **INDICATOR_ARGS, cache=cache)
+
+    args = dict(INDICATOR_ARGS, volume_multiplier=2.0)
+    result = cached_calculate_indicators(sample_data, **args, cache=cache)
+
+    # Only high_volume depends on volume_multiplier
+    assert cache.misses == 8
+    pd.testing.assert_frame_equal(
+        result, indicators.calculate_indicators(sample_data, **args)
+    )
+
+
+@pytest.mark.unit
+def test_fingerprint_tracks_ohlcv_only(sample_data):
+    fingerprint = data_fingerprint(sample_data)
+    assert data_fingerprint(sample_data.assign(extra=1)) == fingerprint
+
+    changed = sample_data.copy()
+    changed.loc[5, "close"] += 1e-9
+    assert data_fingerprint(changed) != fingerprint
+
+
+@pytest.mark.unit
+def test_memory_tier_evicts_least_recently_used():
+    cache = IndicatorCache(max_bytes=3 * 800)
+    for name in "abc":
+        cache.put(name, np.zeros(100))
+    cache.get("a")
+    cache.put("d", np.zeros(100))
+
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+    assert len(cache) == 3
+    assert cache.nbytes <= cache.max_bytes
+
+
+@pytest.mark.unit
+def test_disk_tier_survives_new_instance(tmp_path):
+    cache = IndicatorCache(cache_dir=str(tmp_path))
+    cache.put("k", np.arange(10.0))
+
+    fresh = IndicatorCache(cache_dir=str(tmp_path))
+    np.testing.assert_array_equal(fresh.get("k"), np.arange(10.0))
+    assert fresh.disk_hits == 1
+
+
+@pytest.mark.unit
+def test_disk_tier_trimmed_by_size(tmp_path):
+    cache = IndicatorCache(cache_dir=str(tmp_path), max_disk_bytes=2500)
+    for i in range(5):
+        cache.put(str(i), np.zeros(100))
+
+    assert sum(p.stat().st_size for p in tmp_path.glob("*.npy")) <= 2500
@@ -3,9 +3,13 @@ import pandas as pd
 import pytest
 
 from backend.src.modules.indicators import (
+    add_fvg_columns,
     calculate_ema,
     calculate_indicators,
     calculate_rsi,
+    detect_fvg,
+    fvg_breakout,
+    fvg_entry_signals,
 )
 
 
@@ -70,3 +74,53 @@ class TestIndicators:
         assert len(rsi) == len(sample_data)
         assert np.all((rsi >= 0) & (rsi <= 100) | np.isnan(rsi))
         assert all(0 <= x <= 100 for x in rsi if not np.isnan(x))
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize("lookback", [1, 3, 5])
+    def test_fvg_columns_match_window_detection(self, sample_data, lookback):
+        """Rolling FVG columns equal detect_fvg on every prefix"""
+        result = add_fvg_columns(sample_data, lookback)
+
+        for i in range(len(sample_data)):
+            low, high = detect_fvg(sample_data.iloc[: i + 1], lookback)
+            if np.isnan(low):
+                assert np.isnan(result["fvg_low"].iat[i])
+                assert np.isnan(result["fvg_high"].iat[i])
+            else:
+                assert result["fvg_low"].iat[i] == low
+                assert result["fvg_high"].iat[i] == high
+
+    @pytest.mark.unit
+    def test_detect_fvg_uses_precomputed_columns(self, sample_data):
+        """detect_fvg reads the last row of the FVG columns"""
+        result = add_fvg_columns(sample_data, 3)
+        result.loc[result.index[-1], ["fvg_low", "fvg_high"]] = [1.0, 2.0]
+
+        assert detect_fvg(result, 3, bullish=True) == (1.0, 2.0)
+        assert detect_fvg(result, 3, bullish=False) == (2.0, 1.0)
+        # A different lookback falls back to the window scan
+        assert detect_fvg(result, 4) == detect_fvg(sample_data, 4)
+
+    @pytest.mark.unit
+    def test_fvg_breakout_requires_all_filters(self):
+        assert fvg_breakout(105.0, 104.0, 100.0, True, True)
+        assert not fvg_breakout(103.0, 104.0, 100.0, True, True)
+        assert not fvg_breakout(105.0, 104.0, 100.0, False, True)
+        assert not fvg_breakout(105.0, 104.0, 106.0, True, True)
+        assert not fvg_breakout(105.0, 104.0, 100.0, True, False)
+        assert not fvg_breakout(105.0, float("nan"), 100.0, True, True)
+        assert not fvg_breakout(105.0, 104.0, float("nan"), True, True)
+
+    @pytest.mark.unit
+    def test_entry_signals_use_the_prior_bars_window(self, sample_data):
+        """A bar is judged against the FVG high of the bars before it"""
+        df = sample_data.assign(ema=0.0, high_volume=True, within_trading_hours=True)
+        df["high"] = df[["open", "high", "low", "close"]].max(axis=1)
+        df.loc[50, ["close", "high"]] = df["high"].iloc[44:50].max() + [1.0, 2.0]
+
+        signals = fvg_entry_signals(df, 4)
+
+        assert signals[50]
+        assert not signals[:6].any()
+        prior_high = df["high"].rolling(6).max().shift(1)
+        np.testing.assert_array_equal(signals, df["close"] > prior_high)
@@ -0,0 +1,136 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from backend.src.modules import kernels
+from backend.src.modules.indicators import (
+    _adx,
+    _atr,
+    _avg_volume,
+    _ema,
+    _rsi,
+    calculate_indicators,
+)
+from backend.tests.test_backtest import make_ohlcv
+
+
+def assert_parity(actual, expected):
+    expected = np.asarray(expected, dtype=float)
+    np.testing.assert_array_equal(np.isnan(actual), np.isnan(expected))
+    np.testing.assert_allclose(actual, expected, rtol=1e-9, atol=1e-9)
+
+
+@pytest.fixture(params=[1, 7, 42])
+def ohlcv(request):
+    return make_ohlcv(request.param, periods=2000)
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("window", [3, 14, 50])
+def test_ema_matches_ta(ohlcv, window):
+    assert_parity(kernels.ema(ohlcv["close"], window), _ema(ohlcv, window))
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("window", [5, 14])
+def test_atr_matches_ta(ohlcv, window):
+    actual = kernels.atr(ohlcv["high"], ohlcv["low"], ohlcv["close"], window)
+    assert_parity(actual, _atr(ohlcv, window))
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("window", [5, 14])
+def test_rsi_matches_ta(ohlcv, window):
+    assert_parity(kernels.rsi(ohlcv["close"], window), _rsi(ohlcv, window))
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("window", [5, 14])
+def test_adx_matches_ta(ohlcv, window):
+    actual = kernels.adx(ohlcv["high"], ohlcv["low"], ohlcv["close"], window)
+    assert_parity(actual, _adx(ohlcv, window))
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("window", [1, 9, 20])
+def test_rolling_mean_matches_pandas(ohlcv, window):
+    actual = kernels.rolling_mean(ohlcv["volume"], window)
+    assert_parity(actual, _avg_volume(ohlcv, window))
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("window", [1, 9, 20])
+def test_rolling_mean_skips_nans_like_pandas(ohlcv, window):
+    volume = ohlcv["volume"].astype(float)
+    volume.iloc[[0, 100, 500, 501, 502]] = np.nan
+    volume.iloc[1000:1030] = np.nan
+
+    actual = kernels.rolling_mean(volume, window)
+    assert_parity(actual, volume.rolling(window=window, min_periods=1).mean())
+    # Windows past the gaps are unaffected
+    assert_parity(actual[1100:], _avg_volume(ohlcv, window)[1100:])
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("window", [3, 14, 50])
+def test_ema_and_rsi_skip_nans_like_ta(ohlcv, window):
+    df = ohlcv.copy()
+    df.loc[[0, 100, 500, 501, 502], "close"] = np.nan
+    df.loc[1000:1029, "close"] = np.nan
+
+    assert_parity(kernels.ema(df["close"], window), _ema(df, window))
+    assert_parity(kernels.rsi(df["close"], window), _rsi(df, window))
+    assert not np.isnan(kernels.ema(df["close"], window)[-1])
+
+
+@pytest.mark.unit
+def test_short_series_warmup():
+    df = make_ohlcv(3, periods=30)
+    assert_parity(kernels.adx(df["high"], df["low"], df["close"]), _adx(df, 14))
+    assert_parity(kernels.atr(df["high"], df["low"], df["close"]), _atr(df, 14))
+    assert_parity(kernels.rsi(df["close"]), _rsi(df, 14))
+
+    # ta raises on fewer than 2 * window bars; the kernel returns its warm-up zeros
+    short = df.head(20)
+    assert not kernels.adx(short["high"], short["low"], short["close"]).any()
+
+
+@pytest.mark.unit
+def test_linear_recurrence_matches_loop():
+    rng = np.random.default_rng(0)
+    inputs = rng.standard_normal(1000)
+    expected = np.empty_like(inputs)
+    value = 2.5
+    for i, x in enumerate(inputs):
+        value = 0.9 * value + x
+        expected[i] = value
+    np.testing.assert_allclose(
+        kernels.linear_recurrence(inputs, 0.9, 2.5), expected, rtol=1e-12
+    )
+
+
+@pytest.mark.unit
+def test_calculate_indicators_numpy_backend(config, ohlcv):
+    params = {
+        "ema_length": config.EMA_LENGTH,
+        "volume_multiplier": config.VOLUME_MULTIPLIER,
+        "trading_start_hour": config.TRADING_START_HOUR,
+        "trading_end_hour": config.TRADING_END_HOUR,
+    }
+    expected = calculate_indicators(ohlcv, **params)
+    actual = calculate_indicators(ohlcv, backend="numpy", **params)
+
+    pd.testing.assert_frame_equal(actual, expected, check_exact=False, rtol=1e-9)
+
+
+@pytest.mark.unit
+def test_unknown_backend_rejected(config):
+    with pytest.raises(ValueError):
+        calculate_indicators(
+            make_ohlcv(1),
+            ema_length=config.EMA_LENGTH,
+            volume_multiplier=config.VOLUME_MULTIPLIER,
+            trading_start_hour=config.TRADING_START_HOUR,
+            trading_end_hour=config.TRADING_END_HOUR,
+            backend="cuda",
+        )
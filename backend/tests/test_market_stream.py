@@ -0,0 +1,279 @@
+import asyncio
+import json
+import threading
+
+import pytest
+
+from backend.src.modules.candle_cache import CandleCache
+from backend.src.modules.market_stream import (
+    BitfinexProtocol,
+    CandleBuilder,
+    MarketDataStream,
+    PubSub,
+    ReplayServer,
+    candle_topic,
+    ticker_topic,
+)
+from backend.src.tradingbot import TradingBot
+from backend.tests.test_tradingbot import START, STEP, FakeAsyncExchange, FakeClock
+
+MINUTE_MS = 60_000
+T0 = 1_700_000_040_000  # A minute boundary
+
+
+def trade(ts, price, amount=1.0, symbol="BTC/USD"):
+    return {
+        "channel": "trade",
+        "symbol": symbol,
+        "timestamp": ts,
+        "price": price,
+        "amount": amount,
+    }
+
+
+TRADES = [
+    trade(T0 + 1_000, 100.0),
+    trade(T0 + 20_000, 103.0, -2.0),
+    trade(T0 + 50_000, 99.0),
+    trade(T0 + 59_999, 101.0),
+    trade(T0 + MINUTE_MS + 5_000, 102.0),
+    trade(T0 + 2 * MINUTE_MS + 1_000, 104.0, 0.5),
+    trade(T0 + 2 * MINUTE_MS + 30_000, 105.0, 0.5),
+    trade(T0 + 3 * MINUTE_MS, 106.0),
+]
+FIRST_BAR = [T0, 100.0, 103.0, 99.0, 101.0, 5.0]
+SECOND_BAR = [T0 + MINUTE_MS, 102.0, 102.0, 102.0, 102.0, 1.0]
+THIRD_BAR = [T0 + 2 * MINUTE_MS, 104.0, 105.0, 104.0, 105.0, 1.0]
+
+
+@pytest.mark.unit
+def test_candle_builder_aggregates_trades():
+    builder = CandleBuilder("1m")
+    closed = []
+    for t in TRADES:
+        closed += builder.add_trade(t["timestamp"], t["price"], t["amount"])
+
+    assert closed == [FIRST_BAR, SECOND_BAR, THIRD_BAR]
+    assert builder.current == [T0 + 3 * MINUTE_MS, 106.0, 106.0, 106.0, 106.0, 1.0]
+    # Trades of closed bars are dropped rather than reopening them
+    assert builder.add_trade(T0 + 10, 50.0, 1.0) == []
+    assert builder.late_updates == 1
+
+
+@pytest.mark.unit
+def test_candle_builder_closes_on_time():
+    builder = CandleBuilder("1m")
+    builder.add_trade(T0 + 1_000, 100.0, 1.0)
+
+    assert builder.close_until(T0 + MINUTE_MS - 1) == []
+    assert builder.close_until(T0 + MINUTE_MS) == [
+        [T0, 100.0, 100.0, 100.0, 100.0, 1.0]
+    ]
+    assert builder.add_candle([T0, 1, 2, 0, 1, 9]) == []
+    assert builder.add_candle([T0 + MINUTE_MS, 1, 2, 0, 1, 9]) == []
+    assert builder.add_candle([T0 + MINUTE_MS, 1, 3, 0, 2, 10]) == []
+    assert builder.add_candle([T0 + 2 * MINUTE_MS, 2, 2, 2, 2, 1]) == [
+        [T0 + MINUTE_MS, 1.0, 3.0, 0.0, 2.0, 10.0]
+    ]
+
+
+@pytest.mark.unit
+def test_pubsub_delivers_across_threads_and_drops_oldest():
+    pubsub = PubSub()
+    received = []
+    pubsub.add_callback("t", received.append)
+    pubsub.add_callback("t", lambda message: 1 / 0)  # Must not affect others
+
+    async def scenario():
+        subscription = pubsub.subscribe("t", maxsize=3)
+        publisher = threading.Thread(
+            target=lambda: [pubsub.publish("t", i) for i in range(5)]
+        )
+        publisher.start()
+        publisher.join()
+        await asyncio.sleep(0.01)
+        messages = [subscription.get_nowait() for _ in range(3)]
+        subscription.close()
+        pubsub.publish("t", 5)
+        return messages, subscription
+
+    messages, subscription = asyncio.run(scenario())
+    assert messages == [2, 3, 4]
+    assert subscription.dropped == 2
+    assert received == [0, 1, 2, 3, 4, 5]
+    assert pubsub.latest("t") == 5
+
+
+async def stream_candles(server, count, **kwargs):
+    """
+    Run a stream against server until count candles are published.
+    """
+    pubsub = PubSub()
+    subscription = pubsub.subscribe(candle_topic("BTC/USD", "1m"))
+    stream = MarketDataStream(
+        server.url, ["BTC/USD"], pubsub=pubsub, clock=lambda: T0 / 1000, **kwargs
+    )
+    task = asyncio.create_task(stream.run())
+    candles = [
+        await asyncio.wait_for(subscription.get(), timeout=5) for _ in range(count)
+    ]
+    stream.stop()
+    await asyncio.wait_for(task, timeout=5)
+    return stream, pubsub, candles
+
+
+@pytest.mark.unit
+def test_stream_builds_candles_from_replayed_trades(tmp_path):
+    ticker = {
+        "channel": "ticker",
+        "symbol": "BTC/USD",
+        "timestamp": T0,
+        "bid": 99.5,
+        "ask": 100.5,
+        "last": 100.0,
+        "baseVolume": 10.0,
+    }
+    messages = [(T0, ticker)] + [(t["timestamp"], t) for t in TRADES]
+    cache = CandleCache(exchange=None)
+    record_file = str(tmp_path / "recording.jsonl")
+
+    async def scenario():
+        async with ReplayServer(messages) as server:
+            result = await stream_candles(
+                server, 3, candle_cache=cache, record_file=record_file
+            )
+        return server, result
+
+    server, (stream, pubsub, candles) = asyncio.run(scenario())
+
+    assert candles == [FIRST_BAR, SECOND_BAR, THIRD_BAR]
+    assert json.loads(server.subscriptions[0])["channels"] == ["ticker", "trade"]
+    assert pubsub.latest(ticker_topic("BTC/USD"))["last"] == 100.0
+    # The cache holds the closed bars and the forming one, without any REST
+    cached = cache.candles("BTC/USD", "1m", 4)
+    assert cached[:, 0].tolist() == [T0 + i * MINUTE_MS for i in range(4)]
+    assert cache.full_fetches == 0
+
+    async def replay():
+        async with ReplayServer.from_file(record_file, speed=1000) as server:
+            return await stream_candles(server, 3)
+
+    _, _, replayed = asyncio.run(replay())
+    assert replayed == candles
+
+
+@pytest.mark.unit
+def test_stream_reconnects_after_server_restart():
+    async def scenario():
+        server = ReplayServer([(t["timestamp"], t) for t in TRADES[:5]])
+        await server.start()
+        pubsub = PubSub()
+        subscription = pubsub.subscribe(candle_topic("BTC/USD", "1m"))
+        stream = MarketDataStream(
+            server.url,
+            ["BTC/USD"],
+            pubsub=pubsub,
+            clock=lambda: T0 / 1000,
+            reconnect_delay=0.01,
+        )
+        task = asyncio.create_task(stream.run())
+        first = await asyncio.wait_for(subscription.get(), timeout=5)
+        await server.close()
+        restarted = ReplayServer(
+            [(t["timestamp"], t) for t in TRADES[5:]], port=server.port
+        )
+        await restarted.start()
+        second = await asyncio.wait_for(subscription.get(), timeout=5)
+        stream.stop()
+        await asyncio.wait_for(task, timeout=5)
+        await restarted.close()
+        return stream, [first, second]
+
+    stream, candles = asyncio.run(scenario())
+    assert candles == [FIRST_BAR, SECOND_BAR]
+    assert stream.reconnects >= 1
+
+
+@pytest.mark.unit
+def test_bitfinex_protocol_parses_channels():
+    protocol = BitfinexProtocol()
+    subscribe = protocol.subscribe_messages(["BTC/USD"], ["trade", "candle"], "1m")
+
+    assert [json.loads(m) for m in subscribe] == [
+        {"event": "subscribe", "channel": "trades", "symbol": "tBTCUSD"},
+        {"event": "subscribe", "channel": "candles", "key": "trade:1m:tBTCUSD"},
+    ]
+    protocol.parse(json.dumps({"event": "info", "version": 2}))
+    protocol.parse(
+        json.dumps(
+            {
+                "event": "subscribed",
+                "channel": "trades",
+                "chanId": 7,
+                "symbol": "tBTCUSD",
+            }
+        )
+    )
+    protocol.parse(
+        json.dumps(
+            {
+                "event": "subscribed",
+                "channel": "candles",
+                "chanId": 8,
+                "key": "trade:1m:tBTCUSD",
+            }
+        )
+    )
+    assert protocol.parse('[7,"hb"]') == []
+    assert protocol.parse(json.dumps([7, "te", [1, T0, -0.5, 100.0]])) == [
+        trade(T0, 100.0, -0.5)
+    ]
+    assert protocol.parse(json.dumps([7, "tu", [1, T0, -0.5, 100.0]])) == []
+    snapshot = [[T0 + MINUTE_MS, 1, 2, 3, 0.5, 9], [T0, 1, 1.5, 2, 0.5, 8]]
+    candles = protocol.parse(json.dumps([8, snapshot]))
+    assert [event["candle"] for event in candles] == [
+        [T0, 1, 2, 0.5, 1.5, 8],
+        [T0 + MINUTE_MS, 1, 3, 0.5, 2, 9],
+    ]
+    assert BitfinexProtocol.market_id("DOGE/USDT") == "tDOGE:USDT"
+
+
+@pytest.mark.unit
+def test_bot_trades_on_streamed_candles(config):
+    cfg = config.model_copy(
+        update={
+            "TIMEFRAME": "1m",
+            "LIMIT": 100,
+            "TRADING_START_HOUR": 0,
+            "TRADING_END_HOUR": 24,
+        }
+    )
+    clock = FakeClock(START + 5)
+    exchange = FakeAsyncExchange(clock, latency=0.02)
+    bot = TradingBot(cfg)
+    pubsub = PubSub()
+    topic = candle_topic(cfg.SYMBOL, "1m")
+    first = int(START // STEP)
+
+    async def publish():
+        while bot._last_candle_ms is None:
+            await asyncio.sleep(0)
+        # Minute first + 1 is never streamed and has to be backfilled
+        for minute in (first, first + 2, first + 3):
+            clock.now = (minute + 1) * STEP + 0.05
+            pubsub.publish(topic, exchange.candle(minute))
+            while bot._last_candle_ms < minute * STEP * 1000:
+                await asyncio.sleep(0)
+
+    async def scenario():
+        publisher = asyncio.create_task(publish())
+        await bot.run_stream(pubsub, exchange=exchange, clock=clock, max_candles=3)
+        await publisher
+
+    asyncio.run(scenario())
+
+    assert bot.indicators.bars == 99 + 4
+    assert bot._last_candle_ms == int((first + 3) * STEP * 1000)
+    # One exchange request for the backfill, none for the streamed bars
+    assert len(exchange.fetches) == 2
+    assert [round(latency) for latency in bot.decision_latencies] == [50, 70, 50]
@@ -0,0 +1,135 @@
+import threading
+import time
+
+import pytest
+
+from backend.src.modules.metrics import MetricsAggregator
+from backend.src.tradingbot import TradingBot
+from backend.tests.test_tradingbot import (
+    START,
+    STEP,
+    FakeAsyncExchange,
+    FakeClock,
+    run,
+)
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.mark.unit
+def test_running_totals_and_drawdown():
+    metrics = MetricsAggregator()
+    for pnl in (10.0, -4.0, -8.0, 5.0, 20.0, -3.0, 0.0):
+        metrics.record_trade({"pnl": pnl})
+
+    assert metrics.metrics() == {
+        "total_trades": 7,
+        "winning_trades": 3,
+        "losing_trades": 4,
+        "total_pnl": pytest.approx(20.0),
+        "win_rate": pytest.approx(3 / 7),
+        "drawdown": pytest.approx(3.0),
+        "max_drawdown": pytest.approx(12.0),
+    }
+    assert metrics.version == 7
+
+
+@pytest.mark.unit
+def test_event_cost_does_not_grow_with_history():
+    metrics = MetricsAggregator()
+
+    def record(count):
+        started = time.perf_counter()
+        for i in range(count):
+            metrics.record_trade({"pnl": i % 3 - 1})
+            metrics.snapshot()
+        return (time.perf_counter() - started) / count
+
+    early = record(5000)
+    record(50_000)
+    late = record(5000)
+
+    assert metrics.total_trades == 60_000
+    assert late < early * 3
+
+
+@pytest.mark.unit
+def test_balance_refreshes_on_change_or_ttl():
+    clock = Clock()
+    balances = iter(range(100))
+    metrics = MetricsAggregator(
+        lambda: {"total": {"USD": next(balances)}}, balance_ttl=60, clock=clock
+    )
+
+    assert metrics.balance_due()
+    metrics.refresh_balance()
+    clock.now = 30
+    assert not metrics.balance_due()
+    metrics.record_position({"size": 1.0})
+    assert metrics.balance_due()
+    metrics.refresh_balance()
+    clock.now = 89
+    assert not metrics.balance_due()
+    clock.now = 90
+    assert metrics.balance_due()
+    assert metrics.snapshot()["balance"] == {"total": {"USD": 1}}
+    assert metrics.balance_fetches == 2
+
+
+@pytest.mark.unit
+def test_failed_balance_fetch_keeps_last_balance():
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        if len(calls) > 1:
+            raise RuntimeError("exchange down")
+        return {"total": {"USD": 5}}
+
+    metrics = MetricsAggregator(fetch)
+    assert metrics.refresh_balance()
+    metrics.mark_balance_stale()
+    assert not metrics.refresh_balance()
+
+    assert metrics.balance == {"total": {"USD": 5}}
+    assert metrics.balance_due()  # Still stale, so retried
+
+
+@pytest.mark.unit
+def test_refresher_thread_fetches_after_trades():
+    fetched = threading.Semaphore(0)
+
+    def fetch():
+        fetched.release()
+        return {}
+
+    metrics = MetricsAggregator(fetch, balance_ttl=3600)
+    metrics.start_balance_refresher()
+    try:
+        assert fetched.acquire(timeout=2)
+        assert not fetched.acquire(timeout=0.05)  # Idle until something changes
+        metrics.record_trade({"pnl": 1.0})
+        assert fetched.acquire(timeout=2)
+    finally:
+        metrics.stop()
+
+
+@pytest.mark.unit
+def test_bot_pushes_trades_into_metrics(bot_config):
+    clock = FakeClock(START + 5)
+    exchange = FakeAsyncExchange(clock, breakout=int(START // STEP) + 2)
+    bot = TradingBot(bot_config)
+
+    run(bot, exchange, clock, max_candles=6)
+
+    snapshot = bot.metrics.snapshot()
+    assert snapshot["metrics"]["total_trades"] == len(bot.trade_history) == 1
+    assert snapshot["metrics"]["total_pnl"] == bot.trade_history[0]["pnl"]
+    assert snapshot["current_position"] is None
+    assert bot.metrics.version == 3  # Entry, exit and closed position
@@ -0,0 +1,139 @@
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from backend.src.backtest import backtest_dataframe
+from backend.src.modules.ohlcv_store import OHLCV_COLUMNS, OHLCVStore
+from backend.tests.test_backtest import make_ohlcv
+
+
+@pytest.fixture
+def store(tmp_path):
+    return OHLCVStore(str(tmp_path / "store"))
+
+
+def as_float(df):
+    df = df.copy()
+    df["volume"] = df["volume"].astype(float)
+    return df
+
+
+@pytest.mark.unit
+def test_write_partitions_by_month_and_reads_back(store):
+    df = as_float(make_ohlcv(1, periods=24 * 70))
+    store.write("BTC/USD", "1h", df)
+
+    assert store.partitions("BTC/USD", "1h") == ["2024-01", "2024-02", "2024-03"]
+    pd.testing.assert_frame_equal(store.read("BTC/USD", "1h"), df)
+
+
+@pytest.mark.unit
+def test_read_date_range_and_columns(store):
+    df = as_float(make_ohlcv(2, periods=24 * 70))
+    store.write("BTC/USD", "1h", df)
+
+    result = store.read(
+        "BTC/USD", "1h", start="2024-01-20", end="2024-02-10", columns=["close"]
+    )
+    expected = df[(df["timestamp"] >= "2024-01-20") & (df["timestamp"] < "2024-02-10")][
+        ["timestamp", "close"]
+    ].reset_index(drop=True)
+    pd.testing.assert_frame_equal(result, expected)
+
+
+@pytest.mark.unit
+def test_single_partition_read_is_memory_mapped(store):
+    df = as_float(make_ohlcv(3, periods=24 * 40))
+    store.write("BTC/USD", "1h", df)
+
+    result = store.read("BTC/USD", "1h", start="2024-01-05", end="2024-01-06")
+
+    assert len(result) == 24
+    close = result["close"].to_numpy()
+    assert isinstance(close.base, np.memmap) or isinstance(close, np.memmap)
+    assert not close.flags.writeable
+
+
+@pytest.mark.unit
+def test_write_merges_and_overwrites_duplicates(store):
+    df = as_float(make_ohlcv(4, periods=100))
+    store.write("ETH/USD", "1h", df.iloc[:60])
+    update = df.iloc[50:].copy()
+    update.loc[update.index[0], "close"] = -1.0
+    store.write("ETH/USD", "1h", update)
+
+    result = store.read("ETH/USD", "1h")
+    expected = df.copy()
+    expected.loc[50, "close"] = -1.0
+    pd.testing.assert_frame_equal(result, expected)
+    assert store.last_timestamp("ETH/USD", "1h") == df["timestamp"].iloc[-1]
+    assert store.first_timestamp("ETH/USD", "1h") == df["timestamp"].iloc[0]
+
+
+@pytest.mark.unit
+def test_readers_never_see_a_half_merged_partition(store):
+    timestamps = pd.date_range("2024-01-01", periods=600, freq="h")
+
+    def version(k: int) -> pd.DataFrame:
+        # Every column of version k holds k, and each version inserts rows
+        # between the existing ones
+        rows = timestamps[: 300 + k]
+        return pd.DataFrame(
+            {"timestamp": rows, **{c: float(k) for c in OHLCV_COLUMNS[1:]}}
+        )
+
+    store.write("BTC/USD", "1h", version(0))
+    done = threading.Event()
+
+    def writer():
+        for k in range(1, 60):
+            store.write("BTC/USD", "1h", version(k))
+        done.set()
+
+    thread = threading.Thread(target=writer)
+    thread.start()
+    reads = 0
+    while not done.is_set() or reads == 0:
+        df = store.read("BTC/USD", "1h", end="2024-02-01")
+        k = df["close"].iloc[0]
+        assert len(df) == min(300 + int(k), 31 * 24)
+        assert (df[list(OHLCV_COLUMNS[1:])] == k).all().all()
+        reads += 1
+    thread.join()
+
+    month_dir = os.path.join(store.root, "BTC-USD", "1h", "2024-01")
+    assert sorted(os.listdir(month_dir))[0] == "CURRENT"
+    assert len(os.listdir(month_dir)) == 2
+
+
+@pytest.mark.unit
+def test_missing_series_reads_empty(store):
+    result = store.read("XRP/USD", "1d")
+    assert result.empty
+    assert list(result.columns) == [
+        "timestamp",
+        "open",
+        "high",
+        "low",
+        "close",
+        "volume",
+    ]
+    assert store.last_timestamp("XRP/USD", "1d") is None
+
+
+@pytest.mark.unit
+def test_import_csv_matches_csv_backtest(store, tmp_path, config):
+    df = make_ohlcv(5, periods=1500)
+    csv_file = tmp_path / "data.csv"
+    df.to_csv(csv_file, index=False)
+
+    assert store.import_csv(str(csv_file), "BTC/USD", "1h", chunksize=400) == 1500
+
+    from_csv = pd.read_csv(csv_file, parse_dates=["timestamp"])
+    from_store = store.read("BTC/USD", "1h")
+    assert backtest_dataframe(from_store, config) == backtest_dataframe(
+        from_csv, config
+    )
@@ -0,0 +1,103 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from backend.src.backtest import backtest_dataframe, trade_statistics
+from backend.src.optimizer import (
+    SharedOHLCV,
+    evaluate,
+    grid_space,
+    optimize,
+    random_space,
+    rank_results,
+)
+from backend.tests.test_backtest import make_ohlcv
+
+
+@pytest.fixture
+def base_config(config):
+    return config.model_copy(
+        update={"STOP_LOSS_PERCENT": 2.0, "TAKE_PROFIT_PERCENT": 2.0}
+    )
+
+
+@pytest.mark.unit
+def test_grid_space_expands_all_combinations():
+    space = grid_space({"LOOKBACK": [3, 5], "STOP_LOSS_PERCENT": [1.0, 2.0, 3.0]})
+    assert len(space) == 6
+    assert {"LOOKBACK": 5, "STOP_LOSS_PERCENT": 3.0} in space
+
+
+@pytest.mark.unit
+def test_random_space_respects_bounds():
+    space = random_space(
+        {"LOOKBACK": (2, 8), "RISK_PER_TRADE": (0.01, 0.02), "EMA_LENGTH": [10, 20]},
+        samples=50,
+        seed=1,
+    )
+    assert len(space) == 50
+    assert all(2 <= p["LOOKBACK"] <= 8 for p in space)
+    assert all(isinstance(p["LOOKBACK"], int) for p in space)
+    assert all(0.01 <= p["RISK_PER_TRADE"] <= 0.02 for p in space)
+    assert {p["EMA_LENGTH"] for p in space} <= {10, 20}
+
+
+@pytest.mark.unit
+def test_unknown_field_rejected():
+    with pytest.raises(ValueError):
+        grid_space({"NOT_A_FIELD": [1]})
+
+
+@pytest.mark.unit
+def test_shared_ohlcv_roundtrip():
+    df = make_ohlcv(5, periods=50)
+    df["timestamp"] = df["timestamp"].dt.tz_localize("Europe/Stockholm")
+    with SharedOHLCV.from_frame(df) as shared:
+        attached = SharedOHLCV.attach(shared.descriptor())
+        frame = attached.frame()
+        pd.testing.assert_series_equal(frame["timestamp"], df["timestamp"])
+        np.testing.assert_array_equal(frame["close"], df["close"])
+        assert not frame["close"].to_numpy().flags.writeable
+        del frame
+        attached.close()
+
+
+@pytest.mark.unit
+def test_evaluate_reports_invalid_parameters(base_config):
+    result = evaluate(
+        make_ohlcv(1), base_config.model_dump(), {"STOP_LOSS_PERCENT": -1.0}
+    )
+    assert "STOP_LOSS_PERCENT" in result["error"]
+
+
+@pytest.mark.unit
+def test_rank_results_orders_by_key():
+    results = [
+        {"total_pnl": 1.0, "max_drawdown": 0.1, "sharpe": 0.5},
+        {"total_pnl": 3.0, "max_drawdown": 0.3, "sharpe": 0.1},
+        {"error": "bad"},
+    ]
+    assert rank_results(results, "pnl")["total_pnl"].tolist()[:2] == [3.0, 1.0]
+    assert rank_results(results, "drawdown")["max_drawdown"].tolist()[:2] == [0.1, 0.3]
+    assert rank_results(results, "sharpe")["error"].iloc[-1] == "bad"
+
+
+@pytest.mark.integration
+def test_optimize_matches_sequential_backtests(base_config):
+    df = make_ohlcv(7)
+    param_sets = grid_space({"LOOKBACK": [2, 5], "TAKE_PROFIT_PERCENT": [1.0, 3.0]})
+
+    ranked = optimize(df, base_config, param_sets, workers=2)
+
+    assert len(ranked) == len(param_sets)
+    assert ranked["error"].isna().all()
+    for params in param_sets:
+        cfg = base_config.model_copy(update=params)
+        expected = trade_statistics(backtest_dataframe(df, cfg), 10000.0)
+        row = ranked[
+            (ranked["LOOKBACK"] == params["LOOKBACK"])
+            & (ranked["TAKE_PROFIT_PERCENT"] == params["TAKE_PROFIT_PERCENT"])
+        ].iloc[0]
+        assert row["total_pnl"] == pytest.approx(expected["total_pnl"])
+        assert row["trades"] == expected["trades"]
+    assert ranked["total_pnl"].is_monotonic_decreasing
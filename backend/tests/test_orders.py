@@ -1,5 +1,10 @@
 # tests/test_orders.py
 
+import asyncio
+import json
+import os
+import time
+
 import ccxt
 import pytest
 
@@ -41,6 +46,11 @@ class DummyExchange:
             "params": params,
         }
 
+    def create_order(self, symbol, type, side, amount, price=None, params=None):
+        if type == "market":
+            return self.create_market_order(symbol, side, amount, params)
+        return self.create_limit_order(symbol, side, amount, price, params)
+
     def cancel_order(self, order_id, symbol=None):
         return {"status": "canceled", "order_id": order_id, "symbol": symbol}
 
@@ -122,3 +132,301 @@ def test_calculate_position_size_negative_distance():
     # Negative distance (stop_loss above entry for long) also invalid
     with pytest.raises(ValueError):
         calculate_position_size(1000.0, 0.01, 50.0, 55.0)
+
+
+# --- tests for the shared client registry ---
+
+
+class ProbeExchange(DummyExchange):
+    def __init__(self, api_key, api_secret, exchange_name, session=None):
+        super().__init__()
+        self.id = exchange_name
+        self.api_key = api_key
+        self.session = session
+        self.has = {"fetchTime": True}
+        self.healthy = True
+
+    def fetch_time(self):
+        if not self.healthy:
+            raise ccxt.NetworkError("connection reset")
+        return 0
+
+
+def test_init_exchange_reuses_client():
+    first = init_exchange("key", "secret", "bitfinex")
+    second = init_exchange("key", "secret", "bitfinex")
+    other = init_exchange("key", "other-secret", "bitfinex")
+
+    assert first is second
+    assert other is not first
+    assert first.session.adapters["https://"]._pool_maxsize == 10
+
+
+def test_init_exchange_unknown_exchange():
+    with pytest.raises(RuntimeError):
+        init_exchange("key", "secret", "not-an-exchange")
+
+
+def test_registry_creates_one_client_under_concurrency():
+    from concurrent.futures import ThreadPoolExecutor
+
+    from backend.src.modules.orders import ClientRegistry
+
+    created = []
+
+    def factory(*args, **kwargs):
+        created.append(args)
+        return ProbeExchange(*args, **kwargs)
+
+    registry = ClientRegistry(factory=factory)
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        clients = list(pool.map(lambda _: registry.get("k", "s", "dummy"), range(100)))
+
+    assert len(created) == 1
+    assert all(client is clients[0] for client in clients)
+
+
+def test_registry_health_check_reconnects_in_place():
+    from backend.src.modules.orders import ClientRegistry
+
+    registry = ClientRegistry(factory=ProbeExchange)
+    reconnected = []
+    registry.add_reconnect_hook(reconnected.append)
+    client = registry.get("k", "s", "dummy")
+    old_session = client.session
+
+    assert registry.check_health("k", "s", "dummy")["ok"]
+    assert reconnected == []
+
+    client.healthy = False
+    status = registry.check_health("k", "s", "dummy")
+
+    assert not status["ok"]
+    assert "connection reset" in status["error"]
+    assert reconnected == [client]
+    assert client.session is not old_session
+    assert registry.get("k", "s", "dummy") is client
+    assert [s["ok"] for s in registry.health().values()] == [False]
+
+
+# --- tests for the markets cache ---
+
+
+class MarketsExchange:
+    id = "dummy"
+
+    def __init__(self):
+        self.markets = None
+        self.currencies = None
+        self.loads = 0
+
+    def set_markets(self, markets, currencies=None):
+        self.markets = markets
+        self.currencies = currencies
+        return markets
+
+    def load_markets(self, reload=False):
+        self.loads += 1
+        return self.set_markets(
+            {"BTC/USD": {"symbol": "BTC/USD", "id": "tBTCUSD"}},
+            {"BTC": {"code": "BTC"}},
+        )
+
+
+def test_markets_cold_start_loads_and_saves(tmp_path):
+    from backend.src.modules.orders import warm_start_markets
+
+    cache_file = str(tmp_path / "markets.json")
+    exchange = MarketsExchange()
+
+    assert warm_start_markets(exchange, cache_file) is None
+    assert exchange.loads == 1
+    assert os.path.exists(cache_file)
+
+
+def test_markets_warm_start_skips_network(tmp_path):
+    from backend.src.modules.orders import save_markets, warm_start_markets
+
+    cache_file = str(tmp_path / "markets.json")
+    source = MarketsExchange()
+    source.load_markets()
+    save_markets(source, cache_file)
+
+    exchange = MarketsExchange()
+    assert warm_start_markets(exchange, cache_file, ttl=60) is None
+    assert exchange.loads == 0
+    assert exchange.markets == source.markets
+    assert exchange.currencies == source.currencies
+
+
+def test_stale_markets_refresh_in_background(tmp_path):
+    from backend.src.modules.orders import save_markets, warm_start_markets
+
+    cache_file = str(tmp_path / "markets.json")
+    source = MarketsExchange()
+    source.load_markets()
+    save_markets(source, cache_file)
+    with open(cache_file, "r", encoding="utf-8") as f:
+        payload = json.load(f)
+    payload["saved_at"] -= 3600
+    with open(cache_file, "w", encoding="utf-8") as f:
+        json.dump(payload, f)
+
+    exchange = MarketsExchange()
+    thread = warm_start_markets(exchange, cache_file, ttl=60)
+
+    assert exchange.markets == source.markets
+    thread.join(timeout=5)
+    assert exchange.loads == 1
+    with open(cache_file, "r", encoding="utf-8") as f:
+        assert json.load(f)["saved_at"] > payload["saved_at"]
+
+
+def test_markets_cache_for_other_exchange_ignored(tmp_path):
+    from backend.src.modules.orders import load_cached_markets, save_markets
+
+    cache_file = str(tmp_path / "markets.json")
+    source = MarketsExchange()
+    source.load_markets()
+    save_markets(source, cache_file)
+
+    other = MarketsExchange()
+    other.id = "other"
+    assert load_cached_markets(other, cache_file) is None
+    assert other.markets is None
+
+
+# --- tests for the order API ---
+
+PAPER_CANDLES = [
+    [1_704_067_200_000, 100.0, 101.0, 99.0, 100.0, 10.0],
+    [1_704_070_800_000, 100.0, 101.0, 90.0, 95.0, 10.0],
+]
+
+
+@pytest.fixture
+def paper():
+    from backend.src.modules.paper_exchange import PaperExchange
+
+    exchange = PaperExchange(balances={"USD": 10000.0, "BTC": 1.0})
+    exchange.load_candles("BTC/USD", "1h", PAPER_CANDLES, position=1)
+    return exchange
+
+
+def test_submit_order_supports_sides_and_types(paper):
+    from backend.src.modules.orders import submit_order
+
+    buy = submit_order(paper, "BTC/USD", "buy", 0.5)
+    sell = submit_order(paper, "BTC/USD", "sell", 0.2, "limit", price=120.0)
+    stop = submit_order(paper, "BTC/USD", "sell", 0.3, "stop", stop_price=92.0)
+
+    assert (buy["side"], buy["status"], buy["average"]) == ("buy", "closed", 100.0)
+    assert (sell["side"], sell["status"], sell["price"]) == ("sell", "open", 120.0)
+    assert stop["status"] == "open"
+    paper.advance()
+    assert paper.fetch_order(stop["id"])["average"] == 92.0
+    with pytest.raises(ValueError):
+        submit_order(paper, "BTC/USD", "sell", 0.1, "limit")
+    with pytest.raises(ValueError):
+        submit_order(paper, "BTC/USD", "short", 0.1)
+
+
+def test_place_order_sells():
+    ex = DummyExchange()
+    import backend.src.modules.orders as orders
+
+    orders._Exchange = ex
+    res = place_order("limit", "BTC/USD", 0.1, price=50, side="sell")
+    assert res["side"] == "sell"
+
+
+class SlowExchange(DummyExchange):
+    """Takes `latency` seconds per order and rejects amounts above 1"""
+
+    def __init__(self, latency=0.1, batch=False):
+        super().__init__()
+        self.latency = latency
+        self.has = {"createOrders": batch}
+        self.requests = 0
+
+    def create_order(self, symbol, type, side, amount, price=None, params=None):
+        self.requests += 1
+        time.sleep(self.latency)
+        if amount > 1:
+            raise ccxt.InsufficientFunds("not enough balance")
+        return {"symbol": symbol, "type": type, "side": side, "amount": amount}
+
+    def create_orders(self, orders, params=None):
+        self.requests += 1
+        time.sleep(self.latency)
+        return [{**order, "status": "open"} for order in orders]
+
+
+REBALANCE = [
+    {"symbol": "BTC/USD", "type": "market", "side": "buy", "amount": 0.5},
+    {"symbol": "ETH/USD", "type": "limit", "side": "sell", "amount": 0.5},
+    {"symbol": "SOL/USD", "type": "market", "side": "sell", "amount": 5.0},
+    {"symbol": "XRP/USD", "type": "stop", "side": "sell", "amount": 0.1, "price": 1},
+]
+
+
+def test_submit_orders_concurrently_with_per_order_results():
+    from backend.src.modules.orders import submit_orders
+
+    exchange = SlowExchange(latency=0.1)
+    started = time.monotonic()
+    results = submit_orders(exchange, REBALANCE)
+    elapsed = time.monotonic() - started
+
+    assert elapsed < 0.25  # Three round trips in parallel
+    assert exchange.requests == 3
+    assert results[0]["side"] == "buy"
+    assert isinstance(results[1], ValueError)  # Limit order without a price
+    assert isinstance(results[2], ccxt.InsufficientFunds)
+    assert results[3]["type"] == "market"  # Stops are sent with a trigger
+
+
+def test_submit_orders_uses_batch_endpoint():
+    from backend.src.modules.orders import order_request, submit_orders
+
+    exchange = SlowExchange(batch=True)
+    orders = REBALANCE + [order_request("ADA/USD", "buy", 0.1, stop_price=0.5)]
+    results = submit_orders(exchange, orders)
+
+    assert exchange.requests == 1
+    assert isinstance(results[1], ValueError)
+    assert [r["symbol"] for r in results if isinstance(r, dict)] == [
+        "BTC/USD",
+        "SOL/USD",
+        "XRP/USD",
+        "ADA/USD",
+    ]
+    assert results[4]["params"] == {"triggerPrice": 0.5}
+
+
+def test_submit_orders_async_gathers_requests():
+    from backend.src.modules.orders import submit_orders_async
+
+    class AsyncSlowExchange:
+        id = "dummy"
+        has = {}
+
+        def __init__(self):
+            self.in_flight = self.max_in_flight = 0
+
+        async def create_order(self, symbol, type, side, amount, price, params):
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+            await asyncio.sleep(0.05)
+            self.in_flight -= 1
+            if amount > 1:
+                raise ccxt.InsufficientFunds("not enough balance")
+            return {"symbol": symbol, "side": side}
+
+    exchange = AsyncSlowExchange()
+    results = asyncio.run(submit_orders_async(exchange, REBALANCE))
+
+    assert exchange.max_in_flight == 3
+    assert results[0] == {"symbol": "BTC/USD", "side": "buy"}
+    assert isinstance(results[1], ValueError)
+    assert isinstance(results[2], ccxt.InsufficientFunds)
@@ -0,0 +1,238 @@
+import asyncio
+import time
+
+import ccxt
+import pandas as pd
+import pytest
+
+from backend.src.modules.orders import (
+    client_registry,
+    create_async_exchange,
+    init_exchange,
+)
+from backend.src.modules.ohlcv_store import OHLCV_COLUMNS, OHLCVStore
+from backend.src.modules.paper_exchange import AsyncPaperExchange, PaperExchange
+
+HOUR_MS = 3600 * 1000
+T0 = 1_704_067_200_000  # 2024-01-01
+
+CANDLES = [
+    [T0, 100.0, 101.0, 99.0, 100.0, 10.0],
+    [T0 + HOUR_MS, 100.0, 102.0, 98.0, 101.0, 10.0],
+    [T0 + 2 * HOUR_MS, 97.0, 99.0, 95.0, 96.0, 10.0],
+    [T0 + 3 * HOUR_MS, 96.0, 110.0, 96.0, 108.0, 10.0],
+]
+
+
+@pytest.fixture
+def paper():
+    exchange = PaperExchange(
+        balances={"USD": 10000.0, "BTC": 1.0}, maker_fee=0.001, taker_fee=0.002
+    )
+    exchange.load_candles("BTC/USD", "1h", CANDLES, position=1)
+    return exchange
+
+
+@pytest.mark.unit
+def test_market_order_fills_at_last_close_with_taker_fee(paper):
+    order = paper.create_market_order("BTC/USD", "buy", 2.0)
+
+    assert order["status"] == "closed"
+    assert order["average"] == 100.0
+    assert order["fee"] == {"cost": pytest.approx(0.4), "currency": "USD"}
+    balance = paper.fetch_balance()
+    assert balance["total"]["BTC"] == 3.0
+    assert balance["USD"]["free"] == pytest.approx(10000.0 - 200.0 - 0.4)
+
+
+@pytest.mark.unit
+def test_book_matches_in_price_time_priority(paper):
+    first = paper.create_limit_order("BTC/USD", "sell", 0.3, 105.0)
+    second = paper.create_limit_order("BTC/USD", "sell", 0.3, 105.0)
+    better = paper.create_limit_order("BTC/USD", "sell", 0.2, 104.0)
+    assert paper.fetch_balance()["BTC"]["used"] == pytest.approx(0.8)
+    assert paper.fetch_ticker("BTC/USD")["ask"] == 104.0
+
+    taker = paper.create_limit_order("BTC/USD", "buy", 0.6, 105.0)
+
+    assert taker["status"] == "closed"
+    assert taker["cost"] == pytest.approx(0.2 * 104.0 + 0.4 * 105.0)
+    assert paper.fetch_order(better["id"])["status"] == "closed"
+    assert paper.fetch_order(first["id"])["filled"] == pytest.approx(0.3)
+    assert paper.fetch_order(second["id"])["filled"] == pytest.approx(0.1)
+    assert [o["id"] for o in paper.fetch_open_orders("BTC/USD")] == [second["id"]]
+    # Makers paid the maker fee and the taker the taker fee, in USD
+    assert paper.fetch_order(first["id"])["fee"]["cost"] == pytest.approx(
+        0.3 * 105.0 * 0.001
+    )
+    assert taker["fee"]["cost"] == pytest.approx(taker["cost"] * 0.002)
+
+
+@pytest.mark.unit
+def test_resting_orders_fill_against_replayed_candles(paper):
+    buy = paper.create_limit_order("BTC/USD", "buy", 1.0, 98.5)
+    deep = paper.create_limit_order("BTC/USD", "buy", 1.0, 90.0)
+    assert paper.fetch_balance()["USD"]["used"] == pytest.approx((98.5 + 90.0) * 1.001)
+
+    paper.advance()  # Low 98 reaches 98.5
+
+    assert paper.fetch_order(buy["id"])["average"] == 98.5
+    assert paper.fetch_order(deep["id"])["status"] == "open"
+
+    sell = paper.create_limit_order("BTC/USD", "sell", 1.0, 96.5)
+    assert sell["status"] == "closed"  # Marketable against the close of 101
+    assert sell["average"] == 101.0
+
+    paper.cancel_order(deep["id"], "BTC/USD")
+    assert paper.fetch_balance()["USD"]["used"] == pytest.approx(0.0)
+    with pytest.raises(ccxt.OrderNotFound):
+        paper.cancel_order(deep["id"])
+
+
+@pytest.mark.unit
+def test_gapped_candle_fills_at_open(paper):
+    paper.advance()
+    order = paper.create_limit_order("BTC/USD", "buy", 1.0, 99.0)
+
+    paper.advance()  # Opens at 97, below the limit
+
+    assert paper.fetch_order(order["id"])["average"] == 97.0
+
+
+@pytest.mark.unit
+def test_stop_orders_trigger_when_traded_through(paper):
+    stop = paper.create_order(
+        "BTC/USD", "stop", "sell", 1.0, params={"stopPrice": 97.5}
+    )
+    breakout = paper.create_order("BTC/USD", "stop", "buy", 0.5, 105.0)
+
+    paper.advance()
+    assert paper.fetch_order(stop["id"])["status"] == "open"
+    paper.advance()  # Opens at 97, already through the stop
+    assert paper.fetch_order(stop["id"])["average"] == 97.0
+    paper.advance()  # High 110 triggers the buy stop at 105
+    assert paper.fetch_order(breakout["id"])["average"] == 105.0
+    assert paper.fetch_balance()["total"]["BTC"] == pytest.approx(0.5)
+
+
+@pytest.mark.unit
+def test_market_data_covers_closed_candles_only(paper):
+    assert paper.fetch_ohlcv("BTC/USD", "1h") == CANDLES[:1]
+    paper.advance(2)
+    assert paper.fetch_ohlcv("BTC/USD", "1h", limit=2) == CANDLES[1:3]
+    assert paper.fetch_ohlcv("BTC/USD", "1h", since=T0 + HOUR_MS) == CANDLES[1:3]
+    ticker = paper.fetch_ticker("BTC/USD")
+    assert ticker["last"] == 96.0
+    assert ticker["timestamp"] == T0 + 3 * HOUR_MS == paper.fetch_time()
+    assert paper.advance(5) == 1
+    with pytest.raises(ccxt.NotSupported):
+        paper.fetch_ohlcv("BTC/USD", "1m")
+
+
+@pytest.mark.unit
+def test_rejects_invalid_orders(paper):
+    with pytest.raises(ccxt.InsufficientFunds):
+        paper.create_market_order("BTC/USD", "buy", 1000.0)
+    with pytest.raises(ccxt.InsufficientFunds):
+        paper.create_limit_order("BTC/USD", "sell", 2.0, 120.0)
+    with pytest.raises(ccxt.BadSymbol):
+        paper.create_market_order("ETH/USD", "buy", 1.0)
+    with pytest.raises(ccxt.InvalidOrder):
+        paper.create_order("BTC/USD", "limit", "buy", 1.0)
+    assert paper.fetch_balance()["USD"]["used"] == 0.0
+
+
+@pytest.mark.unit
+def test_loads_candles_from_dataframe():
+    frame = pd.DataFrame(CANDLES, columns=["timestamp", "o", "h", "l", "c", "v"])
+    frame.columns = ["timestamp", "open", "high", "low", "close", "volume"]
+    frame["timestamp"] = pd.to_datetime(frame["timestamp"], unit="ms")
+    exchange = PaperExchange()
+    exchange.load_candles("BTC/USD", "1h", frame, position=len(CANDLES))
+
+    assert exchange.fetch_ohlcv("BTC/USD", "1h") == CANDLES
+
+
+@pytest.mark.unit
+def test_paper_is_available_by_exchange_name():
+    try:
+        exchange = init_exchange("", "", "paper")
+        assert isinstance(exchange, PaperExchange)
+        exchange.load_candles("BTC/USD", "1h", CANDLES, position=2)
+
+        async def buy():
+            client = create_async_exchange("", "", "paper")
+            order = await client.create_order("BTC/USD", "market", "buy", 1.0)
+            balance = await client.fetch_balance()
+            await client.close()
+            return client, order, balance
+
+        client, order, balance = asyncio.run(buy())
+        assert isinstance(client, AsyncPaperExchange)
+        assert order["average"] == 101.0
+        # Sync and async clients trade on one simulated account
+        assert exchange.fetch_balance()["total"] == balance["total"]
+    finally:
+        client_registry.remove("", "", "paper")
+
+
+def candle_frame(candles) -> pd.DataFrame:
+    frame = pd.DataFrame(candles, columns=OHLCV_COLUMNS)
+    frame["timestamp"] = pd.to_datetime(frame["timestamp"], unit="ms")
+    return frame
+
+
+@pytest.mark.unit
+def test_candle_source_is_read_on_first_use(tmp_path):
+    csv_file = tmp_path / "candles.csv"
+    candle_frame(CANDLES).to_csv(csv_file, index=False)
+    store = OHLCVStore(str(tmp_path / "store"))
+    store.write("ETH/USD", "1h", candle_frame(CANDLES))
+    exchange = PaperExchange(candle_source=str(csv_file), timeframe="1h", warmup=2)
+
+    assert exchange.fetch_ticker("BTC/USD")["close"] == 101.0
+    assert exchange.fetch_ohlcv("BTC/USD", "1h") == CANDLES[:2]
+    assert exchange.milliseconds() == T0 + 2 * HOUR_MS
+
+    exchange.candle_source = store.root
+    exchange.advance_to(T0 + 3 * HOUR_MS + 1)
+    # A symbol loaded later starts at the exchange's current time
+    assert exchange.fetch_ohlcv("ETH/USD", "1h") == CANDLES[:3]
+    assert exchange.advance_to(T0 + 4 * HOUR_MS) == 2
+    assert exchange.replay_finished
+    with pytest.raises(ccxt.BadSymbol):
+        exchange.fetch_ticker("XRP/USD")
+
+
+@pytest.mark.unit
+def test_throughput_supports_load_tests():
+    exchange = PaperExchange(balances={"USD": 1e9, "BTC": 1e6})
+    exchange.load_candles("BTC/USD", "1h", CANDLES, position=1)
+    orders = 20_000
+
+    started = time.perf_counter()
+    for i in range(orders // 2):
+        exchange.create_limit_order("BTC/USD", "sell", 1.0, 100.5 + i % 10 * 0.1)
+        exchange.create_limit_order("BTC/USD", "buy", 0.5, 100.5 + i % 7 * 0.1)
+    elapsed = time.perf_counter() - started
+
+    assert orders / elapsed > 5000
+    open_orders = exchange.fetch_open_orders()
+    # Every buy crossed the book or the last close; sells rest until filled
+    assert all(o["side"] == "sell" for o in open_orders)
+    assert 0 < len(open_orders) < orders // 2
+    assert exchange.fetch_balance()["BTC"]["used"] == pytest.approx(
+        sum(o["remaining"] for o in open_orders)
+    )
+
+
+@pytest.mark.unit
+def test_shared_exchange_fixture_trades_without_credentials(exchange, config):
+    price = exchange.fetch_ticker(config.SYMBOL)["last"]
+    order = exchange.create_market_order(config.SYMBOL, "buy", 0.01)
+
+    assert order["status"] == "closed"
+    assert order["average"] == price
+    assert len(exchange.fetch_ohlcv(config.SYMBOL, config.TIMEFRAME)) == config.LIMIT
+    exchange.advance()
+    assert exchange.fetch_ticker(config.SYMBOL)["last"] != price
@@ -0,0 +1,113 @@
+import tracemalloc
+
+import numpy as np
+import pytest
+
+from backend.src.modules.price_history import RingBuffer, lttb, minmax
+
+
+def filled(count: int, capacity: int, seed: int = 0) -> tuple[RingBuffer, np.ndarray]:
+    prices = 100 + np.cumsum(np.random.default_rng(seed).normal(size=count))
+    buffer = RingBuffer(capacity)
+    for i, price in enumerate(prices):
+        buffer.append(1_000 * i, float(price))
+    return buffer, prices
+
+
+@pytest.mark.unit
+def test_keeps_the_newest_ticks_in_order():
+    buffer, prices = filled(25, capacity=10)
+
+    timestamps, kept = buffer.query()
+    assert len(buffer) == 10
+    assert timestamps.tolist() == [1_000 * i for i in range(15, 25)]
+    assert kept.tolist() == prices[15:].tolist()
+
+    timestamps, kept = buffer.query(start=17_000, end=20_000)
+    assert timestamps.tolist() == [17_000, 18_000, 19_000, 20_000]
+    assert buffer.query(start=30_000)[0].size == 0
+
+
+@pytest.mark.unit
+def test_out_of_order_ticks_are_dropped_and_repeats_replace():
+    buffer = RingBuffer(4)
+    assert buffer.append(1_000, 1.0)
+    assert buffer.append(2_000, 2.0)
+    assert buffer.append(2_000, 2.5)
+    assert not buffer.append(1_500, 9.0)
+
+    timestamps, prices = buffer.query()
+    assert timestamps.tolist() == [1_000, 2_000]
+    assert prices.tolist() == [1.0, 2.5]
+    assert buffer.stats() == {"size": 2, "capacity": 4, "appended": 2, "dropped": 1}
+
+
+@pytest.mark.unit
+def test_lttb_keeps_endpoints_and_spikes():
+    x = np.arange(100)
+    y = np.zeros(100)
+    y[37], y[81] = 50.0, -50.0
+
+    indices = lttb(x, y, 10)
+
+    assert len(indices) == 10
+    assert indices[0] == 0 and indices[-1] == 99
+    assert 37 in indices and 81 in indices
+    assert np.all(np.diff(indices) > 0)
+    assert lttb(x, y, 200).tolist() == list(range(100))
+
+
+@pytest.mark.unit
+def test_minmax_keeps_every_bucket_extreme():
+    x = np.arange(1000) * 10
+    y = np.sin(np.arange(1000) / 7.0)
+    y[523] = 5.0
+
+    indices = minmax(x, y, 20)
+
+    assert len(indices) <= 20
+    assert 523 in indices
+    assert np.argmin(y) in indices
+    assert np.all(np.diff(indices) > 0)
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("method", ["lttb", "minmax"])
+def test_downsampled_query_copies_only_the_result(method):
+    buffer, prices = filled(150_000, capacity=100_000)
+    window_bytes = 100_000 * 16
+
+    tracemalloc.start()
+    timestamps, kept = buffer.query(max_points=500, method=method)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    assert 2 <= len(timestamps) <= 500
+    assert timestamps[0] >= 50_000 * 1_000
+    if method == "minmax":
+        assert kept.max() == prices[50_000:].max()
+    assert peak < window_bytes / 4
+
+
+@pytest.mark.unit
+def test_dashboard_history_range_and_downsampling(monkeypatch):
+    from backend.src import dashboard
+
+    buffer, _ = filled(5_000, capacity=10_000)
+    monkeypatch.setattr(dashboard, "price_history", buffer)
+    dashboard.response_cache.invalidate()
+    client = dashboard.app.test_client()
+
+    default = client.get("/api/price/history").json
+    assert len(default) == dashboard.PRICE_HISTORY_POINTS
+    assert set(default[0]) == {"price", "timestamp"}
+
+    ranged = client.get(
+        "/api/price/history?start=1000000&end=2000000&max_points=100&method=minmax"
+    ).json
+    assert len(ranged) <= 100
+    assert all(1_000_000 <= point["timestamp"] <= 2_000_000 for point in ranged)
+
+    for query in ("max_points=1", "max_points=x", "method=mean", "start=soon"):
+        assert client.get(f"/api/price/history?{query}").status_code == 400
+    dashboard.response_cache.invalidate()
@@ -0,0 +1,164 @@
+import asyncio
+import threading
+import time
+
+import ccxt
+import pytest
+
+from backend.src.modules.orders import (
+    RateLimiter,
+    attach_rate_limiter,
+    client_registry,
+    create_async_exchange,
+    init_exchange,
+    rate_limit_lane,
+)
+
+
+def wait_until(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "condition not reached"
+        time.sleep(0.001)
+
+
+@pytest.mark.unit
+def test_bucket_allows_burst_then_refills_at_rate():
+    limiter = RateLimiter(50, capacity=5)
+
+    started = time.monotonic()
+    delays = [limiter.acquire() for _ in range(10)]
+    elapsed = time.monotonic() - started
+
+    assert delays[:5] == [0.0] * 5
+    assert elapsed >= 5 / 50 - 0.01
+    assert sum(delays) > 0
+    stats = limiter.stats()["market_data"]
+    assert stats["requests"] == 10
+    assert stats["queued"] == 5
+    assert stats["wait_max"] == max(delays)
+
+
+@pytest.mark.unit
+def test_weights_above_capacity_wait_for_a_full_bucket():
+    limiter = RateLimiter(20, capacity=2)
+
+    assert limiter.acquire(weight=4) == 0.0
+    # The bucket went 2 tokens into debt, so the next request waits 0.15s
+    started = time.monotonic()
+    limiter.acquire()
+    assert time.monotonic() - started >= 0.14
+
+
+@pytest.mark.unit
+def test_orders_lane_is_served_before_queued_polling():
+    limiter = RateLimiter(20)
+    limiter.acquire()
+    granted = []
+
+    def request(lane):
+        limiter.acquire(lane=lane)
+        granted.append(lane)
+
+    threads = []
+    for lane in ("background", "market_data", "background", "orders"):
+        thread = threading.Thread(target=request, args=(lane,))
+        thread.start()
+        threads.append(thread)
+        queued = len(threads)
+        wait_until(
+            lambda: sum(s["waiting"] for s in limiter.stats().values()) == queued
+        )
+    for thread in threads:
+        thread.join()
+
+    assert granted == ["orders", "market_data", "background", "background"]
+    stats = limiter.stats()
+    assert stats["orders"]["wait_max"] < stats["background"]["wait_max"]
+    assert all(s["waiting"] == 0 for s in stats.values())
+
+
+@pytest.mark.unit
+def test_acquire_times_out_and_leaves_the_queue():
+    limiter = RateLimiter(1)
+    limiter.acquire()
+
+    with pytest.raises(ccxt.RateLimitExceeded):
+        limiter.acquire(timeout=0.01)
+
+    assert limiter.stats()["market_data"]["waiting"] == 0
+
+
+@pytest.mark.unit
+def test_async_acquire_uses_the_lane_of_the_task():
+    limiter = RateLimiter(100)
+
+    async def scenario():
+        with rate_limit_lane("orders"):
+            await asyncio.gather(*(limiter.acquire_async() for _ in range(3)))
+        await limiter.acquire_async()
+
+    asyncio.run(scenario())
+
+    stats = limiter.stats()
+    assert stats["orders"]["requests"] == 3
+    assert stats["orders"]["queued"] == 2
+    assert stats["market_data"]["requests"] == 1
+
+
+@pytest.mark.unit
+def test_state_file_shares_the_budget_between_limiters(tmp_path):
+    state_file = str(tmp_path / "bitfinex.limit")
+    # Separate instances stand in for separate processes
+    limiters = [RateLimiter(20, state_file=state_file) for _ in range(2)]
+
+    def burst(limiter):
+        for _ in range(3):
+            limiter.acquire()
+
+    started = time.monotonic()
+    threads = [threading.Thread(target=burst, args=(limiter,)) for limiter in limiters]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert time.monotonic() - started >= 5 / 20 - 0.01
+
+
+@pytest.mark.unit
+def test_clients_of_one_exchange_share_a_limiter():
+    try:
+        first = init_exchange("key", "secret", "bitfinex")
+        other = init_exchange("key", "other-secret", "bitfinex")
+
+        async def create():
+            client = create_async_exchange("key", "secret", "bitfinex")
+            await client.close()
+            return client
+
+        async_client = asyncio.run(create())
+        assert first.rate_limiter is other.rate_limiter is async_client.rate_limiter
+        assert first.rate_limiter.rate == pytest.approx(1000 / first.rateLimit)
+    finally:
+        client_registry.remove("key", "secret", "bitfinex")
+        client_registry.remove("key", "other-secret", "bitfinex")
+
+
+@pytest.mark.unit
+def test_attached_limiter_applies_endpoint_weights():
+    exchange = ccxt.bitfinex({"enableRateLimit": True})
+    limiter = RateLimiter(1000, capacity=10, weights={"orders/hist": 5})
+    attach_rate_limiter(exchange, limiter)
+
+    assert (
+        exchange.calculate_rate_limiter_cost("private", "POST", "orders/hist", {}) == 5
+    )
+    assert exchange.calculate_rate_limiter_cost("public", "GET", "ticker", {}) == 1
+    with rate_limit_lane("orders"):
+        exchange.throttle(5)
+    exchange.throttle()
+
+    stats = limiter.stats()
+    assert stats["orders"]["requests"] == 1
+    assert stats["market_data"]["requests"] == 1
@@ -0,0 +1,191 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from backend.src.modules.response_cache import ResponseCache
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def renderer(body=b"{}", status=200):
+    calls = []
+
+    def render():
+        calls.append(1)
+        return body + str(len(calls)).encode(), status, "application/json"
+
+    return render, calls
+
+
+@pytest.mark.unit
+def test_entries_are_reused_until_ttl_expires():
+    clock = Clock()
+    cache = ResponseCache(clock=clock)
+    render, calls = renderer()
+
+    first = cache.get("/api/price?", 1.0, render)
+    clock.now = 0.9
+    assert cache.get("/api/price?", 1.0, render) is first
+    clock.now = 1.0
+    second = cache.get("/api/price?", 1.0, render)
+
+    assert len(calls) == 2
+    assert second.body == b"{}2" and second.etag != first.etag
+    assert cache.stats() == {"entries": 1, "hits": 1, "misses": 2, "shared": 0}
+
+
+@pytest.mark.unit
+def test_concurrent_misses_share_one_render():
+    cache = ResponseCache()
+    release = threading.Event()
+    calls = []
+
+    def render():
+        calls.append(1)
+        release.wait(2)
+        return b"[1, 2, 3]", 200, "application/json"
+
+    results = []
+    threads = [
+        threading.Thread(
+            target=lambda: results.append(cache.get("/api/ohlcv?", 5, render))
+        )
+        for _ in range(20)
+    ]
+    for thread in threads:
+        thread.start()
+    while cache.stats()["shared"] < 19:
+        time.sleep(0.001)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1
+    assert len(results) == 20 and all(result is results[0] for result in results)
+
+
+@pytest.mark.unit
+def test_coroutines_and_threads_share_an_async_render():
+    cache = ResponseCache()
+    calls = []
+
+    async def render():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return b"{}", 200, "application/json"
+
+    async def burst():
+        thread_result = []
+        thread = threading.Thread(
+            target=lambda: thread_result.append(
+                cache.get("/api/price?", 5, lambda: (b"[]", 200, "x"))
+            )
+        )
+        leader = asyncio.ensure_future(cache.get_async("/api/price?", 5, render))
+        await asyncio.sleep(0.01)
+        thread.start()
+        results = await asyncio.gather(
+            leader, *(cache.get_async("/api/price?", 5, render) for _ in range(30))
+        )
+        await asyncio.get_running_loop().run_in_executor(None, thread.join)
+        return results + thread_result
+
+    results = asyncio.run(burst())
+
+    assert len(calls) == 1
+    assert len(results) == 32 and all(result is results[0] for result in results)
+
+
+@pytest.mark.unit
+def test_errors_are_shared_but_not_stored():
+    cache = ResponseCache()
+    render, calls = renderer(b'{"error": "down"}', status=500)
+
+    assert cache.get("/api/price?", 10, render).status == 500
+    assert cache.get("/api/price?", 10, render).status == 500
+    assert len(calls) == 2
+
+    def fail():
+        raise RuntimeError("boom")
+
+    with pytest.raises(RuntimeError):
+        cache.get("/api/price?", 10, fail)
+    assert cache.stats()["entries"] == 0
+
+
+@pytest.mark.unit
+def test_invalidate_by_prefix_and_during_render():
+    cache = ResponseCache()
+    render, calls = renderer()
+    cache.get("/api/trades?", 10, render)
+    cache.get("/api/settings?", 10, render)
+
+    cache.invalidate("/api/trades")
+    assert cache.stats()["entries"] == 1
+
+    # A render that raced with a write must not be served afterwards
+    def racing_render():
+        cache.invalidate("/api/trades")
+        return render()
+
+    cache.get("/api/trades?", 10, racing_render)
+    cache.get("/api/trades?", 10, render)
+    assert len(calls) == 4
+
+
+@pytest.mark.unit
+def test_evicts_oldest_entries():
+    cache = ResponseCache(max_entries=2)
+    render, _ = renderer()
+    for path in ("/a", "/b", "/c"):
+        cache.get(path, 10, render)
+
+    cache.get("/a", 10, render)
+    assert cache.stats()["misses"] == 4
+
+
+@pytest.mark.unit
+def test_dashboard_price_is_fetched_once_and_revalidated(monkeypatch):
+    from backend.src import dashboard
+
+    fetches = []
+
+    class Exchange:
+        def fetch_ticker(self, symbol):
+            fetches.append(symbol)
+            return {
+                "last": 100.0,
+                "bid": 99.5,
+                "ask": 100.5,
+                "baseVolume": 3.0,
+                "timestamp": int(time.time() * 1000),
+            }
+
+    monkeypatch.setattr(dashboard, "init_exchange", lambda *args: Exchange())
+    monkeypatch.setitem(dashboard.RESPONSE_CACHE_TTLS, "/api/price", 60)
+    dashboard.response_cache.invalidate()
+    client = dashboard.app.test_client()
+
+    responses = [client.get("/api/price") for _ in range(10)]
+    etag = responses[0].headers["ETag"]
+    assert len(fetches) == 1
+    assert all(response.json["price"] == 100.0 for response in responses)
+    assert {response.headers["ETag"] for response in responses} == {etag}
+
+    not_modified = client.get("/api/price", headers={"If-None-Match": etag})
+    assert not_modified.status_code == 304
+    assert not_modified.data == b""
+    assert not_modified.headers["ETag"] == etag
+
+    dashboard.response_cache.invalidate("/api/price")
+    assert client.get("/api/price").status_code == 200
+    assert len(fetches) == 2
+    dashboard.response_cache.invalidate()
@@ -0,0 +1,113 @@
+import asyncio
+
+import pytest
+from pydantic import ValidationError
+
+from backend.src.runner import BotRunner, symbol_config
+from backend.src.tradingbot import Clock
+from backend.tests.test_tradingbot import START, STEP, FakeAsyncExchange, FakeClock
+
+
+class FailingExchange(FakeAsyncExchange):
+    """Fails every candle request for the symbols in `broken`"""
+
+    def __init__(self, clock, broken=(), **kwargs):
+        super().__init__(clock, **kwargs)
+        self.broken = set(broken)
+        self.symbols = []
+
+    async def fetch_ohlcv(self, symbol, timeframe="1m", since=None, limit=None):
+        self.symbols.append(symbol)
+        if symbol in self.broken:
+            raise RuntimeError(f"{symbol} unavailable")
+        return await super().fetch_ohlcv(symbol, timeframe, since, limit)
+
+
+@pytest.fixture
+def runner_config(config):
+    return config.model_copy(
+        update={
+            "TIMEFRAME": "1m",
+            "LIMIT": 100,
+            "TRADING_START_HOUR": 0,
+            "TRADING_END_HOUR": 24,
+        }
+    )
+
+
+SYMBOLS = {"BTC/USD": {}, "ETH/USD": {"LOOKBACK": 3}, "SOL/USD": {"EMA_LENGTH": 10}}
+
+
+@pytest.mark.unit
+def test_symbol_config_applies_and_validates_overrides(runner_config):
+    cfg = symbol_config(runner_config, "ETH/USD", {"LOOKBACK": 3})
+
+    assert cfg.SYMBOL == "ETH/USD"
+    assert cfg.LOOKBACK == 3
+    assert cfg.TIMEFRAME == runner_config.TIMEFRAME
+    with pytest.raises(ValidationError):
+        symbol_config(runner_config, "ETH/USD", {"LOOKBACK": "many"})
+
+
+@pytest.mark.unit
+def test_symbols_share_exchange_and_candle_cache(runner_config):
+    clock = FakeClock(START + 5)
+    exchange = FailingExchange(clock)
+    runner = BotRunner(runner_config, SYMBOLS, exchange=exchange, clock=clock)
+
+    asyncio.run(runner.run(max_candles=3))
+
+    bots = runner.bots
+    assert bots["ETH/USD"].config.LOOKBACK == 3
+    assert bots["ETH/USD"]._fvg_window.maxlen == 6
+    assert bots["SOL/USD"].indicators.ema_length == 10
+    assert len({id(bot.candles) for bot in bots.values()}) == 1
+    assert set(exchange.symbols) == set(SYMBOLS)
+    last_ms = int((START // STEP + 2) * STEP * 1000)
+    for symbol, stats in runner.stats().items():
+        assert stats["candles"] >= 3
+        assert stats["errors"] == 0
+        assert stats["cpu_ms_per_candle"] > 0
+        cached = runner.candles.candles(symbol, "1m", 10)
+        assert cached[-1, 0] >= last_ms
+    # The shared cache was filled by the bots, not by extra requests
+    assert runner.candles.full_fetches == 0
+
+
+@pytest.mark.unit
+def test_failing_symbol_is_isolated_and_restarted(runner_config):
+    clock = FakeClock(START + 5)
+    exchange = FailingExchange(clock, broken={"ETH/USD"})
+    runner = BotRunner(
+        runner_config,
+        SYMBOLS,
+        exchange=exchange,
+        clock=clock,
+        restart_delay=0,
+        max_restarts=2,
+    )
+
+    asyncio.run(runner.run(max_candles=3))
+
+    stats = runner.stats()
+    assert stats["ETH/USD"]["errors"] == 3
+    assert stats["ETH/USD"]["restarts"] == 2
+    assert "unavailable" in stats["ETH/USD"]["last_error"]
+    assert stats["BTC/USD"]["candles"] >= 3
+    assert stats["SOL/USD"]["errors"] == 0
+
+
+@pytest.mark.unit
+def test_stop_ends_all_symbols(runner_config):
+    async def scenario():
+        cfg = runner_config.model_copy(update={"TIMEFRAME": "1h"})
+        runner = BotRunner(cfg, SYMBOLS, exchange=FakeAsyncExchange(Clock(), latency=0))
+        task = asyncio.create_task(runner.run())
+        await asyncio.sleep(0.05)
+        assert all(bot.is_running for bot in runner.bots.values())
+        runner.stop()
+        await asyncio.wait_for(task, timeout=1)
+        return runner
+
+    runner = asyncio.run(scenario())
+    assert not any(bot.is_running for bot in runner.bots.values())
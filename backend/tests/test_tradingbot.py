@@ -0,0 +1,305 @@
+import asyncio
+
+import ccxt
+import numpy as np
+import pytest
+
+from backend.src.backtest import entry_signals
+from backend.src.modules.incremental import IncrementalIndicators
+from backend.src.modules.indicators import add_fvg_columns, calculate_indicators
+from backend.src.modules.orders import client_registry
+from backend.src.tradingbot import (
+    Clock,
+    ReplayClock,
+    TradingBot,
+    next_candle_close,
+)
+from backend.tests.test_backtest import make_ohlcv
+
+STEP = 60.0
+START = 1_700_000_000.0 - 1_700_000_000.0 % STEP  # A minute boundary
+
+
+class FakeClock(Clock):
+    """
+    Virtual time; every sleep covers only (1 - early) of the requested time
+    and then wakes `late` seconds late
+    """
+
+    def __init__(self, now: float, early: float = 0.0, late: float = 0.0):
+        self.now = now
+        self.early = early
+        self.late = late
+
+    def time(self) -> float:
+        return self.now
+
+    async def sleep(self, seconds: float):
+        self.now += max(seconds * (1 - self.early), 0.001) + self.late
+        await asyncio.sleep(0)
+
+
+class FakeAsyncExchange:
+    """
+    Minute candles published `publish_delay` seconds after their close;
+    every request takes `latency` seconds of virtual time.
+    """
+
+    def __init__(self, clock, latency=0.02, publish_delay=0.0, breakout=None):
+        self.clock = clock
+        self.latency = latency
+        self.publish_delay = publish_delay
+        self.breakout = breakout
+        self.orders = []
+        self.fetches = []
+
+    def candle(self, i):
+        price = 100.0 + 0.01 * (i % 50)
+        bar = [int(i * STEP * 1000), price, price + 1, price - 1, price, 100.0]
+        if self.breakout is not None and i == self.breakout:
+            # Closes above every earlier high, below its own
+            bar = [bar[0], price, price + 4, price - 1, price + 3, 1000.0]
+        elif self.breakout is not None and i == self.breakout + 2:
+            bar = [bar[0], price, price + 1, price * 0.9, price, 100.0]
+        return bar
+
+    async def _request(self):
+        if self.latency:
+            self.clock.now += self.latency
+        await asyncio.sleep(0)
+
+    async def fetch_ohlcv(self, symbol, timeframe="1m", since=None, limit=None):
+        await self._request()
+        self.fetches.append(since)
+        now = self.clock.time()
+        forming = int(now // STEP)
+        published = [
+            i
+            for i in range(forming - 200, forming)
+            if (i + 1) * STEP + self.publish_delay <= now
+        ] + [forming]
+        if since is not None:
+            published = [i for i in published if i * STEP * 1000 >= since]
+        if limit:
+            published = published[-limit:]
+        return [self.candle(i) for i in published]
+
+    async def fetch_balance(self):
+        await self._request()
+        return {"free": {"USD": 10000.0}}
+
+    async def create_order(self, symbol, type, side, amount, price=None, params=None):
+        await self._request()
+        last_closed = int(self.clock.time() // STEP) - 1
+        fill = self.candle(last_closed)[4]
+        self.orders.append((side, amount, fill))
+        return {"id": str(len(self.orders)), "average": fill}
+
+
+def run(bot, exchange, clock, **kwargs):
+    asyncio.run(bot.run_async(exchange=exchange, clock=clock, **kwargs))
+
+
+@pytest.mark.unit
+def test_next_candle_close():
+    assert next_candle_close(START, STEP) == START + STEP
+    assert next_candle_close(START + 59.9, STEP) == START + STEP
+    assert next_candle_close(START + 60.0, STEP) == START + 2 * STEP
+
+
+@pytest.mark.unit
+def test_loop_processes_each_candle_at_close(bot_config):
+    clock = FakeClock(START + 17.3)
+    exchange = FakeAsyncExchange(clock, latency=0.02)
+    bot = TradingBot(bot_config)
+
+    run(bot, exchange, clock, max_candles=5)
+
+    last_minute = int(START // STEP) + 4
+    assert bot._last_candle_ms == int(last_minute * STEP * 1000)
+    assert bot.indicators.bars == 99 + 5
+    assert len(bot.decision_latencies) == 5
+    # One fetch of virtual network latency after each close
+    assert all(
+        latency == pytest.approx(20, abs=1) for latency in bot.decision_latencies
+    )
+    assert not bot.is_running
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("early,late", [(0.5, 0.0), (0.0, 0.004)])
+def test_drift_does_not_accumulate(bot_config, early, late):
+    clock = FakeClock(START + 1, early=early, late=late)
+    exchange = FakeAsyncExchange(clock, latency=0.0)
+    bot = TradingBot(bot_config)
+
+    run(bot, exchange, clock, max_candles=30)
+
+    # Early wake-ups are re-slept; late ones cost only that sleep's delay
+    assert max(bot.decision_latencies) <= late * 1000 + 1
+    assert bot.indicators.bars == 99 + 30
+
+
+@pytest.mark.unit
+def test_waits_for_candle_publication(bot_config):
+    clock = FakeClock(START + 30)
+    exchange = FakeAsyncExchange(clock, latency=0.01, publish_delay=0.6)
+    bot = TradingBot(bot_config)
+
+    run(bot, exchange, clock, max_candles=3, poll_interval=0.25)
+
+    assert bot.indicators.bars == 99 + 3
+    assert all(600 <= latency < 900 for latency in bot.decision_latencies)
+
+
+@pytest.mark.unit
+def test_breakout_enters_and_stop_loss_exits(bot_config):
+    clock = FakeClock(START + 5)
+    breakout = int(START // STEP) + 2
+    exchange = FakeAsyncExchange(clock, breakout=breakout)
+    bot = TradingBot(bot_config)
+
+    run(bot, exchange, clock, max_candles=6)
+
+    sides = [side for side, _, _ in exchange.orders]
+    assert sides == ["buy", "sell"]
+    assert bot.current_position is None
+    trade = bot.trade_history[-1]
+    assert trade["reason"] == "SL"
+    assert trade["entry_price"] == exchange.candle(breakout)[4]
+    assert trade["pnl"] < 0
+    assert bot.equity == pytest.approx(10000.0 + trade["pnl"])
+
+
+class FailingExchange(FakeAsyncExchange):
+    """Orders always fail, and so does the third candle fetch"""
+
+    async def fetch_ohlcv(self, *args, **kwargs):
+        if len(self.fetches) == 2:
+            self.fetches.append("failed")
+            raise ccxt.NetworkError("timeout")
+        return await super().fetch_ohlcv(*args, **kwargs)
+
+    async def create_order(self, *args, **kwargs):
+        await self._request()
+        raise ccxt.NetworkError("order endpoint down")
+
+
+@pytest.mark.unit
+def test_exchange_errors_do_not_end_the_loop(bot_config):
+    clock = FakeClock(START + 5)
+    exchange = FailingExchange(clock, breakout=int(START // STEP) + 2)
+    bot = TradingBot(bot_config)
+
+    run(bot, exchange, clock, max_candles=6)
+
+    # The failed fetch's candle is picked up with the next one
+    assert "failed" in exchange.fetches
+    assert bot.candles_processed == 7
+    assert len(bot.decision_latencies) == 6
+    assert bot.current_position is None
+
+
+@pytest.mark.unit
+def test_stop_interrupts_sleep(bot_config):
+    async def scenario():
+        bot = TradingBot(bot_config.model_copy(update={"TIMEFRAME": "1h"}))
+        exchange = FakeAsyncExchange(Clock(), latency=0.0)
+        task = asyncio.create_task(bot.run_async(exchange=exchange))
+        await asyncio.sleep(0.05)
+        assert bot.is_running
+        bot.stop()
+        await asyncio.wait_for(task, timeout=1)
+        return bot
+
+    bot = asyncio.run(scenario())
+    assert not bot.is_running
+    assert bot.indicators.bars > 0
+
+
+@pytest.mark.unit
+def test_stop_while_polling_records_no_decision(bot_config):
+    clock = FakeClock(START + 30.0)
+    exchange = FakeAsyncExchange(clock, latency=0.0, publish_delay=10.0)
+    bot = TradingBot(bot_config)
+    original = exchange.fetch_ohlcv
+
+    async def fetch_then_stop(*args, **kwargs):
+        if clock.time() >= START + STEP:
+            bot.stop()  # While waiting for the candle to be published
+        return await original(*args, **kwargs)
+
+    exchange.fetch_ohlcv = fetch_then_stop
+    run(bot, exchange, clock, max_candles=3)
+
+    assert bot.candles_processed == 0
+    assert not bot.decision_latencies
+
+
+@pytest.mark.unit
+def test_bot_signals_match_the_backtest(bot_config):
+    cfg = bot_config.model_copy(update={"LOOKBACK": 3, "TIMEFRAME": "1h"})
+    df = make_ohlcv(21, periods=600)
+    bot = TradingBot(cfg)
+    bot.indicators = IncrementalIndicators.from_config(cfg)
+    entries = []
+
+    async def record(exchange, price):
+        entries.append(bot.candles_processed)
+
+    bot._enter = record
+
+    async def feed():
+        for row in df.itertuples():
+            timestamp = int(row.timestamp.timestamp() * 1000)
+            bar = [timestamp, row.open, row.high, row.low, row.close, row.volume]
+            await bot.on_candle(None, bar)
+
+    asyncio.run(feed())
+
+    backtest = add_fvg_columns(
+        calculate_indicators(
+            df,
+            ema_length=cfg.EMA_LENGTH,
+            volume_multiplier=cfg.VOLUME_MULTIPLIER,
+            trading_start_hour=cfg.TRADING_START_HOUR,
+            trading_end_hour=cfg.TRADING_END_HOUR,
+        ),
+        cfg.LOOKBACK,
+    )
+    expected = np.flatnonzero(entry_signals(backtest, cfg.LOOKBACK)).tolist()
+    assert expected, "fixture should produce signals"
+    # on_candle counts the candle after deciding; the backtest skips the last
+    assert [i - 1 for i in entries if i < len(df)] == expected
+
+
+@pytest.mark.unit
+def test_paper_run_replays_the_candle_source(bot_config, tmp_path):
+    csv_file = tmp_path / "candles.csv"
+    make_ohlcv(5, periods=300).to_csv(csv_file, index=False)
+    cfg = bot_config.model_copy(
+        update={
+            "EXCHANGE": "paper",
+            "PAPER_CANDLES": str(csv_file),
+            "TIMEFRAME": "1h",
+            "LOOKBACK": 3,
+            # Half the equity per position leaves room for the taker fee
+            "RISK_PER_TRADE": 0.01,
+        }
+    )
+    try:
+        bot = TradingBot(cfg)
+        asyncio.run(bot.run_async(max_candles=200))
+
+        assert isinstance(bot.clock, ReplayClock)
+        assert bot.candles_processed == 200
+        # Every decision follows its candle close in simulated time
+        assert max(bot.decision_latencies) == 0
+        assert bot._last_candle_ms == bot.exchange.milliseconds() - 3600 * 1000
+        # The entries and exits filled on the simulated account
+        assert bot.trade_history
+        assert bot.exchange.fetch_balance()["total"]["BTC"] == pytest.approx(
+            bot.current_position["size"] if bot.current_position else 0.0, abs=1e-9
+        )
+    finally:
+        client_registry.remove(cfg.API_KEY, cfg.API_SECRET, "paper")
@@ -1,8 +1,21 @@
+import asyncio
 import json
+import multiprocessing
+import os
+import threading
 import time
 
+import ccxt
 import pytest
-from modules.utils import NONCE_FILE, ensure_paper_trading_symbol, get_next_nonce, retry
+from modules.utils import (
+    NONCE_FILE,
+    CircuitBreaker,
+    CircuitOpenError,
+    NonceAllocator,
+    ensure_paper_trading_symbol,
+    get_next_nonce,
+    retry,
+)
 
 
 def test_retry_success():
@@ -28,6 +41,146 @@ def test_retry_fail():
         f()
 
 
+def test_retry_skips_non_retryable_exchange_errors():
+    calls = {"c": 0}
+
+    @retry(max_attempts=3, initial_delay=0)
+    def f(error):
+        calls["c"] += 1
+        raise error
+
+    with pytest.raises(ccxt.InvalidOrder):
+        f(ccxt.InvalidOrder("rejected"))
+    assert calls["c"] == 1
+    with pytest.raises(ccxt.RequestTimeout):
+        f(ccxt.RequestTimeout("timeout"))
+    assert calls["c"] == 4
+
+
+def test_retry_wraps_coroutines_without_blocking():
+    calls = {"c": 0}
+
+    @retry(max_attempts=3, initial_delay=0.05, jitter=False)
+    async def f():
+        calls["c"] += 1
+        if calls["c"] < 3:
+            raise ccxt.NetworkError()
+        return "ok"
+
+    async def scenario():
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0.01)
+
+        task = asyncio.create_task(ticker())
+        result = await f()
+        task.cancel()
+        return result, ticks
+
+    result, ticks = asyncio.run(scenario())
+    assert result == "ok"
+    # The loop kept running during the 0.05s + 0.1s backoff
+    assert ticks >= 10
+
+
+def test_retry_gives_up_at_deadline():
+    calls = {"c": 0}
+
+    @retry(max_attempts=10, initial_delay=0.05, jitter=False, deadline=0.1)
+    def f():
+        calls["c"] += 1
+        raise ccxt.NetworkError()
+
+    started = time.monotonic()
+    with pytest.raises(ccxt.NetworkError):
+        f()
+    # Sleeps of 0.05s and 0.1s would exceed the 0.1s budget
+    assert calls["c"] == 2
+    assert time.monotonic() - started < 0.1
+
+
+def test_circuit_breaker_opens_and_recovers():
+    now = {"t": 0.0}
+    breaker = CircuitBreaker(
+        failure_threshold=2, reset_timeout=10, clock=lambda: now["t"]
+    )
+    healthy = {"ok": False}
+    calls = {"c": 0}
+
+    @retry(max_attempts=3, initial_delay=0, breaker=breaker)
+    def f():
+        calls["c"] += 1
+        if not healthy["ok"]:
+            raise ccxt.ExchangeNotAvailable()
+        return "ok"
+
+    with pytest.raises(CircuitOpenError):
+        f()
+    assert calls["c"] == 2
+    assert breaker.state == "open"
+    with pytest.raises(CircuitOpenError):
+        f()
+    assert calls["c"] == 2
+
+    now["t"] = 10.0
+    assert breaker.state == "half_open"
+    with pytest.raises(CircuitOpenError):
+        f()  # The trial call fails and reopens the breaker
+    assert calls["c"] == 3
+
+    now["t"] = 20.0
+    healthy["ok"] = True
+    assert f() == "ok"
+    assert breaker.state == "closed"
+
+
+def test_cancelled_trial_call_releases_the_circuit_breaker():
+    now = {"t": 0.0}
+    breaker = CircuitBreaker(
+        failure_threshold=1, reset_timeout=10, clock=lambda: now["t"]
+    )
+    breaker.record_failure()
+    now["t"] = 10.0
+    calls = {"c": 0}
+
+    @retry(max_attempts=1, breaker=breaker)
+    async def f():
+        calls["c"] += 1
+        await asyncio.sleep(10)
+        return "ok"
+
+    @retry(max_attempts=1, breaker=breaker)
+    async def g():
+        calls["c"] += 1
+        return "ok"
+
+    async def scenario():
+        trial = asyncio.create_task(f())
+        await asyncio.sleep(0.01)
+        trial.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await trial
+        return await g()
+
+    assert asyncio.run(scenario()) == "ok"
+    assert calls["c"] == 2
+    assert breaker.state == "closed"
+
+    @retry(max_attempts=1, breaker=breaker)
+    def interrupted():
+        raise KeyboardInterrupt
+
+    breaker.record_failure()
+    now["t"] = 20.0
+    with pytest.raises(KeyboardInterrupt):
+        interrupted()
+    assert breaker.allow()
+
+
 def test_ensure_symbol():
     assert ensure_paper_trading_symbol("BTC/USD").startswith("tTEST")
     assert ensure_paper_trading_symbol("tTESTX").startswith("tTEST")
@@ -35,16 +188,65 @@ def test_ensure_symbol():
 
 def test_nonce(tmp_path):
     tmp = tmp_path / "n.json"
-    import backend.src.modules.utils as utils
+    import modules.utils as utils
 
     old = utils.NONCE_FILE
     utils.NONCE_FILE = str(tmp)
     n1 = get_next_nonce()
     n2 = get_next_nonce()
     assert n2 > n1
-    # Check file content if it exists
-    if tmp.exists():
-        with open(tmp, "r", encoding="utf-8") as f:
-            last_nonce = int(f.read().strip())
-        assert last_nonce == n2
+    # The file records the end of the reserved block, never a used nonce
+    with open(tmp, "r", encoding="utf-8") as f:
+        last_nonce = int(f.read().strip())
+    assert last_nonce >= n2
     utils.NONCE_FILE = old
+
+
+def test_nonce_allocator_is_unique_across_threads_and_instances(tmp_path):
+    path = str(tmp_path / "nonce.txt")
+    (tmp_path / "nonce.txt").write_text("41")
+    # Two allocators on one file behave like two processes sharing a key
+    allocators = [NonceAllocator(path, block_size=50) for _ in range(2)]
+    results = [[] for _ in range(8)]
+
+    def take(allocator, out):
+        out.extend(allocator.next() for _ in range(500))
+
+    threads = [
+        threading.Thread(target=take, args=(allocators[i % 2], results[i]))
+        for i in range(8)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    nonces = [n for out in results for n in out]
+    assert len(set(nonces)) == len(nonces) == 4000
+    assert min(nonces) == 42
+    assert all(out == sorted(out) for out in results)
+    # A newcomer starts after every block reserved so far
+    assert NonceAllocator(path, block_size=1).next() > max(nonces)
+    assert sum(a.reservations for a in allocators) >= 4000 // 50
+
+
+def _take_nonces(path, count, queue):
+    allocator = NonceAllocator(path, block_size=10)
+    queue.put([allocator.next() for _ in range(count)])
+
+
+@pytest.mark.skipif(os.name == "nt", reason="uses fork")
+def test_nonce_allocator_is_unique_across_processes(tmp_path):
+    path = str(tmp_path / "nonce.txt")
+    context = multiprocessing.get_context("fork")
+    queue = context.Queue()
+    processes = [
+        context.Process(target=_take_nonces, args=(path, 200, queue)) for _ in range(4)
+    ]
+    for process in processes:
+        process.start()
+    nonces = [n for _ in processes for n in queue.get(timeout=10)]
+    for process in processes:
+        process.join()
+
+    assert len(set(nonces)) == len(nonces) == 800